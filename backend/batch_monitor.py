@@ -0,0 +1,258 @@
+import contextlib, json, os, random, threading, time #작업 상태 확인 라이브러리
+from datetime import datetime
+try:
+    import fcntl #작업 기록 파일 잠금 (Linux/macOS)
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+JOB_REGISTRY_PATH = 'data/batch_jobs.json' # 제출한 Batch 작업 id를 기록하는 파일 (재시작 시 다시 연결, 여러 스크립트가 함께 사용)
+POLL_INITIAL_INTERVAL = 10 # 첫 상태 확인 간격 (초)
+POLL_MAX_INTERVAL = 300 # 최대 상태 확인 간격 (초)
+POLL_BACKOFF_FACTOR = 1.5 # 상태가 그대로일 때 확인 간격을 늘리는 비율
+JOB_DEADLINE = 48 * 3600 # 기본 작업 마감 시간 (초, 이후에는 작업을 취소)
+TERMINAL_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+RESUBMIT_STATES = ('JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED') # 다시 제출해야 하는 상태
+
+class BatchJobMonitor:
+    """
+    여러 Gemini Batch 작업의 상태를 함께 확인하는 모니터
+
+    - 작업마다 상태가 그대로이면 확인 간격을 지수적으로 늘리고(지터 포함), 상태가 바뀌면 다시 줄입니다.
+    - 마감 시간이 지난 작업은 취소합니다.
+    - 작업이 끝나면 바로 완료 콜백을 호출해 결과 저장을 시작합니다.
+    - 제출한 작업 id를 태그별로 파일에 기록해, 재시작한 프로세스가 다시 제출하지 않고 기존 작업에 연결합니다.
+
+    client는 batches.get(name=...)과 batches.cancel(name=...)만 사용하므로 다른 객체로 바꿔 쓸 수 있습니다.
+    """
+    def __init__(self, client, registry_path=JOB_REGISTRY_PATH, initial_interval=POLL_INITIAL_INTERVAL,
+                 max_interval=POLL_MAX_INTERVAL, backoff_factor=POLL_BACKOFF_FACTOR, sleep=time.sleep, clock=time.time):
+        """
+        Args:
+            client: genai.Client 또는 같은 batches 인터페이스를 가진 객체
+            registry_path (str): 작업 id 기록 파일 경로 (None이면 기록하지 않음)
+            initial_interval (float): 첫 상태 확인 간격 (초)
+            max_interval (float): 최대 상태 확인 간격 (초)
+            backoff_factor (float): 상태가 그대로일 때 간격을 늘리는 비율
+            sleep (callable): 대기 함수
+            clock (callable): 현재 시각(초)을 반환하는 함수
+        """
+        self.client = client
+        self.registry_path = registry_path
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.sleep = sleep
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.jobs = {} # {작업 이름: {'on_done', 'deadline_at', 'interval', 'next_poll', 'state'}}
+        self.results = {} # {작업 이름: 마지막으로 확인한 작업 객체}
+        self.timed_out = set() # 마감 시간이 지나 취소한 작업 이름
+        self.thread = None
+
+    # ------------------------------------------------------------------
+    # 작업 id 기록
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _registry_locked(self):
+        """
+        작업 기록 파일을 읽고 고치는 동안 다른 스레드와 다른 프로세스를 막습니다.
+
+        embedding_batch.py, keywording.py, topicization.py가 같은 기록 파일을 쓰므로
+        threading.Lock만으로는 프로세스 사이의 읽기-수정-쓰기 충돌을 막을 수 없어 <기록 파일>.lock에 파일 잠금을 겁니다.
+        """
+        with self.lock:
+            if not self.registry_path:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.registry_path) or '.', exist_ok=True)
+            with open(f"{self.registry_path}.lock", 'a+b') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    while True: # LK_LOCK은 10초 동안 잠금을 얻지 못하면 OSError를 냄
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_registry(self):
+        if not self.registry_path or not os.path.exists(self.registry_path):
+            return {}
+        with open(self.registry_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_registry(self, registry):
+        if not self.registry_path:
+            return
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.registry_path) # 중간에 종료되어도 기록 파일이 깨지지 않도록 교체
+
+    def registered(self, prefix=''):
+        """
+        기록된 작업 중 태그가 prefix로 시작하는 작업을 반환합니다.
+
+        Returns:
+            list: [(태그, 작업 이름, 마감 시각)]
+        """
+        with self._registry_locked():
+            registry = self._load_registry()
+        return [(tag, info['name'], info.get('deadline_at')) for tag, info in registry.items() if tag.startswith(prefix)]
+
+    def register(self, tag, job_name, deadline=JOB_DEADLINE):
+        """제출한 작업 id를 태그로 기록합니다."""
+        with self._registry_locked():
+            registry = self._load_registry()
+            registry[tag] = {
+                'name': job_name,
+                'submitted_at': datetime.now().isoformat(timespec='seconds'),
+                'deadline_at': self.clock() + deadline if deadline else None,
+            }
+            self._save_registry(registry)
+
+    def forget(self, tag):
+        """결과 저장이 끝난 작업의 기록을 지웁니다."""
+        with self._registry_locked():
+            registry = self._load_registry()
+            if registry.pop(tag, None) is not None:
+                self._save_registry(registry)
+
+    def submit_or_attach(self, tag, submit, deadline=JOB_DEADLINE):
+        """
+        태그로 기록된 작업이 있으면 그 작업에 다시 연결하고, 없거나 실패/취소/만료된 작업이면 새로 제출합니다.
+
+        Args:
+            tag (str): 작업을 구분하는 이름 (예: 'keywording')
+            submit (callable): 작업을 제출하고 Batch 작업 객체를 반환하는 함수 (기존 작업에 연결하면 호출하지 않으므로 입력 파일 생성도 이 안에서 함)
+            deadline (float): 새로 제출한 작업의 마감 시간 (초)
+
+        Returns:
+            tuple: (작업 이름, 마감 시각)
+        """
+        for registered_tag, job_name, deadline_at in self.registered(tag):
+            if registered_tag != tag:
+                continue
+            batch_job = self.client.batches.get(name=job_name)
+            if batch_job.state.name not in RESUBMIT_STATES:
+                print(f"이전에 제출한 작업 {job_name}에 다시 연결합니다. (상태: {batch_job.state.name})")
+                return job_name, deadline_at
+            print(f"이전 작업 {job_name}이(가) {batch_job.state.name} 상태라 다시 제출합니다.")
+        batch_job = submit()
+        self.register(tag, batch_job.name, deadline)
+        return batch_job.name, (self.clock() + deadline if deadline else None)
+
+    # ------------------------------------------------------------------
+    # 상태 확인
+    # ------------------------------------------------------------------
+    def watch(self, job_name, on_done=None, deadline_at=None):
+        """
+        작업을 확인 대상에 추가합니다.
+
+        Args:
+            job_name (str): Batch 작업 이름
+            on_done (callable): 작업이 끝나거나 마감 시간이 지났을 때 작업 객체를 받아 호출할 함수
+            deadline_at (float): 마감 시각 (clock 기준, None이면 마감 없음)
+        """
+        with self.lock:
+            self.jobs[job_name] = {
+                'on_done': on_done,
+                'deadline_at': deadline_at,
+                'interval': self.initial_interval,
+                'next_poll': self.clock(),
+                'state': None,
+            }
+
+    def _poll(self, job_name, info):
+        """작업 하나의 상태를 확인합니다. 끝났으면 작업 객체를, 아니면 None을 반환합니다."""
+        now = self.clock()
+        if info['deadline_at'] is not None and now >= info['deadline_at']:
+            print(f"작업 {job_name}이(가) 마감 시간을 넘겨 취소합니다.")
+            try:
+                self.client.batches.cancel(name=job_name)
+            except Exception as e:
+                print(f"작업 취소 실패: {e}")
+            self.timed_out.add(job_name)
+            return self.client.batches.get(name=job_name)
+
+        batch_job = self.client.batches.get(name=job_name)
+        state = batch_job.state.name
+        if state in TERMINAL_STATES:
+            return batch_job
+        if state != info['state']: # 상태가 바뀌면 다시 자주 확인
+            info['interval'] = self.initial_interval
+        else:
+            info['interval'] = min(self.max_interval, info['interval'] * self.backoff_factor)
+        info['state'] = state
+        info['next_poll'] = now + info['interval'] * random.uniform(0.8, 1.2) # 여러 작업을 같은 시각에 확인하지 않도록 지터 추가
+        return None
+
+    def run(self):
+        """
+        확인 대상 작업이 모두 끝날 때까지 상태를 확인하고, 끝난 작업마다 완료 콜백을 호출합니다.
+
+        Returns:
+            dict: {작업 이름: 마지막으로 확인한 작업 객체}
+        """
+        while True:
+            with self.lock:
+                if not self.jobs:
+                    break
+                due = [(name, info) for name, info in self.jobs.items() if info['next_poll'] <= self.clock()]
+                next_poll = min(info['next_poll'] for info in self.jobs.values())
+            if not due:
+                self.sleep(max(0.0, next_poll - self.clock()))
+                continue
+            for job_name, info in due:
+                try:
+                    batch_job = self._poll(job_name, info)
+                except Exception as e: # 일시적인 API 오류는 다음 확인 때 다시 시도
+                    print(f"작업 {job_name} 상태 확인 실패: {e}")
+                    info['interval'] = min(self.max_interval, info['interval'] * self.backoff_factor)
+                    info['next_poll'] = self.clock() + info['interval']
+                    continue
+                if batch_job is None:
+                    continue
+                with self.lock:
+                    del self.jobs[job_name]
+                    remaining = len(self.jobs)
+                self.results[job_name] = batch_job
+                print(f"Job {job_name} finished with state: {batch_job.state.name} (남은 작업 {remaining}개)")
+                if batch_job.state.name == 'JOB_STATE_FAILED':
+                    print(f"Error: {batch_job.error}")
+                if info['on_done'] is not None:
+                    try:
+                        info['on_done'](batch_job)
+                    except Exception as e: # 한 작업의 결과 처리 오류로 나머지 작업 확인이 멈추지 않도록 함
+                        print(f"작업 {job_name} 완료 처리 중 오류 발생: {e}")
+            with self.lock:
+                if self.jobs:
+                    print(f"{len(self.jobs)}개 작업 진행 중...")
+        return self.results
+
+    def start(self):
+        """run()을 백그라운드 스레드에서 실행합니다. join()으로 종료를 기다립니다."""
+        self.thread = threading.Thread(target=self.run, name='BatchJobMonitor', daemon=True)
+        self.thread.start()
+        return self
+
+    def join(self):
+        if self.thread is not None:
+            self.thread.join()
+        return self.results
+
+    def wait(self, job_name, deadline_at=None):
+        """작업 하나가 끝날 때까지 기다려 마지막 작업 객체를 반환합니다."""
+        self.watch(job_name, deadline_at=deadline_at)
+        return self.run()[job_name]
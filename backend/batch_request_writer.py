@@ -0,0 +1,166 @@
+import os, gzip, tempfile
+import orjson #요청 직렬화 라이브러리
+
+CURSOR_FETCH_SIZE = 5000 # 커서에서 한 번에 가져올 행 수
+GZIP_LEVEL = 1 # gzip 압축 수준 (요청 파일은 반복이 많아 낮은 수준으로도 충분히 작아짐)
+
+def iter_cursor(cursor, fetch_size=CURSOR_FETCH_SIZE):
+    """
+    SQLite 커서의 결과를 fetch_size개씩 가져오며 한 행씩 반환합니다 (전체 결과를 메모리에 올리지 않음).
+
+    Args:
+        cursor (sqlite3.Cursor): execute()를 마친 커서
+        fetch_size (int): 한 번에 가져올 행 수
+    """
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield from rows
+
+def embedding_request(key, text, task_type, output_dimensionality):
+    """임베딩 Batch API 요청 한 건"""
+    return {
+        "key": key,
+        "request": {
+            "task_type": task_type,
+            "output_dimensionality": output_dimensionality,
+            "content": {"parts": [{"text": text}]},
+        }
+    }
+
+def generate_content_request(custom_id, system_prompt, text):
+    """텍스트 생성(키워드/토픽 라벨링) Batch API 요청 한 건"""
+    return {
+        "custom_id": custom_id,
+        "request": {
+            "system_instruction": {"parts": [{"text": system_prompt}]},
+            "contents": [{"parts": [{"text": text}]}],
+        }
+    }
+
+class BatchRequestWriter:
+    """
+    Batch API 입력 JSONL 파일을 쓰는 클래스
+
+    요청을 orjson으로 직렬화해 바로 파일에 쓰고, 요청 수나 크기 제한을 넘으면 다음 파일(샤드)로 나눕니다.
+    compress=True이면 gzip으로 압축해 씁니다 (크기 제한은 압축 전 크기 기준).
+    요청이 하나도 없으면 파일을 만들지 않습니다.
+    """
+    def __init__(self, path=None, max_requests=None, max_bytes=None, compress=False, prefix='batch_requests'):
+        """
+        Args:
+            path (str): 입력 파일 경로 (없으면 임시 파일, 두 번째 샤드부터는 이름 뒤에 번호를 붙임)
+            max_requests (int): 파일 하나의 최대 요청 수
+            max_bytes (int): 파일 하나의 최대 크기 (바이트)
+            compress (bool): gzip 압축 여부
+            prefix (str): 임시 파일 이름 접두사
+        """
+        self.path = path
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.prefix = prefix
+        self.shards = [] # [[파일 경로, 요청 수]]
+        self.file = None
+        self.count = 0
+        self.size = 0
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.remove_all() # 중간에 실패한 입력 파일은 남기지 않음
+
+    def _next_path(self):
+        suffix = '.jsonl.gz' if self.compress else '.jsonl'
+        if self.path is None:
+            temp_fd, temp_file = tempfile.mkstemp(suffix=suffix, prefix=self.prefix)
+            os.close(temp_fd)
+            return temp_file
+        if not self.shards:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}_{len(self.shards) + 1:03d}{ext}"
+
+    def _rotate(self):
+        self._close_file()
+        path = self._next_path()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = gzip.open(path, 'wb', compresslevel=GZIP_LEVEL) if self.compress else open(path, 'wb')
+        self.shards.append([path, 0])
+        self.count = 0
+        self.size = 0
+
+    def write(self, request):
+        """
+        요청 하나를 씁니다 (요청 단위로만 샤드를 나눔).
+
+        Args:
+            request (dict | bytes): 요청 객체 또는 직렬화한 JSON 한 줄
+        """
+        line = request if isinstance(request, bytes) else orjson.dumps(request, option=orjson.OPT_APPEND_NEWLINE)
+        if (self.file is None
+                or (self.max_requests and self.count >= self.max_requests)
+                or (self.max_bytes and self.count and self.size + len(line) > self.max_bytes)):
+            self._rotate()
+        self.file.write(line)
+        self.count += 1
+        self.size += len(line)
+        self.total += 1
+        self.shards[-1][1] = self.count
+
+    def write_many(self, requests):
+        """여러 요청을 씁니다."""
+        for request in requests:
+            self.write(request)
+
+    def write_group(self, requests):
+        """
+        여러 요청을 같은 샤드에 씁니다 (한 기사의 청크 요청처럼 결과를 함께 모아야 하는 요청).
+        묶음이 현재 샤드의 제한을 넘으면 새 샤드에서 시작합니다.
+        """
+        lines = [request if isinstance(request, bytes) else orjson.dumps(request, option=orjson.OPT_APPEND_NEWLINE)
+                 for request in requests]
+        if not lines:
+            return
+        size = sum(len(line) for line in lines)
+        if (self.file is not None and self.count
+                and ((self.max_requests and self.count + len(lines) > self.max_requests)
+                     or (self.max_bytes and self.size + size > self.max_bytes))):
+            self._rotate()
+        if self.file is None:
+            self._rotate()
+        for line in lines:
+            self.file.write(line)
+            self.count += 1
+            self.size += len(line)
+            self.total += 1
+        self.shards[-1][1] = self.count
+
+    def _close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        """
+        파일을 닫고 만든 샤드 목록을 반환합니다.
+
+        Returns:
+            list: [(파일 경로, 요청 수)]
+        """
+        self._close_file()
+        return [tuple(shard) for shard in self.shards]
+
+    def remove_all(self):
+        """만든 샤드 파일을 모두 삭제합니다."""
+        self._close_file()
+        for path, _ in self.shards:
+            if os.path.exists(path):
+                os.remove(path)
+        self.shards = []
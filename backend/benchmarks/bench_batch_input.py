@@ -0,0 +1,137 @@
+"""
+임베딩 Batch 입력 파일 생성 벤치마크
+
+합성 news.db(기본 10만 개 기사)에서 임베딩 요청 JSONL을 만드는 시간을 비교합니다.
+- legacy: pd.read_sql_query(chunksize) + itertuples + json.dumps(ensure_ascii=False)
+- writer: SQLite 커서 + BatchRequestWriter(orjson)
+- writer+gzip: 위와 같고 gzip 압축
+두 방식의 출력이 같은지 먼저 확인합니다. backend 디렉토리에서 실행합니다.
+
+    python -m benchmarks.bench_batch_input --articles 100000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from batch_request_writer import BatchRequestWriter, embedding_request
+from embedding_batch import build_embedding_text, content_hash, EMBEDDING_TASK_TYPE, EMBEDDING_DIMENSIONALITY
+
+QUERY = "SELECT id, title, content, article_date FROM articles WHERE content IS NOT NULL AND content != '' AND article_date >= ? AND article_date < ?"
+WORDS = ['삼성전자', '반도체', '코스피', '환율', '금리', '외국인', '순매수', '실적', '영업이익', '전년', '대비', '증가', '하락',
+         '상승', '투자', '시장', '전망', '발표', '기관', '매도', '2차전지', '바이오', '수출', '물가', 'AI', 'HBM']
+
+def make_synthetic_db(path, articles, seed=0):
+    """article_date가 1년에 고르게 퍼진 합성 기사 DB를 만듭니다."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, article_date TEXT, URL TEXT)')
+    start = pd.Timestamp('2025-01-01')
+
+    def rows():
+        for i in range(articles):
+            title = ' '.join(rng.choices(WORDS, k=8))
+            content = ' '.join(rng.choices(WORDS, k=rng.randint(150, 500)))
+            date = (start + pd.Timedelta(days=i * 365 // articles)).strftime('%Y-%m-%d')
+            yield title, content, date, f"https://example.com/{i}"
+
+    conn.executemany('INSERT INTO articles (title, content, article_date, URL) VALUES (?, ?, ?, ?)', rows())
+    conn.commit()
+    conn.close()
+
+def build_legacy(db_path, out_path, chunk_size):
+    conn = sqlite3.connect(db_path)
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as f:
+        for chunk_df in pd.read_sql_query(QUERY, conn, params=('2000-01-01', '2100-01-01'), chunksize=chunk_size):
+            for row in chunk_df.itertuples():
+                text = build_embedding_text(row.title, row.content)
+                request = {
+                    "key": f"{row.id}_{row.article_date}_{content_hash(text)}",
+                    "request": {
+                        "task_type": EMBEDDING_TASK_TYPE,
+                        "output_dimensionality": EMBEDDING_DIMENSIONALITY,
+                        "content": {"parts": [{"text": text}]},
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+                count += 1
+    conn.close()
+    return [(out_path, count)]
+
+def build_writer(db_path, out_path, chunk_size, compress=False, max_requests=None):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute(QUERY, ('2000-01-01', '2100-01-01'))
+    with BatchRequestWriter(out_path, max_requests=max_requests, compress=compress) as writer:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for id, title, content, date in rows:
+                text = build_embedding_text(title, content)
+                writer.write(embedding_request(f"{id}_{date}_{content_hash(text)}", text, EMBEDDING_TASK_TYPE, EMBEDDING_DIMENSIONALITY))
+    conn.close()
+    return writer.close()
+
+def read_requests(shards):
+    for path, _ in shards:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+def measure(func, *args, **kwargs):
+    started = time.perf_counter()
+    shards = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    size = sum(os.path.getsize(path) for path, _ in shards)
+    return shards, elapsed, size
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch 입력 파일 생성 벤치마크')
+    parser.add_argument('--articles', type=int, default=100000, help='합성 기사 수')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='DB에서 한 번에 읽을 행 수')
+    parser.add_argument('--shard-requests', type=int, default=20000, help='샤드 측정 시 샤드당 최대 요청 수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_batch_input')
+    try:
+        run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run(args, workdir):
+    db_path = os.path.join(workdir, 'news.db')
+    print(f"합성 DB 생성 중... ({args.articles:,}개 기사)")
+    make_synthetic_db(db_path, args.articles)
+
+    cases = [
+        ('legacy', build_legacy, os.path.join(workdir, 'legacy.jsonl'), {}),
+        ('writer', build_writer, os.path.join(workdir, 'writer.jsonl'), {}),
+        ('writer+shard', build_writer, os.path.join(workdir, 'shard.jsonl'), {'max_requests': args.shard_requests}),
+        ('writer+gzip', build_writer, os.path.join(workdir, 'writer.jsonl.gz'), {'compress': True}),
+    ]
+    results = []
+    for name, func, out_path, kwargs in cases:
+        shards, elapsed, size = measure(func, db_path, out_path, args.chunk_size, **kwargs)
+        results.append((name, shards, elapsed, size))
+
+    # 모든 방식의 요청 내용이 같은지 확인
+    expected = list(read_requests(results[0][1]))
+    for name, shards, *_ in results[1:]:
+        assert list(read_requests(shards)) == expected, f"{name} 출력이 legacy와 다릅니다"
+
+    print(f"{'방식':<13} | {'시간(s)':>8} | {'요청/s':>10} | {'파일(MB)':>9} | {'샤드':>4}")
+    print("=" * 58)
+    for name, shards, elapsed, size in results:
+        print(f"{name:<13} | {elapsed:>8.2f} | {args.articles / elapsed:>10,.0f} | {size / 1e6:>9.1f} | {len(shards):>4}")
+
+if __name__ == '__main__':
+    main()
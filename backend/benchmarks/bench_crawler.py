@@ -0,0 +1,255 @@
+"""
+오프라인 크롤러 벤치마크
+
+로컬 HTTP 서버가 네이버 금융 뉴스와 같은 구조의 목록/기사 HTML을 제공하고,
+실제 crawler 코드(polite_get, parse, ArticleWriter, crawl_daily_news)를 그 서버에 대해 실행합니다.
+단계(fetch, parse, write, 전체)마다 별도 프로세스에서 실행해 처리량, CPU 시간, 최대 RSS를 측정합니다.
+backend 디렉토리에서 실행합니다.
+
+    python -m benchmarks.bench_crawler --days 2 --pages 3 --latency 0.05 --error-rate 0.01 --workers 1 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import psutil
+
+from benchmarks.fixtures import make_list_page_html, make_article_html
+
+class StubNewsServer:
+    """
+    목록/기사 페이지를 제공하는 로컬 HTTP 서버
+
+    /news/mainnews.naver?date=...&page=... 는 기사 링크 articles_per_page개가 든 목록 페이지를,
+    /article/<날짜>/<페이지>/<번호> 는 기사 페이지를 반환합니다.
+    오류(503)는 기사 페이지에만 주입합니다 (목록 페이지 오류는 브라우저 경로로 넘어가므로).
+    """
+    def __init__(self, pages_per_day=3, articles_per_page=20, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.pages_per_day = pages_per_day
+        self.articles_per_page = articles_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args): # 요청마다 로그를 남기지 않음
+                pass
+
+            def do_GET(self):
+                with server.random_lock:
+                    delay = max(0.0, server.latency + server.random.uniform(-server.jitter, server.jitter))
+                    failed = self.path.startswith('/article/') and server.random.random() < server.error_rate
+                time.sleep(delay) # 주입한 네트워크 지연
+                if failed:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = server.render(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def render(self, path):
+        parsed = urlparse(path)
+        if parsed.path == '/news/mainnews.naver':
+            query = parse_qs(parsed.query)
+            date_str, page = query['date'][0], int(query['page'][0])
+            urls = [f"{self.base_url}/article/{date_str}/{page}/{i}" for i in range(self.articles_per_page)]
+            return make_list_page_html(urls, page, self.pages_per_day).encode('utf-8')
+        if parsed.path.startswith('/article/'):
+            return make_article_html(zlib.crc32(parsed.path.encode())).encode('utf-8')
+        return None
+
+def _dates(days):
+    return [f"2025-09-{day + 1:02d}" for day in range(days)]
+
+def _configure_crawler(base_url, workers, rate):
+    import crawler
+    crawler.LIST_URL = base_url + '/news/mainnews.naver?date={date}&page={page}'
+    crawler.CRAWL_WORKERS = workers
+    crawler.HOST_RATE_LIMIT = crawler.HOST_MAX_RATE = rate
+    crawler.HOST_BURST = workers
+    crawler.known_urls = set()
+    return crawler
+
+def phase_fetch(args, base_url, workers):
+    """목록/기사 페이지를 가져오기만 합니다 (파싱/저장 없음)."""
+    crawler = _configure_crawler(base_url, workers, args.rate)
+    article_urls = [
+        f"{base_url}/article/{date_str}/{page}/{i}"
+        for date_str in _dates(args.days) for page in range(1, args.pages + 1) for i in range(args.per_page)
+    ]
+
+    def fetch(url, stage='fetch_article'):
+        try:
+            crawler.polite_get(url, stage)
+        except Exception:
+            pass
+
+    started = (time.perf_counter(), time.process_time())
+    for date_str in _dates(args.days):
+        for page in range(1, args.pages + 1):
+            fetch(crawler.LIST_URL.format(date=date_str, page=page), 'fetch_list')
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, article_urls))
+    return started, args.days * args.pages, len(article_urls)
+
+def phase_parse(args, base_url, workers):
+    """미리 만든 HTML을 파싱만 합니다."""
+    from news_parser import parse_list_page
+    crawler = _configure_crawler(base_url, workers, args.rate)
+    list_docs = [
+        make_list_page_html([f"{base_url}/article/{page}/{i}" for i in range(args.per_page)], page, args.pages)
+        for page in range(1, args.pages + 1)
+    ] * args.days
+    article_docs = [make_article_html(seed) for seed in range(len(list_docs) * args.per_page)]
+
+    started = (time.perf_counter(), time.process_time())
+    for document in list_docs:
+        parse_list_page(document)
+    for seed, document in enumerate(article_docs):
+        crawler.build_article_row(document, str(seed))
+    return started, len(list_docs), len(article_docs)
+
+def phase_write(args, base_url, workers):
+    """기사 행을 ArticleWriter로 저장만 합니다."""
+    from news_db import setup_database, ArticleWriter
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench_crawler'), 'news.db')
+    setup_database(db_path).close()
+    rows = [
+        (f"제목 {i}", make_article_html(i, comments=0), '2025-09-01', f"{base_url}/article/{i}")
+        for i in range(args.days * args.pages * args.per_page)
+    ]
+
+    started = (time.perf_counter(), time.process_time())
+    with ArticleWriter(db_path) as writer:
+        writer.put_many(rows)
+    return started, 0, len(rows)
+
+def phase_crawl(args, base_url, workers):
+    """crawl_daily_news로 목록 수집, 기사 수집, 파싱, 저장을 모두 실행합니다."""
+    import pandas as pd
+    from news_db import setup_database, ArticleWriter
+    crawler = _configure_crawler(base_url, workers, args.rate)
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench_crawler'), 'news.db')
+    setup_database(db_path).close()
+
+    started = (time.perf_counter(), time.process_time())
+    article_count = 0
+    with crawler.ListPageFetcher() as fetcher, ArticleWriter(db_path) as writer:
+        for date_str in _dates(args.days):
+            article_count += crawler.crawl_daily_news(pd.Timestamp(date_str), fetcher, writer)
+    return started, args.days * args.pages, article_count
+
+PHASES = {'fetch': phase_fetch, 'parse': phase_parse, 'write': phase_write, 'crawl': phase_crawl}
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError: # Windows
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+def _run_phase(name, args, base_url, workers, result_queue):
+    sys.stdout = open(os.devnull, 'w') # 크롤러 진행 로그는 측정에서 제외
+    import crawl_metrics
+    (wall_start, cpu_start), pages, articles = PHASES[name](args, base_url, workers)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    stages = {
+        stage: hist['sum'] / hist['count'] * 1000
+        for stage, hist in crawl_metrics.snapshot()['stages'].items() if hist['count']
+    }
+    result_queue.put({
+        'phase': name, 'workers': workers, 'wall': wall, 'cpu': cpu, 'pages': pages, 'articles': articles,
+        'peak_rss_mb': _peak_rss_mb(), 'stages': stages,
+    })
+
+def run_phase(name, args, base_url, workers):
+    """단계 하나를 새 프로세스에서 실행해 CPU 시간과 최대 RSS를 단계별로 분리해 측정합니다."""
+    ctx = multiprocessing.get_context('spawn')
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=_run_phase, args=(name, args, base_url, workers, result_queue))
+    process.start()
+    while True:
+        try:
+            result = result_queue.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"'{name}' 단계 프로세스가 결과 없이 종료되었습니다.")
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='오프라인 크롤러 벤치마크')
+    parser.add_argument('--days', type=int, default=2, help='크롤링할 날짜 수')
+    parser.add_argument('--pages', type=int, default=3, help='하루당 목록 페이지 수')
+    parser.add_argument('--per-page', type=int, default=20, help='목록 페이지당 기사 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='주입할 응답 지연 (초)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='응답 지연 변동 폭 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503을 반환할 비율 (0~1)')
+    parser.add_argument('--rate', type=float, default=1000.0, help='호스트당 요청 속도 상한 (초당)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='비교할 기사 동시 요청 수')
+    parser.add_argument('--phases', nargs='+', default=list(PHASES), choices=list(PHASES), help='측정할 단계')
+    args = parser.parse_args()
+
+    with StubNewsServer(args.pages, args.per_page, args.latency, args.jitter, args.error_rate) as server:
+        results = []
+        for name in args.phases:
+            # 파싱/저장은 동시 요청 수와 무관하므로 한 번만 측정
+            for workers in (args.workers if name in ('fetch', 'crawl') else args.workers[:1]):
+                results.append(run_phase(name, args, server.base_url, workers))
+
+    print(f"{'단계':<6} | {'동시요청':>6} | {'시간(s)':>8} | {'CPU(s)':>7} | {'페이지/s':>8} | {'기사/s':>8} | {'최대RSS(MB)':>11}")
+    print("=" * 80)
+    for r in results:
+        print(
+            f"{r['phase']:<6} | {r['workers']:>6} | {r['wall']:>8.2f} | {r['cpu']:>7.2f} | "
+            f"{r['pages'] / r['wall']:>8.1f} | {r['articles'] / r['wall']:>8.1f} | {r['peak_rss_mb']:>11.1f}"
+        )
+        if r['stages']:
+            print("         평균 " + ', '.join(f"{stage} {ms:.1f}ms" for stage, ms in r['stages'].items()))
+
+if __name__ == '__main__':
+    main()
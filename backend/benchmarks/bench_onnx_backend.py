@@ -0,0 +1,126 @@
+"""
+로컬 ONNX 임베딩 백엔드 벤치마크
+
+작은 ONNX 모델(임베딩 테이블 + 선형층 + tanh)과 WordLevel 토크나이저를 만들어
+네트워크 없이 OnnxEmbeddingBackend를 실행합니다. 길이가 제각각인 합성 텍스트로
+- sorted: 토큰 수로 정렬해 배치마다 최대 길이까지만 패딩 (백엔드 기본 동작)
+- unsorted: 입력 순서대로 배치
+의 처리량을 비교하고, 두 방식의 임베딩이 같은지 먼저 확인합니다. backend 디렉토리에서 실행합니다.
+
+    python -m benchmarks.bench_onnx_backend --texts 5000
+
+모델 생성에는 onnx 패키지가 필요합니다.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_backend import OnnxEmbeddingBackend
+
+WORDS = ['삼성전자', '반도체', '코스피', '환율', '금리', '외국인', '순매수', '실적', '영업이익', '전년', '대비', '증가', '하락',
+         '상승', '투자', '시장', '전망', '발표', '기관', '매도', '2차전지', '바이오', '수출', '물가', 'AI', 'HBM']
+
+def make_tiny_model(workdir, hidden=32, seed=0):
+    """
+    테스트용 ONNX 모델과 tokenizer.json을 만듭니다.
+    모델 입력은 input_ids, attention_mask이고 출력은 패딩 위치가 0인 (batch, seq, hidden) 토큰 임베딩입니다.
+
+    Returns:
+        tuple: (모델 경로, 토크나이저 경로)
+    """
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    vocab = {'[PAD]': 0, '[UNK]': 1}
+    for word in WORDS:
+        vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token='[UNK]'))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer_path = os.path.join(workdir, 'tokenizer.json')
+    tokenizer.save(tokenizer_path)
+
+    rng = np.random.default_rng(seed)
+    nodes = [
+        helper.make_node('Gather', ['token_table', 'input_ids'], ['token_embeddings']),
+        helper.make_node('MatMul', ['token_embeddings', 'projection'], ['projected']),
+        helper.make_node('Tanh', ['projected'], ['activated']),
+        helper.make_node('Cast', ['attention_mask'], ['mask_float'], to=TensorProto.FLOAT),
+        helper.make_node('Unsqueeze', ['mask_float', 'mask_axes'], ['mask_expanded']),
+        helper.make_node('Mul', ['activated', 'mask_expanded'], ['last_hidden_state']),
+    ]
+    graph = helper.make_graph(
+        nodes, 'tiny_embedding',
+        inputs=[
+            helper.make_tensor_value_info('input_ids', TensorProto.INT64, ['batch', 'sequence']),
+            helper.make_tensor_value_info('attention_mask', TensorProto.INT64, ['batch', 'sequence']),
+        ],
+        outputs=[helper.make_tensor_value_info('last_hidden_state', TensorProto.FLOAT, ['batch', 'sequence', hidden])],
+        initializer=[
+            numpy_helper.from_array(rng.standard_normal((len(vocab), hidden)).astype(np.float32), 'token_table'),
+            numpy_helper.from_array((rng.standard_normal((hidden, hidden)) / np.sqrt(hidden)).astype(np.float32), 'projection'),
+            numpy_helper.from_array(np.array([2], dtype=np.int64), 'mask_axes'),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 17)], ir_version=8) # 예전 onnxruntime에서도 읽히도록 IR 버전 고정
+    onnx.checker.check_model(model)
+    model_path = os.path.join(workdir, 'tiny_embedding.onnx')
+    onnx.save(model, model_path)
+    return model_path, tokenizer_path
+
+def make_texts(count, seed=0):
+    """뉴스 기사처럼 길이가 제각각인 합성 텍스트"""
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(WORDS, k=rng.choice([rng.randint(20, 80), rng.randint(200, 500)]))) for _ in range(count)]
+
+def embed_unsorted(backend, texts):
+    """정렬하지 않고 입력 순서대로 배치"""
+    encodings = backend.tokenizer.encode_batch(texts)
+    return np.vstack([backend._run(encodings[i:i + backend.batch_size]) for i in range(0, len(encodings), backend.batch_size)])
+
+def measure(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 ONNX 임베딩 백엔드 벤치마크')
+    parser.add_argument('--texts', type=int, default=5000, help='합성 텍스트 수')
+    parser.add_argument('--batch-size', type=int, default=32, help='한 번에 모델에 넣을 텍스트 수')
+    parser.add_argument('--threads', type=int, default=None, help='intra-op 스레드 수 (기본: CPU 코어 수)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_onnx_backend')
+    try:
+        run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run(args, workdir):
+    model_path, tokenizer_path = make_tiny_model(workdir)
+    backend = OnnxEmbeddingBackend(model_path, tokenizer_path, batch_size=args.batch_size, num_threads=args.threads)
+    texts = make_texts(args.texts)
+    print(f"모델 '{backend.model_name}' ({backend.dimensionality}차원), 텍스트 {len(texts):,}개, 배치 {args.batch_size}")
+
+    sorted_embeddings, sorted_elapsed = measure(backend.embed, texts)
+    unsorted_embeddings, unsorted_elapsed = measure(embed_unsorted, backend, texts)
+
+    # 정렬 여부와 패딩 길이가 임베딩 값에 영향을 주지 않는지 확인
+    assert sorted_embeddings.dtype == np.float32 and sorted_embeddings.shape == (len(texts), backend.dimensionality)
+    assert np.allclose(sorted_embeddings, unsorted_embeddings, atol=1e-5), "정렬한 배치와 입력 순서 배치의 임베딩이 다릅니다"
+    assert np.allclose(backend.embed(texts[:1])[0], sorted_embeddings[0], atol=1e-5), "단독 실행 결과가 배치 결과와 다릅니다"
+
+    print(f"{'방식':<9} | {'시간(s)':>8} | {'텍스트/s':>10}")
+    print("=" * 34)
+    for name, elapsed in (('sorted', sorted_elapsed), ('unsorted', unsorted_elapsed)):
+        print(f"{name:<9} | {elapsed:>8.2f} | {len(texts) / elapsed:>10,.0f}")
+
+if __name__ == '__main__':
+    main()
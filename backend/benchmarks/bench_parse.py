@@ -0,0 +1,84 @@
+"""
+목록/기사 페이지 HTML 추출 마이크로 벤치마크
+
+기존 BeautifulSoup(html.parser) 방식과 news_parser(lxml) 방식의 문서당 파싱 시간을 비교합니다.
+backend 디렉토리에서 실행합니다.
+
+    python -m benchmarks.bench_parse                       # 생성된 HTML로 측정
+    python -m benchmarks.bench_parse --list a.html --article b.html c.html   # 저장된 HTML로 측정
+"""
+import argparse
+import time
+from bs4 import BeautifulSoup
+
+from news_parser import parse_list_page, parse_article_page
+from benchmarks.fixtures import make_list_page_html, make_article_html
+
+def legacy_parse_list(html):
+    """기존 crawl_onePage + check_last_page 방식 (같은 문서를 두 번 파싱)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    urls = [a.get('href') for a in soup.select("dd.articleSubject a") if a.get('href')]
+    soup = BeautifulSoup(html, 'html.parser')
+    td_tags = soup.select('table[summary="페이지 네비게이션 리스트"] tr td')
+    is_last = True if not td_tags else 'on' in td_tags[-1].get('class', [])
+    return urls, is_last
+
+def legacy_parse_article(html):
+    """기존 crawl_naver_news_article 방식 (문서 전체 파싱)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title_tag = soup.select_one("h2#title_area")
+    title = title_tag.get_text(strip=True) if title_tag else None
+    content_tag = soup.select_one('article#dic_area')
+    content = None
+    if content_tag:
+        for photo_tag in content_tag.select('span.end_photo_org'):
+            photo_tag.decompose()
+        content = content_tag.get_text(strip=True)
+    date_tag = soup.select_one('span.media_end_head_info_datestamp_time._ARTICLE_DATE_TIME')
+    date = date_tag.get('data-date-time') if date_tag else None
+    return title, content, date
+
+def measure(func, documents, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            func(document)
+    return (time.perf_counter() - start) / (repeat * len(documents)) * 1000
+
+def read_files(paths):
+    documents = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            documents.append(f.read().decode('utf-8', errors='replace'))
+    return documents
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 추출 마이크로 벤치마크')
+    parser.add_argument('--list', nargs='*', default=[], help='저장된 목록 페이지 HTML 파일')
+    parser.add_argument('--article', nargs='*', default=[], help='저장된 기사 페이지 HTML 파일')
+    parser.add_argument('--repeat', type=int, default=20, help='반복 횟수')
+    args = parser.parse_args()
+
+    list_docs = read_files(args.list) or [
+        make_list_page_html([f'https://n.news.naver.com/article/{p}{i}' for i in range(20)], p) for p in range(1, 6)
+    ]
+    article_docs = read_files(args.article) or [make_article_html(seed) for seed in range(20)]
+
+    # 두 방식의 추출 결과가 같은지 먼저 확인
+    for document in list_docs:
+        assert tuple(parse_list_page(document)) == legacy_parse_list(document), '목록 페이지 추출 결과 불일치'
+    for document in article_docs:
+        assert tuple(parse_article_page(document)) == legacy_parse_article(document), '기사 페이지 추출 결과 불일치'
+
+    print(f"{'문서':<8} | {'BeautifulSoup (ms)':>18} | {'lxml (ms)':>10} | {'속도 향상':>8}")
+    print("=" * 56)
+    for name, legacy, fast, documents in (
+        ('목록', legacy_parse_list, parse_list_page, list_docs),
+        ('기사', legacy_parse_article, parse_article_page, article_docs),
+    ):
+        legacy_ms = measure(legacy, documents, args.repeat)
+        fast_ms = measure(fast, documents, args.repeat)
+        print(f"{name:<8} | {legacy_ms:>18.3f} | {fast_ms:>10.3f} | {legacy_ms / fast_ms:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+벤치마크용 네이버 금융 뉴스 HTML 생성기
+
+실제 페이지와 같은 구조(목록의 dd.articleSubject, 페이지 네비게이션 테이블,
+기사의 h2#title_area / article#dic_area / 작성일 span, 댓글·푸터 영역)를 가진
+HTML을 만들어 네트워크 없이 파서와 크롤러를 측정할 수 있게 합니다.
+"""
+import random
+
+_WORDS = ['코스피', '반도체', '금리', '환율', '외국인', '순매수', '실적', '전망', '증권', '투자',
+          '상승', '하락', '기관', '시장', '발표', '수출', '원화', '채권', '배터리', '인공지능']
+
+def _sentence(rng, n_words=12):
+    return ' '.join(rng.choice(_WORDS) for _ in range(n_words)) + '.'
+
+def make_list_page_html(article_urls, nth_page=1, last_page=10):
+    """
+    기사 목록 페이지 HTML을 만듭니다.
+
+    Args:
+        article_urls (list): 목록에 넣을 기사 링크
+        nth_page (int): 현재 페이지 번호
+        last_page (int): 마지막 페이지 번호
+    """
+    items = ''.join(
+        f'<dl><dt class="thumb"><a href="{url}"><img src="t.jpg"></a></dt>'
+        f'<dd class="articleSubject"><a href="{url}">기사 제목 {i}</a></dd>'
+        f'<dd class="articleSummary">요약 {i}<span class="press">언론사</span></dd></dl>'
+        for i, url in enumerate(article_urls)
+    )
+    tds = ''.join(
+        f'<td class="on"><a href="?page={p}">{p}</a></td>' if p == nth_page else f'<td><a href="?page={p}">{p}</a></td>'
+        for p in range(1, last_page + 1)
+    )
+    return (
+        '<html><head><meta charset="utf-8"><title>주요뉴스</title>'
+        + '<script>var x = 1;</script>' * 20
+        + '</head><body><div id="header">' + '<a href="#">메뉴</a>' * 50 + '</div>'
+        + f'<div class="mainNewsList"><ul class="newsList">{items}</ul></div>'
+        + f'<table summary="페이지 네비게이션 리스트"><tr>{tds}</tr></table>'
+        + '<div id="footer">' + '<p>푸터</p>' * 50 + '</div></body></html>'
+    )
+
+def make_article_html(seed, paragraphs=15, comments=200):
+    """
+    기사 본문 페이지 HTML을 만듭니다.
+
+    Args:
+        seed (int): 본문 생성 시드 (같은 시드는 같은 기사)
+        paragraphs (int): 본문 문단 수
+        comments (int): 본문 뒤에 붙는 댓글/관련기사 요소 수
+    """
+    rng = random.Random(seed)
+    body = '<br>'.join(_sentence(rng, 30) for _ in range(paragraphs))
+    photo = '<span class="end_photo_org"><img src="p.jpg"><em class="img_desc">사진 설명</em></span>'
+    return (
+        '<html><head><meta charset="utf-8"><title>기사</title>'
+        + '<script>var data = {"a": 1};</script>' * 30
+        + '</head><body><div id="ct"><div class="media_end_head">'
+        + f'<h2 id="title_area" class="media_end_head_headline"><span>{_sentence(rng, 8)}</span></h2>'
+        + '<div class="media_end_head_info_datestamp"><span class="media_end_head_info_datestamp_time _ARTICLE_DATE_TIME" '
+        + f'data-date-time="2025-09-{seed % 28 + 1:02d} 09:30:00">2025.09.{seed % 28 + 1:02d}. 오전 9:30</span></div></div>'
+        + f'<article id="dic_area" class="go_trans _article_content">{photo}{body}</article></div>'
+        + '<div class="comment">' + ''.join(f'<div class="u_cbox"><span>댓글 {i}</span><p>{_sentence(rng)}</p></div>' for i in range(comments)) + '</div>'
+        + '<div id="footer">' + '<p>푸터</p>' * 100 + '</div></body></html>'
+    )
@@ -80,6 +80,26 @@ filter_condition = { "article_date": { "$in": target_dates } }
 data = collection.get(where=filter_condition, include=["embeddings"])
 ids = np.array(data["ids"])
 raw_embeddings = np.array(data["embeddings"])
+
+# 근접 중복 기사(canonical_id가 있는 기사)는 대표 기사만 남기고 제외
+def load_duplicate_ids():
+    if not os.path.exists(NEWS_DB_PATH):
+        return set()
+    conn_news = sqlite3.connect(NEWS_DB_PATH)
+    columns = [info[1] for info in conn_news.execute("PRAGMA table_info(articles)")]
+    if 'canonical_id' not in columns:
+        conn_news.close()
+        return set()
+    duplicate_ids = {str(row[0]) for row in conn_news.execute("SELECT id FROM articles WHERE canonical_id IS NOT NULL")}
+    conn_news.close()
+    return duplicate_ids
+
+duplicate_ids = load_duplicate_ids()
+if duplicate_ids:
+    keep_mask = np.array([article_id not in duplicate_ids for article_id in ids], dtype=bool)
+    print(f"   -> 근접 중복 기사 {int((~keep_mask).sum())}개 제외")
+    ids = ids[keep_mask]
+    raw_embeddings = raw_embeddings[keep_mask]
 # 정규화
 embeddings = normalize(raw_embeddings, axis=1, norm='l2')
 n_samples = len(ids)
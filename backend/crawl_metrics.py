@@ -0,0 +1,146 @@
+import threading, time, json #지표 집계 라이브러리
+from contextlib import contextmanager
+from prometheus_client import start_http_server, REGISTRY #Prometheus 노출 라이브러리
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+# 단계별 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+
+def _empty_state():
+    return {
+        'started_at': time.time(),
+        'articles': 0,
+        'stages': {},         # {단계: {'buckets': [구간별 개수], 'count': 개수, 'sum': 합계}}
+        'http_status': {},    # {상태 코드: 개수}
+        'parse_failures': {}, # {'No Title Found' 등: 개수}
+        'queue_depth': {},    # {큐 이름: 현재 길이}
+    }
+
+_state = _empty_state()
+
+def observe(stage, seconds):
+    """단계(fetch_list, fetch_article, parse_list, parse_article, write)의 소요 시간을 기록합니다."""
+    with _lock:
+        hist = _state['stages'].setdefault(stage, {'buckets': [0] * len(LATENCY_BUCKETS), 'count': 0, 'sum': 0.0})
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist['buckets'][i] += 1
+                break
+        hist['count'] += 1
+        hist['sum'] += seconds
+
+@contextmanager
+def timed(stage):
+    """with 블록의 소요 시간을 해당 단계에 기록합니다."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+def _increment(key, label, amount=1):
+    with _lock:
+        _state[key][label] = _state[key].get(label, 0) + amount
+
+def count_status(status):
+    """HTTP 응답 상태 코드를 집계합니다 (네트워크 오류는 'error')."""
+    _increment('http_status', str(status) if status is not None else 'error')
+
+def count_parse_failure(kind):
+    """파싱 실패('No Title Found', 'No Content Found', 'No Date Found')를 집계합니다."""
+    _increment('parse_failures', kind)
+
+def count_articles(n):
+    """크롤링한 기사 수를 더합니다."""
+    with _lock:
+        _state['articles'] += n
+
+def set_queue_depth(name, depth):
+    """큐의 현재 길이를 기록합니다."""
+    with _lock:
+        _state['queue_depth'][name] = depth
+
+def snapshot(reset=False):
+    """
+    현재까지의 지표를 dict로 반환합니다.
+
+    Args:
+        reset (bool): True이면 반환 후 지표를 초기화 (백필 워커가 증분을 보낼 때 사용)
+    """
+    global _state
+    with _lock:
+        data = json.loads(json.dumps(_state))
+        if reset:
+            _state = _empty_state()
+    elapsed = max(time.time() - data['started_at'], 1e-9)
+    data['elapsed_seconds'] = elapsed
+    data['articles_per_sec'] = data['articles'] / elapsed
+    return data
+
+def merge_snapshot(data):
+    """다른 프로세스(백필 워커)에서 받은 지표 증분을 합칩니다."""
+    with _lock:
+        _state['articles'] += data['articles']
+        for stage, other in data['stages'].items():
+            hist = _state['stages'].setdefault(stage, {'buckets': [0] * len(LATENCY_BUCKETS), 'count': 0, 'sum': 0.0})
+            hist['buckets'] = [a + b for a, b in zip(hist['buckets'], other['buckets'])]
+            hist['count'] += other['count']
+            hist['sum'] += other['sum']
+        for key in ('http_status', 'parse_failures'):
+            for label, amount in data[key].items():
+                _state[key][label] = _state[key].get(label, 0) + amount
+
+def dump_json(path):
+    """지표를 JSON 파일로 저장합니다."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+
+def format_summary():
+    """진행 상황 출력용 한 줄 요약을 반환합니다."""
+    data = snapshot()
+    stages = ', '.join(
+        f"{stage} {hist['sum'] / hist['count'] * 1000:.0f}ms" for stage, hist in data['stages'].items() if hist['count']
+    )
+    return f"기사 {data['articles']}개 ({data['articles_per_sec']:.2f}개/초), 평균 {stages}"
+
+class _CrawlCollector:
+    """집계한 지표를 Prometheus 형식으로 노출하는 collector"""
+    def collect(self):
+        data = snapshot()
+        articles = CounterMetricFamily('crawler_articles', '크롤링한 기사 수')
+        articles.add_metric([], data['articles'])
+        yield articles
+
+        latency = HistogramMetricFamily('crawler_stage_seconds', '단계별 소요 시간', labels=['stage'])
+        for stage, hist in data['stages'].items():
+            cumulative, buckets = 0, []
+            for bound, count in zip(LATENCY_BUCKETS, hist['buckets']):
+                cumulative += count
+                buckets.append((str(bound), cumulative))
+            buckets.append(('+Inf', hist['count']))
+            latency.add_metric([stage], buckets, hist['sum'])
+        yield latency
+
+        status = CounterMetricFamily('crawler_http_responses', 'HTTP 응답 상태별 개수', labels=['status'])
+        for label, count in data['http_status'].items():
+            status.add_metric([label], count)
+        yield status
+
+        failures = CounterMetricFamily('crawler_parse_failures', '파싱 실패 개수', labels=['kind'])
+        for label, count in data['parse_failures'].items():
+            failures.add_metric([label], count)
+        yield failures
+
+        depth = GaugeMetricFamily('crawler_queue_depth', '큐 길이', labels=['queue'])
+        for label, value in data['queue_depth'].items():
+            depth.add_metric([label], value)
+        yield depth
+
+REGISTRY.register(_CrawlCollector())
+
+def start_metrics_server(port):
+    """Prometheus가 수집할 수 있도록 /metrics HTTP 서버를 시작합니다."""
+    start_http_server(port)
+    print(f"크롤러 지표를 http://localhost:{port}/metrics 에서 제공합니다.")
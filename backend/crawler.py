@@ -1,15 +1,21 @@
 import requests #기사본문 크롤링 라이브러리
 from playwright.sync_api import sync_playwright #기사목록 크롤링 라이브러리
-from bs4 import BeautifulSoup #HTML 파싱 라이브러리
 from datetime import datetime #날짜처리 라이브러리
 import time, random #딜레이처리 라이브러리
+import threading #동시 요청 처리 라이브러리
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 import sqlite3 #DB처리 라이브러리
 import pandas as pd #날짜범위처리 라이브러리
+import multiprocessing, queue #병렬 백필 처리 라이브러리
+import argparse
+from news_parser import parse_list_page, parse_article_page #HTML 추출 모듈
+from throttle import AdaptiveRateLimiter #요청 속도 제어 모듈
+import crawl_metrics #크롤러 지표 모듈
+from html_archive import HtmlArchive #원본 HTML 보관 모듈
+from news_db import DB_PATH, setup_database, connect_news_db, load_known_urls, load_crawl_state, load_failed_urls, ArticleWriter #DB 저장 모듈
 
-DB_PATH = 'data/news.db' # 데이터베이스 파일 경로
-
-conn=None
-cur=None
+LIST_URL = 'https://finance.naver.com/news/mainnews.naver?date={date}&page={page}' # 기사 목록 페이지 주소
 
 # 다양한 User-Agent 리스트
 user_agents = [
@@ -21,99 +27,121 @@ user_agents = [
 
 
 crawled_news=0 # 크롤링한 뉴스 기사 수
+known_urls=set() # DB에 이미 저장된 기사 URL (요청 전 중복 제거용)
+archive=None # 원본 HTML 보관소 (--archive 옵션을 줄 때만 사용)
+
+CRAWL_WORKERS = 4 # 기사 본문 동시 요청 수 (1이면 순차 처리)
+# 기존 크롤러는 요청마다 0.5~2초를 쉬며 순차로 요청해 응답 시간까지 더하면 호스트당 초당 1건보다 적었음
+# 병렬 요청으로 바꾼 뒤에도 서버 부하가 그보다 커지지 않도록 시작 속도와 최고 속도를 초당 1건으로 둠
+HOST_RATE_LIMIT = 1.0 # 호스트당 시작 요청 속도 (초당 요청 수)
+HOST_MIN_RATE = 0.2 # 서버가 느리거나 오류를 낼 때 내려갈 수 있는 최저 속도
+HOST_MAX_RATE = 1.0 # 서버가 여유로울 때 올라갈 수 있는 최고 속도 (시작 속도보다 높이지 않음)
+HOST_BURST = 1 # 호스트당 연속으로 허용되는 요청 수
+BACKFILL_WORKERS = 4 # 병렬 백필 시 기본 워커 프로세스 수
+VERBOSE = False # True이면 기사 URL/제목/본문을 모두 출력 (디버그용)
+LIVE_POLL_INTERVAL = 120 # 실시간 모드에서 오늘 목록 1페이지를 다시 확인하는 간격 (초)
+LIVE_MAX_PAGES = 10 # 실시간 모드에서 한 번에 따라갈 최대 목록 페이지 수
+LIVE_FLUSH_INTERVAL = 1.0 # 실시간 모드의 DB 커밋 간격 (초)
+LIVE_EMPTY_RENDER_AFTER = 3 # 실시간 모드에서 정적 목록이 연속으로 이 횟수만큼 비면 브라우저로 한 번 확인
 
 def get_random_headers():
     return {
         'User-Agent': random.choice(user_agents)
     }
 
+_host_limiters = {}
+_host_limiters_lock = threading.Lock()
+_thread_local = threading.local()
 
+def get_host_limiter(url):
+    """URL의 호스트에 해당하는 속도 제어기를 반환합니다 (목록/기사 요청이 함께 사용)."""
+    host = urlparse(url).netloc
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(HOST_RATE_LIMIT, HOST_BURST, min_rate=HOST_MIN_RATE, max_rate=HOST_MAX_RATE)
+            _host_limiters[host] = limiter
+        return limiter
 
-def setup_database():
-    """데이터베이스와 테이블이 없으면 생성합니다."""
-    local_conn = sqlite3.connect(DB_PATH)
-    local_cur = local_conn.cursor()
-    local_cur.execute('''
-        CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            content TEXT,
-            article_date TEXT,
-            URL TEXT
-        )
-    ''')
-    local_conn.commit()
-    print(f"데이터베이스 '{DB_PATH}' 준비 완료.")
-    return local_conn
-
-def close_database():
-    """데이터베이스 연결을 닫습니다."""
-    global conn
-    conn.close()
-    print(f"데이터베이스 '{DB_PATH}' 연결 종료.")
-    
-def save_daily_articles_to_db(articles_list):
+def format_rates():
+    """호스트별 현재 요청 속도를 문자열로 반환합니다."""
+    with _host_limiters_lock:
+        return ', '.join(f"{host} {limiter.current_rate:.2f}/s" for host, limiter in _host_limiters.items())
+
+def polite_get(url, stage='fetch_article'):
     """
-    하루치 기사 데이터 리스트 전체를 DB에 저장합니다.
+    호스트별 속도 제어를 거쳐 GET 요청을 보내고, 응답 상태와 지연 시간을 속도 제어기와 지표에 반영합니다.
+
+    Args:
+        url (str): 요청할 주소
+        stage (str): 지표에 기록할 단계 이름 (fetch_article 또는 fetch_list)
+
+    Raises:
+        requests.exceptions.RequestException: 요청 실패 또는 오류 응답
     """
-    if not articles_list:
-        print("저장할 새로운 기사가 없습니다.")
-        return 0
-    
-    global conn
-    global cur
-    
+    limiter = get_host_limiter(url)
+    limiter.acquire()
+    started = time.monotonic()
     try:
-        sql = '''
-            INSERT OR IGNORE INTO articles (title, content, article_date, URL) 
-            VALUES (?, ?, ?, ?)
-        '''
-        cur.executemany(sql, articles_list)
-        conn.commit()
-        print(f"--- 총 {len(articles_list)}개 기사를 DB에 성공적으로 저장했습니다. ---")
-        return len(articles_list)
-    except Exception as e:
-        print(f"!!! DB 저장 중 오류 발생: {e}")
-        return 0
-    
-def crawl_naver_news_article(url):
-        
-    try:
-        headers = get_random_headers()
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        response.encoding='utf-8'
-        
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        title_tag= soup.select_one("h2#title_area")
-        title=title_tag.get_text(strip=True) if title_tag else 'No Title Found'
-        content_tag=soup.select_one('article#dic_area')
-        
-        if content_tag:
-            for photo_tag in content_tag.select('span.end_photo_org'):
-                photo_tag.decompose()
-            content=content_tag.get_text(strip=True) 
-        else:
-            content='No Content Found'
-        
-        date_tag=soup.select_one('span.media_end_head_info_datestamp_time._ARTICLE_DATE_TIME') 
-        date=date_tag.get('data-date-time') if date_tag else 'No Date Found'
-        date_only=date.split(' ')[0] if date != 'No Date Found' else date
-       
+        response = get_session().get(url, headers=get_random_headers(), timeout=10)
+    except requests.exceptions.RequestException:
+        limiter.record(None, time.monotonic() - started)
+        crawl_metrics.count_status(None)
+        raise
+    latency = time.monotonic() - started
+    limiter.record(response.status_code, latency, response.headers.get('Retry-After'))
+    crawl_metrics.observe(stage, latency)
+    crawl_metrics.count_status(response.status_code)
+    response.raise_for_status()
+    return response
+
+def get_session():
+    """스레드별 requests 세션을 반환합니다 (커넥션 재사용)."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+
+def build_article_row(html, url):
+    """
+    기사 페이지 HTML에서 (title, content, date_only, url) 행을 만듭니다.
+    크롤링과 보관된 HTML 재추출이 같은 로직을 사용합니다.
+    """
+    with crawl_metrics.timed('parse_article'):
+        article = parse_article_page(html)
+    title=article.title if article.title is not None else 'No Title Found'
+    content=article.content if article.content is not None else 'No Content Found'
+    date=article.date if article.date else 'No Date Found'
+    date_only=date.split(' ')[0] if date != 'No Date Found' else date
+    for value in (title, content, date):
+        if value in ('No Title Found', 'No Content Found', 'No Date Found'):
+            crawl_metrics.count_parse_failure(value) # 사이트 구조 변경 감지용
+
+    if VERBOSE:
         print("="*50)
         print(f"기사 제목: {title}")
         print("="*50)
         print(f"기사 본문:\n{content}")
         print("="*50)
         print(f"기사 작성일: {date}")
-        return (
-            title,
-            content,
-            date_only,
-            url
-        )
+    return (
+        title,
+        content,
+        date_only,
+        url
+    )
+
+def crawl_naver_news_article(url):
+        
+    try:
+        response = polite_get(url) # 호스트별 속도 제어
+        response.encoding='utf-8'
+        if archive is not None:
+            archive.store(url, 'article', response.content)
+        return build_article_row(response.text, url)
         
     except requests.exceptions.RequestException as e:
         print(f"!!! HTTP 요청 오류 발생: {e}")
@@ -123,74 +151,553 @@ def crawl_naver_news_article(url):
         return None
 
     
-def crawl_onePage(html):
+def fetch_article(link):
+    """기사 하나를 가져옵니다. 실패 시 대기는 호스트 속도 제어기가 담당합니다."""
+    if VERBOSE:
+        print(f"크롤링 중인 URL: {link}")
+    return crawl_naver_news_article(link)
+
+def crawl_onePage(urls, max_workers=None, failed=None):
+    """
+    목록 페이지의 기사들을 크롤링합니다.
+
+    Args:
+        urls (list): 목록 페이지에서 추출한 기사 링크 (parse_list_page(html).urls)
+        max_workers (int): 동시에 요청할 기사 수 (1이면 순차 처리, 없으면 CRAWL_WORKERS)
+        failed (list): 가져오지 못한 기사 URL을 추가할 리스트
+
+    Returns:
+        list: (title, content, date_only, url) 튜플 리스트 (목록 순서 유지)
+    """
     global crawled_news 
-    soup = BeautifulSoup(html, 'html.parser')
-    a_tags = soup.select("dd.articleSubject a")
-    urls = [a.get('href') for a in a_tags if a.get('href')]
+    if max_workers is None:
+        max_workers = CRAWL_WORKERS
+    urls = list(dict.fromkeys(urls)) # 한 페이지 안의 중복 URL 제거 (순서 유지)
+    new_urls = [url for url in urls if url not in known_urls] # 이미 저장된 기사는 요청하지 않음
+    if len(new_urls) < len(urls):
+        print(f"이미 저장된 기사 {len(urls) - len(new_urls)}개를 건너뜁니다.")
+    urls = new_urls
     all_articles_for_onePage = [] # 한 페이지 기사 데이터를 저장할 리스트
-    for link in urls:
-        print(f"크롤링 중인 URL: {link}")
-        article_data = crawl_naver_news_article(link)
-        if article_data==None:
-            time.sleep(random.uniform(3, 5))  # 3~5초 랜덤 딜레이
+
+    if max_workers <= 1:
+        results = map(fetch_article, urls)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch_article, urls))
+
+    for url, article_data in zip(urls, results):
+        if article_data is None:
+            if failed is not None:
+                failed.append(url)
             continue
         all_articles_for_onePage.append(article_data)
+        known_urls.add(article_data[3])
         crawled_news += 1
-        print(f"현재까지 크롤링한 뉴스 기사 수: {crawled_news}")
-        time.sleep(random.uniform(0.5, 2))  # 1~4초 랜덤 딜레이
+    crawl_metrics.count_articles(len(all_articles_for_onePage))
+    print(f"현재까지 크롤링한 뉴스 기사 수: {crawled_news}")
 
     return all_articles_for_onePage
 
-def check_last_page(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    td_tags = soup.select('table[summary="페이지 네비게이션 리스트"] tbody tr td')  # '다음' 버튼 선택
-    if not td_tags:
-        return True  # 페이지 버튼이 없으면 마지막 페이지로 간주
-    last_td = td_tags[-1]
-    # 마지막 td의 class가 'on'이면 마지막 페이지
-    return 'on' in last_td.get('class', [])
+class ListPageFetcher:
+    """
+    기사 목록 페이지를 가져오는 클래스
+    
+    정적 HTML(HTTP 요청)을 먼저 시도하고, 기사 목록이 없을 때만 브라우저로 렌더링합니다.
+    브라우저는 처음 필요할 때 한 번만 실행되어 날짜 범위 전체에서 재사용됩니다.
+    """
+    def __init__(self, use_http=True, empty_render_after=None):
+        """
+        Args:
+            use_http (bool): 정적 HTML 요청을 먼저 시도할지 여부
+            empty_render_after (int): 정적 HTML에 기사 목록이 없어도 이 횟수 연속까지는 브라우저 없이 빈 목록으로 반환
+                (None이면 바로 브라우저로 렌더링, 실시간 모드에서 자정 직후처럼 아직 기사가 없는 목록을
+                매번 렌더링하며 기다리지 않도록 사용)
+        """
+        self.use_http = use_http
+        self.empty_render_after = empty_render_after
+        self.empty_streak = 0 # 정적 HTML에 기사 목록이 없었던 연속 횟수
+        self.playwright = None
+        self.browser = None
+        self.page = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _fetch_static(self, url):
+        """HTTP 요청으로 목록 페이지를 가져옵니다. 요청이 실패하면 None을 반환합니다."""
+        try:
+            response = polite_get(url, stage='fetch_list')
+        except requests.exceptions.RequestException as e:
+            print(f"!!! 목록 페이지 HTTP 요청 오류 발생: {e}")
+            return None
+        if archive is not None:
+            archive.store(url, 'list', response.content)
+        return response.content # 인코딩은 HTML의 meta charset으로 판단
+
+    def _fetch_rendered(self, url):
+        """브라우저로 목록 페이지를 렌더링합니다. 브라우저는 재사용됩니다."""
+        if self.page is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=True) # 크로미움 브라우저 실행
+            self.page = self.browser.new_page()   # 새 페이지 열기
+        limiter = get_host_limiter(url) # 브라우저 요청도 같은 속도 제어기를 사용
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = self.page.goto(url)
+        except Exception:
+            limiter.record(None, time.monotonic() - started)
+            crawl_metrics.count_status(None)
+            raise
+        status = response.status if response else 200
+        limiter.record(status, time.monotonic() - started)
+        crawl_metrics.count_status(status)
+        self.page.wait_for_selector("dd.articleSubject a")  # 요소가 로드될 때까지 대기
+        crawl_metrics.observe('fetch_list', time.monotonic() - started)
+        html = self.page.content() # 페이지 HTML 가져오기
+        if archive is not None:
+            archive.store(url, 'list', html.encode('utf-8'))
+        return html
+
+    def fetch(self, date_str, nth_page):
+        """
+        목록 페이지 HTML을 가져옵니다.
+
+        Args:
+            date_str (str): 날짜 (YYYY-MM-DD 형식)
+            nth_page (int): 페이지 번호
+
+        Returns:
+            str | bytes: 목록 페이지 HTML
+        """
+        url = LIST_URL.format(date=date_str, page=nth_page)
+        html = self._fetch_static(url) if self.use_http else None
+        if html is not None and b'articleSubject' in html:
+            self.empty_streak = 0
+            return html
+        if html is not None and self.empty_render_after and self.empty_streak < self.empty_render_after:
+            self.empty_streak += 1 # 아직 기사가 없는 목록으로 보고, 연속되면 브라우저로 확인
+            return html
+        self.empty_streak = 0
+        html = self._fetch_rendered(url) # 기사가 없으면 선택자 대기 시간 초과로 예외 발생
+        if self.empty_render_after:
+            # 정적 HTML에는 없던 목록이 브라우저에서는 보이면 정적 HTML을 믿을 수 없으므로 항상 렌더링
+            print("!!! 정적 목록 페이지에 기사 목록이 없어 이후에는 브라우저로 목록을 가져옵니다.")
+            self.empty_render_after = None
+        return html
+
+    def close(self):
+        """브라우저를 종료합니다."""
+        if self.browser is not None:
+            self.browser.close()
+        if self.playwright is not None:
+            self.playwright.stop()
+        self.playwright = self.browser = self.page = None
+
+def retry_failed_articles(date_str, writer, retry_urls):
+    """
+    이전 실행에서 가져오지 못한 기사를 다시 크롤링합니다. 또 실패한 기사는 시도 횟수를 늘려 기록합니다.
+
+    Args:
+        date_str (str): 날짜 (YYYY-MM-DD 형식)
+        writer: put_many(rows)와 mark_failed(...)를 제공하는 저장 대상
+        retry_urls (list): [(URL, 목록 페이지 번호)]
+
+    Returns:
+        int: 새로 크롤링한 기사 수
+    """
+    by_page = {}
+    for url, page in retry_urls:
+        by_page.setdefault(page, []).append(url)
+    print(f"{date_str}: 이전에 가져오지 못한 기사 {len(retry_urls)}개를 다시 크롤링합니다.")
+    article_count = 0
+    for page, urls in by_page.items():
+        failed = []
+        page_articles = crawl_onePage(urls, failed=failed)
+        article_count += len(page_articles)
+        writer.put_many(page_articles)
+        writer.mark_failed(date_str, page, failed)
+    return article_count
+
+def crawl_daily_news(date, fetcher=None, writer=None, start_page=1, retry_urls=()):
+    """
+    하루치 기사를 크롤링합니다.
+
+    Args:
+        date (datetime): 크롤링할 날짜
+        fetcher (ListPageFetcher): 목록 페이지 fetcher (없으면 새로 생성)
+        writer: put_many(rows), mark_page(...), mark_failed(...)를 제공하는 저장 대상 (없으면 ArticleWriter 생성)
+        start_page (int): 크롤링을 시작할 목록 페이지 (이전 실행에서 이어서 크롤링할 때 사용, None이면 목록은 모두 완료)
+        retry_urls (list): 목록 크롤링 전에 다시 시도할 [(URL, 목록 페이지 번호)]
 
-def crawl_daily_news(date):
+    Returns:
+        int: 크롤링한 기사 수
+    """
     
+    if fetcher is None:
+        with ListPageFetcher() as fetcher:
+            return crawl_daily_news(date, fetcher, writer, start_page, retry_urls)
+    if writer is None:
+        with ArticleWriter() as writer:
+            return crawl_daily_news(date, fetcher, writer, start_page, retry_urls)
+
     date_str = date.strftime('%Y-%m-%d') 
-    nth_page=1 # 시작 페이지 번호
-    crawled_news=0
-    all_articles_for_the_day = [] # 하루치 기사 데이터를 저장할 리스트
+    article_count = retry_failed_articles(date_str, writer, retry_urls) if retry_urls else 0
+    if start_page is None:
+        return article_count
+    nth_page=start_page # 시작 페이지 번호
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True) # 크로미움 브라우저 실행
-        page = browser.new_page()   # 새 페이지 열기
-        last_page=False # 마지막 페이지 여부
-        while not last_page:
-            page.goto(f"https://finance.naver.com/news/mainnews.naver?date={date_str}&page={nth_page}")
-            page.wait_for_selector("dd.articleSubject a")  # 요소가 로드될 때까지 대기
-            html = page.content() # 페이지 HTML 가져오기
-            all_articles_for_the_day.extend(crawl_onePage(html) ) # 한 페이지 기사 크롤링 및 저장
-            print(f"{date_str} {nth_page}페이지 크롤링 완료")
-            last_page=check_last_page(html)
-            if not last_page:
-                time.sleep(random.uniform(0.5, 2))  # 오류 방지 1~3초 랜덤 딜레이
-                nth_page += 1
-            
-            
-        browser.close()
+    last_page=False # 마지막 페이지 여부
+    while not last_page:
+        html = fetcher.fetch(date_str, nth_page)
+        with crawl_metrics.timed('parse_list'):
+            list_page = parse_list_page(html) # 목록 페이지는 한 번만 파싱
+        failed = []
+        page_articles = crawl_onePage(list_page.urls, failed=failed) # 한 페이지 기사 크롤링
+        article_count += len(page_articles)
+        last_page=list_page.is_last_page
+        writer.put_many(page_articles) # 페이지 단위로 바로 저장 대기열에 전달
+        writer.mark_page(date_str, nth_page, len(page_articles), last_page, failed) # 진행 상황 기록 (실패한 기사는 다음 실행에서 다시 시도)
+        if failed:
+            print(f"!!! {date_str} {nth_page}페이지에서 기사 {len(failed)}개를 가져오지 못해 다음 실행에서 다시 시도합니다.")
+        print(f"{date_str} {nth_page}페이지 크롤링 완료 (요청 속도: {format_rates()}, {crawl_metrics.format_summary()})")
+        if not last_page:
+            nth_page += 1
         
-    save_daily_articles_to_db(all_articles_for_the_day)
+    return article_count
+
+def get_pending_days(start_date, end_date, crawl_state, failed_urls=None):
+    """
+    날짜 범위 중 아직 완료되지 않은 날짜와 시작 페이지, 다시 시도할 기사를 반환합니다.
+    목록은 모두 크롤링했지만 가져오지 못한 기사가 남은 날짜는 시작 페이지가 None입니다.
+
+    Args:
+        crawl_state (dict): load_crawl_state 결과
+        failed_urls (dict): load_failed_urls 결과
+
+    Returns:
+        list: (날짜 문자열, 시작 페이지, [(URL, 페이지)]) 튜플 리스트
+    """
+    failed_urls = failed_urls or {}
+    pending = []
+    for target_date in pd.date_range(start=start_date, end=end_date): # 날짜 범위 순회
+        date_str = target_date.strftime('%Y-%m-%d')
+        last_finished_page, completed = crawl_state.get(date_str, (0, False))
+        retry_urls = failed_urls.get(date_str, [])
+        if completed and not retry_urls:
+            continue
+        if completed:
+            pending.append((date_str, None, retry_urls))
+            continue
+        if last_finished_page:
+            print(f"{date_str}: {last_finished_page}페이지까지 완료된 기록이 있어 이어서 크롤링합니다.")
+        pending.append((date_str, last_finished_page + 1, retry_urls))
+    skipped = len(pd.date_range(start=start_date, end=end_date)) - len(pending)
+    if skipped:
+        print(f"이미 크롤링이 완료된 {skipped}일을 건너뜁니다.")
+    return pending
+
+class _QueueWriter:
+    """백필 워커에서 기사 행과 진행 기록을 결과 큐로 보내는 writer 대용 클래스"""
+    def __init__(self, result_queue):
+        self.result_queue = result_queue
+
+    def put_many(self, rows):
+        self.result_queue.put(('rows', None, rows))
+
+    def mark_page(self, date_str, page, article_count, is_last, failed_urls=()):
+        self.result_queue.put(('page_done', date_str, (page, article_count, is_last, list(failed_urls))))
+
+    def mark_failed(self, date_str, page, urls):
+        self.result_queue.put(('failed', date_str, (page, list(urls))))
+
+def _backfill_worker(task_queue, result_queue, rate_share, use_archive=False, verbose=False):
+    """
+    백필 워커 프로세스
     
-def main(start_date=None, end_date=None):
-    global conn
-    global cur
-    conn=setup_database()  # DB와 테이블 준비
-    cur=conn.cursor()
+    날짜를 하나씩 받아 자체 브라우저/HTTP 세션으로 크롤링하고,
+    기사 행은 DB에 직접 쓰지 않고 결과 큐로 보냅니다.
+    spawn으로 모듈을 새로 import하므로 부모의 설정(VERBOSE 등)은 인자로 받습니다.
+    """
+    global HOST_RATE_LIMIT, HOST_MIN_RATE, HOST_MAX_RATE, known_urls, archive, VERBOSE
+    VERBOSE = verbose
+    # 전체 워커 합계가 호스트당 속도 범위를 넘지 않도록 분배
+    HOST_RATE_LIMIT *= rate_share
+    HOST_MIN_RATE *= rate_share
+    HOST_MAX_RATE *= rate_share
+    read_conn = sqlite3.connect(DB_PATH)
+    known_urls = load_known_urls(read_conn)
+    read_conn.close()
+    if use_archive:
+        archive = HtmlArchive()
+
+    queue_writer = _QueueWriter(result_queue)
+    with ListPageFetcher() as fetcher:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            date_str, start_page, retry_urls = task
+            try:
+                count = crawl_daily_news(pd.Timestamp(date_str), fetcher, queue_writer, start_page, retry_urls)
+                result_queue.put(('day_done', date_str, count))
+            except Exception as e:
+                result_queue.put(('day_failed', date_str, repr(e)))
+            result_queue.put(('metrics', date_str, crawl_metrics.snapshot(reset=True))) # 지표 증분 전달
+    if archive is not None:
+        archive.close()
+    result_queue.put(('worker_done', None, None))
+
+def backfill(start_date, end_date, workers=BACKFILL_WORKERS, metrics_json=None):
+    """
+    날짜 범위를 여러 워커 프로세스에 나누어 병렬로 크롤링합니다.
+    DB 저장은 이 프로세스의 ArticleWriter(단일 writer)만 담당하며, 워커들은 결과 큐로 기사 행을 보냅니다.
+
+    Args:
+        start_date (str): 시작 날짜 (YYYY-MM-DD 형식)
+        end_date (str): 종료 날짜 (YYYY-MM-DD 형식)
+        workers (int): 워커 프로세스 수
+        metrics_json (str): 하루가 끝날 때마다 지표를 저장할 JSON 파일 경로
+    """
+    local_conn = setup_database()  # DB와 테이블 준비
+    pending_days = get_pending_days(start_date, end_date, load_crawl_state(local_conn), load_failed_urls(local_conn))
+    local_conn.close()
+    if not pending_days:
+        print("크롤링할 날짜가 없습니다.")
+        return
+
+    workers = max(1, min(workers, len(pending_days)))
+    ctx = multiprocessing.get_context('spawn') # 브라우저/스레드를 쓰는 워커는 spawn으로 생성
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for task in pending_days:
+        task_queue.put(task)
+    for _ in range(workers):
+        task_queue.put(None) # 워커 종료 신호
+
+    processes = [
+        ctx.Process(target=_backfill_worker, args=(task_queue, result_queue, 1 / workers, archive is not None, VERBOSE))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"{len(pending_days)}일 백필을 {workers}개 워커로 시작합니다.")
+
+    finished_workers = 0
+    finished_days = 0
+    with ArticleWriter() as writer:
+        while finished_workers < workers:
+            try:
+                kind, date_str, payload = result_queue.get(timeout=5)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    print("!!! 모든 워커가 종료 신호 없이 끝났습니다.")
+                    break
+                continue
+            try:
+                crawl_metrics.set_queue_depth('backfill_results', result_queue.qsize())
+            except NotImplementedError: # macOS에서는 지원하지 않음
+                pass
+            if kind == 'rows':
+                writer.put_many(payload)
+            elif kind == 'page_done':
+                writer.mark_page(date_str, *payload)
+            elif kind == 'failed':
+                writer.mark_failed(date_str, *payload)
+            elif kind == 'day_done':
+                finished_days += 1
+                print(f"[{finished_days}/{len(pending_days)}] {date_str} 크롤링 완료 ({payload}개 기사)")
+            elif kind == 'day_failed':
+                finished_days += 1
+                print(f"[{finished_days}/{len(pending_days)}] !!! {date_str} 크롤링 실패: {payload}")
+            elif kind == 'metrics':
+                crawl_metrics.merge_snapshot(payload)
+                print(f"    {crawl_metrics.format_summary()}")
+                if metrics_json:
+                    crawl_metrics.dump_json(metrics_json)
+            elif kind == 'worker_done':
+                finished_workers += 1
+
+    for process in processes:
+        process.join()
     
-    for target_date in pd.date_range(start=start_date, end=end_date): # 날짜 범위 순회
-        crawl_daily_news(target_date)
-        
-    close_database() # DB 연결 종료
+def reextract_articles(start_date=None, end_date=None):
+    """
+    보관된 기사 HTML에서 articles 행을 다시 추출합니다 (네트워크 요청 없음).
+    URL이 같은 기존 행은 id를 유지한 채 제목/본문/날짜만 갱신합니다.
 
-if __name__ == '__main__':
-    main('2025-09-10', '2025-11-18')
- 
- 
+    Args:
+        start_date (str): 이 날짜 이후 기사만 재추출 (YYYY-MM-DD, 없으면 전체)
+        end_date (str): 이 날짜 이전 기사만 재추출 (YYYY-MM-DD, 없으면 전체)
+    """
+    setup_database().close()  # DB와 테이블 준비
+    local_conn = connect_news_db()
+    sql = '''
+        INSERT INTO articles (title, content, article_date, URL) VALUES (?, ?, ?, ?)
+        ON CONFLICT(URL) DO UPDATE SET
+            title = excluded.title, content = excluded.content, article_date = excluded.article_date
+    '''
+    batch = []
+    total = 0
+    with HtmlArchive() as local_archive:
+        for url, _, body in local_archive.iter_latest('article'):
+            row = build_article_row(body.decode('utf-8', errors='replace'), url)
+            if (start_date and row[2] < start_date) or (end_date and row[2] > end_date):
+                continue
+            batch.append(row)
+            if len(batch) >= 1000:
+                local_conn.executemany(sql, batch)
+                local_conn.commit()
+                total += len(batch)
+                batch = []
+                print(f"{total}개 기사 재추출 완료")
+    if batch:
+        local_conn.executemany(sql, batch)
+        local_conn.commit()
+        total += len(batch)
+    local_conn.close()
+    print(f"--- 보관된 HTML에서 총 {total}개 기사를 재추출했습니다. ---")
 
+def main(start_date=None, end_date=None, workers=1, metrics_json=None):
+    if workers > 1:
+        return backfill(start_date, end_date, workers, metrics_json)
+
+    global known_urls
+    local_conn = setup_database()  # DB와 테이블 준비
+    known_urls = load_known_urls(local_conn) # 이미 저장된 기사 URL 불러오기
+    pending_days = get_pending_days(start_date, end_date, load_crawl_state(local_conn), load_failed_urls(local_conn)) # 완료된 날짜 제외
+    local_conn.close()
+    
+    with ListPageFetcher() as fetcher, ArticleWriter() as writer: # 브라우저와 writer는 날짜 범위 전체에서 재사용
+        for date_str, start_page, retry_urls in pending_days:
+            crawl_daily_news(pd.Timestamp(date_str), fetcher, writer, start_page, retry_urls)
+            if metrics_json:
+                crawl_metrics.dump_json(metrics_json)
+
+def poll_latest_pages(date_str, fetcher, writer, max_pages=LIVE_MAX_PAGES):
+    """
+    목록 1페이지부터 새 기사를 크롤링합니다. 목록은 최신순이므로 이미 저장된 기사가
+    나온 페이지에서 멈추고, 페이지 전체가 새 기사일 때만 다음 페이지로 넘어갑니다.
+
+    Args:
+        date_str (str): 날짜 (YYYY-MM-DD 형식)
+        fetcher (ListPageFetcher): 목록 페이지 fetcher
+        writer (ArticleWriter): 저장 대상
+        max_pages (int): 확인할 최대 목록 페이지 수
+
+    Returns:
+        int: 새로 크롤링한 기사 수
+    """
+    article_count = 0
+    for nth_page in range(1, max_pages + 1):
+        html = fetcher.fetch(date_str, nth_page)
+        with crawl_metrics.timed('parse_list'):
+            list_page = parse_list_page(html)
+        if not list_page.urls: # 아직 기사가 없는 목록 (새 기사 없음)
+            break
+        reached_known = any(url in known_urls for url in list_page.urls)
+        page_articles = crawl_onePage(list_page.urls)
+        writer.put_many(page_articles)
+        article_count += len(page_articles)
+        # 진행 중인 날짜의 목록은 계속 바뀌므로 crawl_state에는 기록하지 않음
+        if reached_known or list_page.is_last_page:
+            break
+    return article_count
+
+def start_live_embedding():
+    """
+    실시간 모드에서 새로 저장된 기사를 바로 임베딩하는 백그라운드 스레드를 시작합니다.
+    ArticleWriter 스레드가 임베딩 요청을 기다리지 않도록 기사 id만 큐로 넘기고, 쌓인 id를 한 번에 임베딩합니다.
+    종료 시 남은 기사는 다음 임베딩 배치 실행에서 처리됩니다.
+
+    Returns:
+        callable: live_tail의 on_new_rows로 넘길 콜백
+    """
+    id_queue = queue.Queue()
+
+    def run():
+        from embedding_batch import Embedder #임베딩 모듈 (--embed 옵션을 줄 때만 필요)
+        embedder = Embedder() # SQLite 연결을 이 스레드에서 사용하므로 여기서 생성
+        while True:
+            article_ids = id_queue.get()
+            while not id_queue.empty():
+                article_ids += id_queue.get_nowait()
+            try:
+                embedder.embed_articles(article_ids)
+            except Exception as e: # 임베딩 오류로 실시간 크롤링이 멈추지 않도록 함
+                print(f"!!! 새 기사 임베딩 중 오류 발생: {e}")
+
+    threading.Thread(target=run, name='LiveEmbedding', daemon=True).start()
+    return lambda rows: id_queue.put([row[0] for row in rows])
+
+def live_tail(interval=LIVE_POLL_INTERVAL, on_new_rows=None, max_pages=LIVE_MAX_PAGES, metrics_json=None):
+    """
+    오늘 기사 목록을 주기적으로 확인해 새 기사만 바로 크롤링/저장합니다 (Ctrl+C로 종료).
+
+    Args:
+        interval (float): 목록 확인 간격 (초)
+        on_new_rows (callable): 새로 저장된 기사 목록을 받을 콜백 (ArticleWriter의 on_saved 참고,
+            CLI에서는 --embed 옵션으로 start_live_embedding 콜백을 연결)
+        max_pages (int): 한 번에 따라갈 최대 목록 페이지 수
+        metrics_json (str): 지표를 저장할 JSON 파일 경로
+    """
+    global known_urls
+    local_conn = setup_database()
+    known_urls = load_known_urls(local_conn)
+    local_conn.close()
+
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    print(f"--- 실시간 모드 시작: {interval}초마다 {current_date} 목록을 확인합니다. ---")
+    with ListPageFetcher(empty_render_after=LIVE_EMPTY_RENDER_AFTER) as fetcher, ArticleWriter(flush_interval=LIVE_FLUSH_INTERVAL, on_saved=on_new_rows) as writer:
+        try:
+            while True:
+                today = datetime.now().strftime('%Y-%m-%d')
+                previous_date = current_date if today != current_date else None
+                current_date = today
+                try:
+                    if previous_date is not None:
+                        # 날짜가 바뀌면 전날 목록을 한 번 더 확인해 마지막으로 올라온 기사를 수집
+                        poll_latest_pages(previous_date, fetcher, writer, max_pages)
+                    new_count = poll_latest_pages(current_date, fetcher, writer, max_pages)
+                    print(f"{datetime.now().strftime('%H:%M:%S')} 새 기사 {new_count}개 (요청 속도: {format_rates()})")
+                except Exception as e: # 일시적인 오류로 실시간 모드가 종료되지 않도록 함
+                    print(f"!!! 목록 확인 중 오류 발생: {e}")
+                if metrics_json:
+                    crawl_metrics.dump_json(metrics_json)
+                time.sleep(interval * random.uniform(0.9, 1.1)) # 매번 같은 시각에 요청하지 않도록 약간의 변동 추가
+        except KeyboardInterrupt:
+            print("--- 실시간 모드를 종료합니다. ---")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 금융 주요뉴스 크롤러')
+    parser.add_argument('--start', default='2025-09-10', help='시작 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--end', default='2025-11-18', help='종료 날짜 (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=1, help='백필 워커 프로세스 수 (1이면 순차 실행)')
+    parser.add_argument('--metrics-json', help='지표를 저장할 JSON 파일 경로')
+    parser.add_argument('--metrics-port', type=int, help='Prometheus 지표를 제공할 포트')
+    parser.add_argument('--verbose', action='store_true', help='기사 URL/제목/본문을 모두 출력')
+    parser.add_argument('--archive', action='store_true', help='가져온 목록/기사 HTML을 압축해 보관')
+    parser.add_argument('--reextract', action='store_true', help='크롤링 대신 보관된 HTML에서 기사를 재추출')
+    parser.add_argument('--live', action='store_true', help='오늘 기사 목록을 주기적으로 확인하는 실시간 모드')
+    parser.add_argument('--interval', type=float, default=LIVE_POLL_INTERVAL, help='실시간 모드의 목록 확인 간격 (초)')
+    parser.add_argument('--embed', action='store_true', help='실시간 모드에서 새로 저장된 기사를 바로 임베딩')
+    args = parser.parse_args()
+    VERBOSE = args.verbose
+    if args.reextract:
+        reextract_articles(args.start, args.end)
+    else:
+        if args.metrics_port:
+            crawl_metrics.start_metrics_server(args.metrics_port)
+        if args.archive:
+            archive = HtmlArchive()
+        try:
+            if args.live:
+                live_tail(args.interval, on_new_rows=start_live_embedding() if args.embed else None, metrics_json=args.metrics_json)
+            else:
+                main(args.start, args.end, args.workers, args.metrics_json)
+        finally:
+            if archive is not None:
+                archive.close()
@@ -1,6 +1,6 @@
 import chromadb
 import numpy as np
-from sklearn.decomposition import PCA
+from sklearn.decomposition import IncrementalPCA
 import pickle
 import os
 from tqdm import tqdm
@@ -13,6 +13,8 @@ PERSISTENT_PATH = "data/embedding_db"
 SOURCE_COL_NAME = "news_articles_v1"        # 원본 데이터 있는 곳
 TARGET_COL_NAME = "reduced_emb"   # 20차원 데이터 넣을 곳
 MODEL_FILENAME = "pca_model_master.pkl"        # pca 모델 파일 이름
+N_COMPONENTS = 20                              # 축소할 차원 수
+PAGE_SIZE = 5000                               # 원본 컬렉션에서 한 번에 읽고 변환/저장할 개수 (최대 메모리 사용량 기준)
 
 # 작업할 데이터의 날짜 범위 (예시: 이번 달 데이터 추가)
 # * 주의: 맨 처음 실행할 때는 데이터가 20개 이상이어야 합니다.
@@ -52,16 +54,23 @@ filter_condition = {
 }
 
 
-data = source_collection.get(
-    where=filter_condition,
-    include=["embeddings", "metadatas"] 
-)
-
-ids = data["ids"]
-embeddings = data["embeddings"]
-metadatas = data["metadatas"]
-
-count = len(ids)
+def iter_pages(include):
+    """
+    원본 컬렉션을 PAGE_SIZE개씩 나눠 읽습니다 (1년치 임베딩을 한 번에 메모리에 올리지 않음).
+    임베딩은 float32 배열로 바꿔 반환합니다.
+    """
+    offset = 0
+    while True:
+        page = source_collection.get(where=filter_condition, include=include, limit=PAGE_SIZE, offset=offset)
+        if not page["ids"]:
+            return
+        if "embeddings" in include:
+            page["embeddings"] = np.asarray(page["embeddings"], dtype=np.float32)
+        yield page
+        offset += len(page["ids"])
+
+# 개수만 먼저 셈 (id만 읽음)
+count = sum(len(page["ids"]) for page in iter_pages(include=[]))
 print(f"✅ 처리할 데이터 개수: {count}개")
 
 if count == 0:
@@ -71,22 +80,17 @@ if count == 0:
 # ==========================================
 # 3. PCA 모델 로드 또는 생성 (핵심 로직)
 # ==========================================
-reduced_embeddings = []
 
 # [케이스 1] 모델 파일이 이미 존재하는 경우 -> "불러와서 쓰기"
 if os.path.exists(MODEL_FILENAME):
     print(f"📂 기존 모델 파일({MODEL_FILENAME})을 발견했습니다.")
     print("   👉 기존 모델을 불러와서 '변환(Transform)'만 수행합니다.")
     
-    # 1. 모델 로드
+    # 1. 모델 로드 (변환은 4단계에서 페이지별로, 절대 fit하지 않음)
     with open(MODEL_FILENAME, "rb") as f:
         pca = pickle.load(f)
     
-    # 2. 변환 (절대 fit하지 않음)
-    reduced_embeddings_np = pca.transform(embeddings)
-    reduced_embeddings = reduced_embeddings_np.tolist()
-    
-    # 3. 타겟 컬렉션 가져오기 (기존 것 사용)
+    # 2. 타겟 컬렉션 가져오기 (기존 것 사용)
     # 만약 컬렉션이 없으면 만드는 get_or_create 사용
     target_collection = client.get_or_create_collection(
         name=TARGET_COL_NAME,
@@ -97,15 +101,24 @@ if os.path.exists(MODEL_FILENAME):
 # [케이스 2] 모델 파일이 없는 경우 -> "처음이니 새로 만들기"
 else:
     print(f"🆕 모델 파일({MODEL_FILENAME})이 없습니다.")
-    print("   👉 PCA 모델을 새로 학습(Fit)하고 저장합니다.")
+    print("   👉 PCA 모델을 페이지 단위로 새로 학습(Fit)하고 저장합니다.")
     
-    if count < 20:
-        raise ValueError(f"데이터가 {count}개뿐이라 20차원 학습이 불가능합니다. 데이터를 더 확보하세요.")
-
-    # 1. 학습 및 변환
-    pca = PCA(n_components=20)
-    reduced_embeddings_np = pca.fit_transform(embeddings)
-    reduced_embeddings = reduced_embeddings_np.tolist()
+    if count < N_COMPONENTS:
+        raise ValueError(f"데이터가 {count}개뿐이라 {N_COMPONENTS}차원 학습이 불가능합니다. 데이터를 더 확보하세요.")
+
+    # 1. 페이지 단위 학습 (IncrementalPCA)
+    # partial_fit은 한 번에 N_COMPONENTS개 이상이 필요하므로, 마지막 페이지가 작으면 앞 페이지와 합쳐서 학습
+    pca = IncrementalPCA(n_components=N_COMPONENTS)
+    pending = None
+    for page in tqdm(iter_pages(include=["embeddings"]), total=-(-count // PAGE_SIZE), desc="Fitting"):
+        if pending is not None and len(page["embeddings"]) < N_COMPONENTS:
+            pending = np.vstack([pending, page["embeddings"]])
+            continue
+        if pending is not None:
+            pca.partial_fit(pending)
+        pending = page["embeddings"]
+    pca.partial_fit(pending)
+    print(f"   📊 설명된 분산 비율 합계: {pca.explained_variance_ratio_.sum():.3f}")
     
     # 2. 모델 저장
     with open(MODEL_FILENAME, "wb") as f:
@@ -126,18 +139,18 @@ else:
     print("   👉 새 컬렉션을 생성하고 데이터를 입력합니다.")
 
 # ==========================================
-# 4. 데이터 저장 (Batch Processing)
+# 4. 변환 및 저장 (페이지 단위)
 # ==========================================
-BATCH_SIZE = 5000
-print(f"\n📥 DB 저장 시작 (총 {count}건, 배치 크기 {BATCH_SIZE})...")
+# 페이지마다 변환(float32)과 저장을 마치고 다음 페이지를 읽으므로 메모리는 PAGE_SIZE에 비례
+print(f"\n📥 변환 및 DB 저장 시작 (총 {count}건, 페이지 크기 {PAGE_SIZE})...")
 
-for i in tqdm(range(0, count, BATCH_SIZE), desc="Inserting"):
-    end_idx = min(i + BATCH_SIZE, count)
+for page in tqdm(iter_pages(include=["embeddings", "metadatas"]), total=-(-count // PAGE_SIZE), desc="Inserting"):
+    reduced_embeddings = pca.transform(page["embeddings"]).astype(np.float32, copy=False)
     
     target_collection.add(
-        ids=ids[i:end_idx],
-        embeddings=reduced_embeddings[i:end_idx],
-        metadatas=metadatas[i:end_idx]
+        ids=page["ids"],
+        embeddings=reduced_embeddings,
+        metadatas=page["metadatas"]
         
     )
 
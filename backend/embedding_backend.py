@@ -0,0 +1,105 @@
+import abc, os
+import numpy as np
+
+ONNX_BATCH_SIZE = 32 # 한 번에 모델에 넣을 텍스트 수
+ONNX_MAX_LENGTH = 512 # 텍스트당 최대 토큰 수 (넘으면 잘라냄)
+
+class EmbeddingBackend(abc.ABC):
+    """
+    텍스트 목록을 임베딩 배열로 바꾸는 임베딩 백엔드 인터페이스
+
+    Embedder(backend=...)에 넘기면 Gemini Batch API 대신 이 백엔드로 임베딩하고,
+    결과는 Gemini 결과와 같은 방식(ChromaDB + 임베딩 DB + 임베딩 캐시)으로 저장됩니다.
+    임베딩 캐시, ChromaDB 컬렉션, 임베딩 DB는 model_name으로 구분되므로 백엔드마다 다른 값을 써야 합니다.
+    """
+    model_name = None # 임베딩 캐시 키, 컬렉션/임베딩 DB 이름에 쓰는 모델 이름
+    dimensionality = None # 출력 차원
+
+    @abc.abstractmethod
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): 임베딩할 텍스트 목록
+
+        Returns:
+            np.ndarray: (len(texts), dimensionality) float32 배열 (입력 순서 유지)
+        """
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    로컬 ONNX 모델로 임베딩하는 백엔드 (네트워크와 API 할당량 없이 CPU 코어 수만큼 처리)
+
+    - 토큰 수로 텍스트를 정렬한 뒤 batch_size개씩 묶어, 배치 안에서 가장 긴 텍스트 길이까지만 패딩합니다.
+    - intra-op 스레드 수를 코어 수로 맞춘 세션 하나를 재사용합니다.
+    - 모델 출력이 (batch, seq, hidden)이면 attention mask로 평균 풀링하고, (batch, hidden)이면 그대로 사용합니다.
+
+    모델 입력은 input_ids, attention_mask (필요하면 token_type_ids)이고 출력은 첫 번째 출력을 사용합니다.
+    """
+    def __init__(self, model_path, tokenizer_path, model_name=None, batch_size=ONNX_BATCH_SIZE, max_length=ONNX_MAX_LENGTH,
+                 num_threads=None, normalize=True):
+        """
+        Args:
+            model_path (str): ONNX 모델 파일 경로
+            tokenizer_path (str): Hugging Face tokenizers의 tokenizer.json 경로
+            model_name (str): 임베딩 캐시 키에 쓸 모델 이름 (없으면 'onnx:' + 모델 파일 이름)
+            batch_size (int): 한 번에 모델에 넣을 텍스트 수
+            max_length (int): 텍스트당 최대 토큰 수
+            num_threads (int): intra-op 스레드 수 (없으면 CPU 코어 수)
+            normalize (bool): 임베딩을 L2 정규화할지 여부
+        """
+        import onnxruntime as ort #ONNX 추론 라이브러리 (이 백엔드를 쓸 때만 필요)
+        from tokenizers import Tokenizer #토크나이저 라이브러리
+
+        self.model_name = model_name or f"onnx:{os.path.basename(model_path)}"
+        self.batch_size = batch_size
+        self.normalize = normalize
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.no_padding() # 배치마다 직접 패딩
+        self.pad_id = self.tokenizer.token_to_id('[PAD]') or 0
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1 # 세션 하나를 순차 실행하므로 연산 내부 병렬화만 사용
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.output_name = self.session.get_outputs()[0].name
+        self.dimensionality = self.session.get_outputs()[0].shape[-1]
+        if not isinstance(self.dimensionality, int): # 차원이 동적으로 선언된 모델은 한 번 실행해 확인
+            self.dimensionality = self._run([self.tokenizer.encode('dimension')]).shape[1]
+
+    def _run(self, encodings):
+        """토큰화된 텍스트 한 배치를 배치 내 최대 길이로 패딩해 실행합니다."""
+        length = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.full((len(encodings), length), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        for i, encoding in enumerate(encodings):
+            input_ids[i, :len(encoding.ids)] = encoding.ids
+            attention_mask[i, :len(encoding.ids)] = 1
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.zeros_like(input_ids)
+        output = self.session.run([self.output_name], {name: feeds[name] for name in self.input_names})[0]
+
+        if output.ndim == 3: # 토큰별 출력은 패딩을 제외하고 평균 풀링
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        output = output.astype(np.float32, copy=False)
+        if self.normalize:
+            output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        return output
+
+    def embed(self, texts):
+        if not texts:
+            return np.empty((0, self.dimensionality), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = np.argsort([len(encoding.ids) for encoding in encodings], kind='stable') # 길이가 비슷한 텍스트끼리 묶어 패딩을 줄임
+        embeddings = np.empty((len(texts), self.dimensionality), dtype=np.float32)
+        for i in range(0, len(order), self.batch_size):
+            batch = order[i:i + self.batch_size]
+            embeddings[batch] = self._run([encodings[j] for j in batch])
+        return embeddings
@@ -4,12 +4,21 @@ from google import genai
 from google.genai import types
 import chromadb
 import time
-import json
+import asyncio, random #온라인 임베딩 동시 요청 라이브러리
+import orjson #결과 파일 파싱 라이브러리
+import httpx #결과 파일 스트리밍 다운로드 라이브러리
 import tempfile
 import os
 from pathlib import Path
 import pickle
+import hashlib, re
+import numpy as np
 from datetime import datetime, timedelta
+from embedding_store import EMBEDDING_RDB_PATH, pack_embedding #임베딩 BLOB 저장 모듈
+from embedding_cache import EmbeddingCache #임베딩 캐시 모듈
+from batch_request_writer import BatchRequestWriter, embedding_request #Batch 입력 파일 작성 모듈
+from batch_monitor import BatchJobMonitor, POLL_INITIAL_INTERVAL, JOB_DEADLINE, RESUBMIT_STATES #Batch 작업 모니터
+from throttle import TokenBucket #요청 속도 제어 모듈
 
 
 
@@ -20,31 +29,213 @@ GOOGLE_API_KEY = 'APIKEY'
 
 # 사용할 임베딩 모델
 EMBEDDING_MODEL = 'gemini-embedding-001'
+EMBEDDING_TASK_TYPE = 'CLUSTERING'
+EMBEDDING_DIMENSIONALITY = 768
 
 # 원본 데이터베이스 파일 경로
 DB_FILE_PATH = 'data/news.db'
-EMBEDDING_RDB_PATH = 'data/embeddings.db'
 
 # 벡터 데이터베이스 설정
 CHROMA_DB_PATH = 'data/embedding_db' # 벡터 DB 파일이 저장될 디렉토리
 COLLECTION_NAME = 'news_articles_v1' # 생성할 컬렉션 이름
 
+GEMINI_DOWNLOAD_URL = 'https://generativelanguage.googleapis.com/download/v1beta' # Batch 결과 파일 다운로드 주소
+DOWNLOAD_BLOCK_SIZE = 1024 * 1024 # 결과 파일을 디스크에 쓰는 단위 (바이트)
+INGEST_CHUNK_SIZE = 1000 # 결과를 한 번에 저장할 임베딩 수
+
+# 여러 날짜를 묶어 제출할 때 Batch 입력 파일(샤드) 하나의 최대 크기
+SHARD_MAX_REQUESTS = 20000 # 샤드당 최대 요청 수
+SHARD_MAX_BYTES = 200 * 1024 * 1024 # 샤드당 최대 파일 크기 (Batch API 입력 파일 제한 2GB보다 충분히 작게)
+EMBEDDING_JOB_TAG = 'embedding_' # 작업 기록 파일에서 임베딩 작업을 구분하는 태그 접두사
+
+# 새로 임베딩할 기사가 적을 때 사용하는 온라인(동기 embed API) 모드 설정
+ONLINE_THRESHOLD = 2000 # 요청 수가 이 값 이하이면 Batch 작업 대신 온라인 모드로 임베딩
+ONLINE_TEXTS_PER_REQUEST = 100 # embed 요청 하나에 넣을 텍스트 수 (API 최대 100개)
+ONLINE_CONCURRENCY = 4 # 동시에 보낼 embed 요청 수
+ONLINE_RATE_LIMIT = 2.0 # 초당 embed 요청 수
+ONLINE_MAX_RETRIES = 5 # 요청당 최대 재시도 횟수
+ONLINE_BACKOFF_BASE = 2.0 # 첫 재시도 대기 시간 (초)
+ONLINE_BACKOFF_MAX = 60.0 # 최대 재시도 대기 시간 (초)
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504) # 재시도할 HTTP 상태 코드
+
+# 결과에서 빠지거나 오류가 난 기사의 재시도 설정
+EMBEDDING_MAX_ATTEMPTS = 3 # 기사당 최대 제출 횟수 (넘으면 재시도 대기열에 남기고 더 이상 제출하지 않음)
+RETRY_ERROR_MAX_LENGTH = 500 # 재시도 대기열에 기록할 오류 메시지 최대 길이
+
+# 임베딩 텍스트 준비 (긴 기사 자르기/나누기)
+EMBEDDING_MAX_TOKENS = 2048 # 요청 하나의 최대 토큰 수 (gemini-embedding-001 입력 한도)
+EMBEDDING_MAX_CHUNKS = 1 # 긴 본문을 나눌 최대 청크 수 (1이면 앞부분만 남기고 자름, 나머지 청크는 평균 풀링)
+ASCII_TOKENS_PER_CHAR = 0.25 # 토큰 수 추정: 영문/숫자/공백 한 글자당 토큰 수
+NON_ASCII_TOKENS_PER_CHAR = 0.7 # 토큰 수 추정: 한글 등 한 글자당 토큰 수 (실제보다 조금 많게 잡음)
+TRUNCATE_WHITESPACE_WINDOW = 50 # 자를 때 단어 중간을 피하려고 되돌아볼 최대 글자 수
+
+def build_embedding_text(title, content):
+    """임베딩 요청에 넣을 텍스트 (제목 + 본문)"""
+    return f"뉴스 기사 제목: {title}\n뉴스 기사 본문: {content}"
+
+def content_hash(text):
+    """임베딩 텍스트의 sha256 (본문이 바뀐 기사를 다시 임베딩하기 위한 키)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def estimate_tokens(text):
+    """토크나이저 없이 텍스트의 토큰 수를 추정합니다 (ASCII와 그 밖의 문자를 다른 비율로 계산)."""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return ascii_chars * ASCII_TOKENS_PER_CHAR + (len(text) - ascii_chars) * NON_ASCII_TOKENS_PER_CHAR
+
+def truncate_to_tokens(text, max_tokens):
+    """추정 토큰 수가 max_tokens 이하가 되도록 텍스트 앞부분만 남깁니다 (가능하면 공백에서 자름)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high: # 추정 토큰 수가 max_tokens 이하인 가장 긴 앞부분을 이분 탐색
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    space = text.rfind(' ', max(0, low - TRUNCATE_WHITESPACE_WINDOW), low)
+    return text[:space if space > 0 else low]
+
+def prepare_embedding_texts(title, content, max_tokens=EMBEDDING_MAX_TOKENS, max_chunks=EMBEDDING_MAX_CHUNKS):
+    """
+    기사 하나를 임베딩 요청 텍스트로 만듭니다.
+    토큰 예산을 넘는 본문은 앞부분만 남기거나, max_chunks가 2 이상이면 예산 크기의 청크로 나눕니다
+    (청크마다 제목을 붙이고, max_chunks개를 넘는 뒷부분은 버림).
+
+    Args:
+        title (str): 기사 제목
+        content (str): 기사 본문
+        max_tokens (int): 요청 하나의 최대 추정 토큰 수 (None이면 자르지 않음)
+        max_chunks (int): 최대 청크 수
+
+    Returns:
+        list: 요청 텍스트 목록 (청크로 나누지 않으면 1개)
+    """
+    text = build_embedding_text(title, content)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return [text]
+    body_budget = max_tokens - estimate_tokens(build_embedding_text(title, ''))
+    if body_budget <= 0: # 제목만으로 예산을 넘는 경우
+        return [truncate_to_tokens(text, max_tokens)]
+    texts = []
+    rest = content
+    while rest and len(texts) < max_chunks:
+        piece = truncate_to_tokens(rest, body_budget)
+        if not piece:
+            break
+        texts.append(build_embedding_text(title, piece))
+        rest = rest[len(piece):].lstrip()
+    return texts
+
+def texts_hash(texts):
+    """요청 텍스트 목록의 sha256 (청크로 나누지 않은 기사는 content_hash(텍스트)와 같음)"""
+    return content_hash('\n'.join(texts))
+
+def chunk_request_key(id, date, text_hash, index, count):
+    """청크 요청의 key (기사 key 뒤에 청크 번호와 청크 수를 붙임)"""
+    return f"{id}_{date}_{text_hash}_{index}_{count}"
+
+def parse_request_key(key):
+    """
+    Batch 요청 key를 분해합니다.
+
+    Returns:
+        tuple: (id, date, hash) - 해시가 없는 예전 형식의 key이면 hash는 None
+    """
+    parts = key.split('_')
+    if len(parts) == 2:
+        return parts[0], parts[1], None
+    return parts[0], parts[1], parts[2]
+
+def parse_chunk(key):
+    """청크 요청 key이면 (청크 번호, 청크 수)를, 아니면 None을 반환합니다."""
+    parts = key.split('_')
+    return (int(parts[3]), int(parts[4])) if len(parts) == 5 else None
+
+class ChunkPooler:
+    """
+    청크로 나눠 임베딩한 기사의 결과를 모아, 청크가 모두 도착하면 평균 풀링한 벡터 하나로 만듭니다.
+    결과 순서는 요청 순서와 다를 수 있으므로 기사별로 도착한 청크를 보관합니다.
+    """
+    def __init__(self):
+        self.pending = {} # {(id, date, hash): {청크 번호: 임베딩}}
+
+    def add(self, key, embedding):
+        """
+        결과 하나를 추가합니다.
+
+        Returns:
+            tuple: 기사 하나의 (id, date, hash, embedding) (청크가 아직 모두 도착하지 않았으면 None)
+        """
+        id, date, text_hash = parse_request_key(key)
+        chunk = parse_chunk(key)
+        if chunk is None:
+            return id, date, text_hash, embedding
+        index, count = chunk
+        chunks = self.pending.setdefault((id, date, text_hash), {})
+        chunks[index] = embedding
+        if len(chunks) < count:
+            return None
+        del self.pending[(id, date, text_hash)]
+        return id, date, text_hash, np.mean(np.asarray(list(chunks.values()), dtype=np.float32), axis=0)
+
+    def incomplete_ids(self):
+        """청크 결과가 일부만 도착한 기사 id"""
+        return [int(id) for id, _, _ in self.pending]
+
+def backend_storage_names(model_name):
+    """
+    로컬 백엔드 모델의 ChromaDB 컬렉션 이름과 임베딩 DB 경로를 만듭니다 (Gemini 벡터와 섞이지 않도록 모델마다 분리).
+
+    Returns:
+        tuple: (컬렉션 이름, 임베딩 DB 경로)
+    """
+    suffix = re.sub(r'[^0-9A-Za-z]+', '_', model_name).strip('_').lower()
+    root, ext = os.path.splitext(EMBEDDING_RDB_PATH)
+    return f"{COLLECTION_NAME}_{suffix}", f"{root}_{suffix}{ext}"
+
 class Embedder:
-    def __init__(self, api_key=GOOGLE_API_KEY, db_path=DB_FILE_PATH, chroma_path=CHROMA_DB_PATH, collection_name=COLLECTION_NAME):
+    def __init__(self, api_key=GOOGLE_API_KEY, db_path=DB_FILE_PATH, chroma_path=CHROMA_DB_PATH, collection_name=None,
+                 online_threshold=ONLINE_THRESHOLD, max_attempts=EMBEDDING_MAX_ATTEMPTS, backend=None,
+                 embedding_db_path=None, max_tokens=EMBEDDING_MAX_TOKENS, max_chunks=EMBEDDING_MAX_CHUNKS):
         """
-        Embedder 클래스 초기화 (Batch API 전용)
+        Embedder 클래스 초기화 (Batch API, 요청이 적을 때는 온라인 embed API)
+        backend를 넘기면 Gemini API를 사용하지 않고 그 백엔드(예: OnnxEmbeddingBackend)로 모든 요청을 임베딩합니다.
+        백엔드마다 벡터 공간이 다르므로 컬렉션과 임베딩 DB는 backend_storage_names로 모델마다 따로 쓰며,
+        Gemini 기본값(COLLECTION_NAME, EMBEDDING_RDB_PATH)을 넘기면 ValueError를 냅니다.
         
         Args:
             api_key (str): Google Gemini API 키
             db_path (str): SQLite 데이터베이스 파일 경로
             chroma_path (str): ChromaDB 저장 경로
-            collection_name (str): ChromaDB 컬렉션 이름
+            collection_name (str): ChromaDB 컬렉션 이름 (없으면 Gemini는 COLLECTION_NAME, 로컬 백엔드는 모델별 이름)
+            online_threshold (int): 요청 수가 이 값 이하이면 온라인 모드 사용 (0이면 항상 Batch API)
+            max_attempts (int): 결과에서 빠지거나 오류가 난 기사를 제출할 최대 횟수
+            backend (EmbeddingBackend): 로컬 임베딩 백엔드 (없으면 Gemini)
+            embedding_db_path (str): 임베딩 저장 DB 경로 (없으면 Gemini는 EMBEDDING_RDB_PATH, 로컬 백엔드는 모델별 경로)
+            max_tokens (int): 요청 하나의 최대 추정 토큰 수 (넘는 본문은 자르거나 청크로 나눔)
+            max_chunks (int): 긴 본문을 나눌 최대 청크 수 (청크 임베딩은 평균 풀링해 기사당 하나로 저장)
         """
+        if backend is None:
+            collection_name = collection_name or COLLECTION_NAME
+            embedding_db_path = embedding_db_path or EMBEDDING_RDB_PATH
+        else:
+            if collection_name == COLLECTION_NAME or embedding_db_path == EMBEDDING_RDB_PATH:
+                raise ValueError(f"로컬 백엔드 '{backend.model_name}'의 임베딩을 Gemini 컬렉션/임베딩 DB에 저장할 수 없습니다.")
+            default_collection, default_db_path = backend_storage_names(backend.model_name)
+            collection_name = collection_name or default_collection
+            embedding_db_path = embedding_db_path or default_db_path
         self.api_key = api_key
+        self.online_threshold = online_threshold
+        self.max_attempts = max_attempts
+        self.backend = backend
+        self.embedding_db_path = embedding_db_path
+        self.max_tokens = max_tokens
+        self.max_chunks = max_chunks
         self.db_path = db_path
         self.chroma_path = chroma_path
         self.collection_name = collection_name
-        self.embedding_model = EMBEDDING_MODEL
+        self.embedding_model = EMBEDDING_MODEL if backend is None else backend.model_name
         self.gemini_client = None
         self.vectorDB_client = None
         self.collection = None
@@ -54,9 +245,13 @@ class Embedder:
         self.embedding_db_cur = None
         
         self._setup_embedding_db()
-        
-        # Gemini API 설정
-        self._setup_gemini_api()
+        if backend is None:
+            self.cache = EmbeddingCache(self.embedding_model, EMBEDDING_TASK_TYPE, EMBEDDING_DIMENSIONALITY)
+            # Gemini API 설정
+            self._setup_gemini_api()
+        else:
+            self.cache = EmbeddingCache(backend.model_name, EMBEDDING_TASK_TYPE, backend.dimensionality)
+            print(f"로컬 임베딩 백엔드 '{backend.model_name}' ({backend.dimensionality}차원)를 사용합니다.")
         
         # ChromaDB 설정
         self._setup_chroma_db()
@@ -83,91 +278,215 @@ class Embedder:
         
     def _setup_embedding_db(self):
         try:
-            self.embedding_db_conn = sqlite3.connect(EMBEDDING_RDB_PATH)
+            self.embedding_db_conn = sqlite3.connect(self.embedding_db_path)
             self.embedding_db_cur = self.embedding_db_conn.cursor()
             self.embedding_db_cur.execute('''
                 CREATE TABLE IF NOT EXISTS embeddings (
                     id INTEGER PRIMARY KEY,
-                    embedding TEXT
+                    embedding BLOB, -- embedding_store.pack_embedding 형식 (헤더 + float32)
+                    content_hash TEXT
+                )
+            ''')
+            self.embedding_db_cur.execute("PRAGMA table_info(embeddings)")
+            columns = [info[1] for info in self.embedding_db_cur.fetchall()]
+            if 'content_hash' not in columns:
+                self.embedding_db_cur.execute('ALTER TABLE embeddings ADD COLUMN content_hash TEXT')
+            if 'model' not in columns: # 어떤 모델로 임베딩했는지 (NULL이면 모델을 기록하기 전의 Gemini 임베딩)
+                self.embedding_db_cur.execute('ALTER TABLE embeddings ADD COLUMN model TEXT')
+            # Batch 작업별로 제출한 기사 id (결과와 비교해 빠진 기사를 찾기 위해 재시작 후에도 유지)
+            self.embedding_db_cur.execute('''
+                CREATE TABLE IF NOT EXISTS batch_submissions (
+                    job_name TEXT,
+                    article_id INTEGER,
+                    PRIMARY KEY (job_name, article_id)
+                ) WITHOUT ROWID
+            ''')
+            # 결과에서 빠지거나 오류가 난 기사 (저장에 성공하면 삭제)
+            self.embedding_db_cur.execute('''
+                CREATE TABLE IF NOT EXISTS embedding_retry (
+                    article_id INTEGER PRIMARY KEY,
+                    attempts INTEGER,
+                    last_error TEXT,
+                    updated_at TEXT
                 )
             ''')
             self.embedding_db_conn.commit()
-            print(f"임베딩 데이터베이스 '{EMBEDDING_RDB_PATH}'가 준비되었습니다.")
+            print(f"임베딩 데이터베이스 '{self.embedding_db_path}'가 준비되었습니다.")
         except Exception as e:
             print(f"임베딩 데이터베이스 설정 실패: {e}")
             raise e
     
-    def _create_batch_input_file(self, chunk_df, f):
-       
-        for row in chunk_df.itertuples():
+    def _create_batch_input_file(self, rows, f):
+        """
+        임베딩이 없거나 본문이 바뀌었거나 다른 모델로 임베딩된 기사만 Batch 입력 파일에 씁니다.
+        임베딩 캐시에 같은 텍스트가 있으면 요청하지 않고 캐시 값을 바로 저장합니다.
+        토큰 예산을 넘는 기사는 앞부분만 보내거나 청크 요청 여러 개로 나눠 같은 샤드에 씁니다.
 
-            id = row.id
-            title_and_content = f"뉴스 기사 제목: {row.title}\n뉴스 기사 본문: {row.content}"
-            date = row.article_date
+        Args:
+            rows (list): (id, title, content, article_date, stored_hash, stored_model, has_embedding) 행 목록
+            f (BatchRequestWriter): 요청을 쓸 writer
+
+        Returns:
+            tuple: (요청 수, 해시가 없는 기존 임베딩의 (해시, id) 목록)
+        """
+        legacy_hashes = []
+        candidates = []
+        for id, title, content, date, stored_hash, stored_model, has_embedding in rows:
+            texts = prepare_embedding_texts(title, content, self.max_tokens, self.max_chunks)
+            text_hash = texts_hash(texts)
+
+            same_model = (stored_model or EMBEDDING_MODEL) == self.embedding_model # 모델 기록 전 임베딩은 Gemini (다른 모델 임베딩은 없는 것으로 봄)
+            if same_model and stored_hash == text_hash:
+                continue # 같은 모델, 같은 본문으로 이미 임베딩됨
+            if same_model and has_embedding and stored_hash is None:
+                # 해시를 기록하기 전에 임베딩된 기사는 현재 본문 해시를 채우고 건너뜀
+                legacy_hashes.append((text_hash, id))
+                continue
+            candidates.append((id, date, text_hash, texts))
+
+        cached = self.cache.get_many([text_hash for _, _, text_hash, _ in candidates])
+        cached_rows = [(id, date, text_hash, cached[text_hash]) for id, date, text_hash, _ in candidates if text_hash in cached]
+        if cached_rows:
+            self._store_embedding_chunk(cached_rows)
 
+        request_count = 0
+        chunked_count = 0
+        for id, date, text_hash, texts in candidates:
+            if text_hash in cached:
+                continue
             # Batch API 요청 형식
-            request = {
-                "key": f"{id}_{date}",
-                "request": {
-                    "task_type": "CLUSTERING",
-                    "output_dimensionality": 768,
-                    "content": {"parts": [{"text": title_and_content}] },
-                }
-            }
-            f.write(json.dumps(request, ensure_ascii=False) + '\n')
-
-        print(f" {len(chunk_df):,}개 문서 입력 완료")
+            if len(texts) == 1:
+                f.write(embedding_request(f"{id}_{date}_{text_hash}", texts[0], EMBEDDING_TASK_TYPE, EMBEDDING_DIMENSIONALITY))
+            else: # 청크 결과를 한 작업에서 모아 풀링하도록 같은 샤드에 씀
+                f.write_group([
+                    embedding_request(chunk_request_key(id, date, text_hash, i, len(texts)), text, EMBEDDING_TASK_TYPE, EMBEDDING_DIMENSIONALITY)
+                    for i, text in enumerate(texts)
+                ])
+                chunked_count += 1
+            request_count += len(texts)
+
+        print(f" {len(rows):,}개 문서 중 {len(candidates) - len(cached_rows):,}개 입력 완료 "
+              f"(요청 {request_count:,}개, 청크로 나눈 기사 {chunked_count:,}개, 캐시 {len(cached_rows):,}개, 나머지는 이미 임베딩됨)")
+        return request_count, legacy_hashes
         
-    def load_data_and_store(self, start_date, end_date, chunk_size=10000):
+    def _embedding_query(self, conn, condition):
         """
-        데이터베이스에서 청크 단위로 데이터를 로드하는 제너레이터
-        
+        임베딩 대상 기사를 읽는 쿼리 (embeddings.db를 emb로 ATTACH한 연결 기준)
+
         Args:
-            start_date (str): 시작 날짜 (YYYY-MM-DD 형식)
-            end_date (str): 종료 날짜 (YYYY-MM-DD 형식)
-            chunk_size (int): 청크 크기
-        
-        Yields:
-            pd.DataFrame: 청크 단위 데이터프레임
+            conn (sqlite3.Connection): news.db 연결
+            condition (str): 기사를 고르는 추가 WHERE 조건
+        """
+        query = f"""
+            SELECT a.id, a.title, a.content, a.article_date,
+                   e.content_hash AS stored_hash, e.model AS stored_model, e.id IS NOT NULL AS has_embedding
+            FROM articles a
+            LEFT JOIN emb.embeddings e ON e.id = a.id
+            LEFT JOIN emb.embedding_retry r ON r.article_id = a.id
+            WHERE a.content IS NOT NULL AND a.content != '' AND {condition}
+              AND (r.attempts IS NULL OR r.attempts < ?)"""
+        columns = [info[1] for info in conn.execute("PRAGMA table_info(articles)")]
+        if 'canonical_id' in columns: # 근접 중복 기사는 대표 기사만 임베딩
+            query += " AND a.canonical_id IS NULL"
+        return query + ";"
+
+    def _write_batch_input(self, query, params, chunk_size=10000, max_requests=None, max_bytes=None):
+        """
+        쿼리 결과를 청크 단위로 읽어 Batch 입력 파일을 만듭니다.
+
+        Returns:
+            list: [(Batch 입력 파일 경로, 요청 수)] (새로 임베딩할 기사가 없으면 빈 리스트)
         """
         conn = sqlite3.connect(self.db_path)
-        query = "SELECT id, title, content, article_date FROM articles WHERE content IS NOT NULL AND content != '' AND article_date >= ? AND article_date < ?;"
+        conn.execute("ATTACH DATABASE ? AS emb", (self.embedding_db_path,)) # 임베딩 여부를 한 쿼리로 조인
+        request_count = 0
+        legacy_hashes = []
         
         try:
-            chunk_iterator = pd.read_sql_query(
-                query, 
-                conn, 
-                params=(start_date, end_date),
-                chunksize=chunk_size
-            )
+            cursor = conn.execute(self._embedding_query(conn, query), (*params, self.max_attempts)) # DataFrame을 거치지 않고 커서에서 바로 읽음
             
             chunk_count = 0
             
-            temp_fd, temp_file = tempfile.mkstemp(suffix='.jsonl', prefix="embedding_batch")
-            os.close(temp_fd)
-            
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                
-
-                for chunk_df in chunk_iterator:
+            with BatchRequestWriter(max_requests=max_requests, max_bytes=max_bytes, prefix="embedding_batch") as f:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
                     chunk_count += 1
                     
-                    # 전체 텍스트 컬럼 생성 (title + content)
-                    
-                    print(f"청크 {chunk_count} 로드: {len(chunk_df)}개 문서")
+                    print(f"청크 {chunk_count} 로드: {len(rows)}개 문서")
     
-                    self._create_batch_input_file(chunk_df, f) # Batch 입력 파일 생성
+                    chunk_requests, chunk_legacy = self._create_batch_input_file(rows, f) # Batch 입력 파일 생성
+                    request_count += chunk_requests
+                    legacy_hashes.extend(chunk_legacy)
                 
         except Exception as e:
             print(f"청크 데이터 로드 실패: {e}")
             raise e
         finally:
             conn.close()
-            
-        return temp_file
+
+        if legacy_hashes:
+            self.embedding_db_cur.executemany('UPDATE embeddings SET content_hash = ?, model = ? WHERE id = ?',
+                                              [(text_hash, self.embedding_model, id) for text_hash, id in legacy_hashes])
+            self.embedding_db_cur.executemany('DELETE FROM embedding_retry WHERE article_id = ?', [(id,) for _, id in legacy_hashes])
+            self.embedding_db_conn.commit()
+            print(f" 기존 임베딩 {len(legacy_hashes):,}개에 본문 해시를 기록했습니다.")
+
+        if len(f.shards) > 1:
+            print(f" {request_count:,}개 요청을 {len(f.shards)}개 입력 파일로 나눴습니다.")
+        print(f" {self.cache.summary()}")
+        return f.close()
+
+    def load_data_and_store(self, start_date, end_date, chunk_size=10000, max_requests=None, max_bytes=None):
+        """
+        데이터베이스에서 청크 단위로 데이터를 로드해 Batch 입력 파일을 만듭니다.
+        embeddings.db에 같은 본문 해시로 이미 저장된 기사와 재시도 횟수를 모두 쓴 기사는 제외합니다.
+        
+        Args:
+            start_date (str): 시작 날짜 (YYYY-MM-DD 형식)
+            end_date (str): 종료 날짜 (YYYY-MM-DD 형식, 포함하지 않음)
+            chunk_size (int): 청크 크기
+            max_requests (int): 입력 파일 하나의 최대 요청 수 (없으면 파일 하나)
+            max_bytes (int): 입력 파일 하나의 최대 크기 (바이트)
+        
+        Returns:
+            list: [(Batch 입력 파일 경로, 요청 수)] (새로 임베딩할 기사가 없으면 빈 리스트)
+        """
+        return self._write_batch_input("a.article_date >= ? AND a.article_date < ?", (start_date, end_date),
+                                       chunk_size, max_requests, max_bytes)
+
+    def load_retry_requests(self, chunk_size=10000, max_requests=None, max_bytes=None):
+        """
+        재시도 대기열에 있는 기사(날짜와 무관)로 Batch 입력 파일을 만듭니다.
+
+        Returns:
+            list: [(Batch 입력 파일 경로, 요청 수)] (다시 임베딩할 기사가 없으면 빈 리스트)
+        """
+        return self._write_batch_input("a.id IN (SELECT article_id FROM emb.embedding_retry)", (),
+                                       chunk_size, max_requests, max_bytes)
+
+    def embed_articles(self, article_ids):
+        """
+        지정한 기사만 온라인 embed API(로컬 백엔드가 있으면 그 백엔드)로 바로 임베딩합니다 (실시간 크롤링 직후 사용).
+        같은 본문으로 이미 임베딩된 기사, 근접 중복 기사, 재시도 횟수를 모두 쓴 기사는 건너뜁니다.
+
+        Args:
+            article_ids (list): 임베딩할 기사 id 목록
+        """
+        if not article_ids:
+            return
+        placeholders = ', '.join('?' * len(article_ids))
+        shards = self._write_batch_input(f"a.id IN ({placeholders})", tuple(article_ids))
+        try:
+            if shards:
+                self.embed_online(shards)
+        finally:
+            for path, _ in shards:
+                if os.path.exists(path):
+                    os.remove(path)
     
     
-
     def create_batch_job(self, file_path):
         """
         Batch 입력 파일을 Google AI Studio에 업로드
@@ -192,6 +511,7 @@ class Embedder:
                 config={'display_name': "Input embeddings batch"},
             )
             print(f"Created batch job from file: {batch_job.name}")
+            self._record_submission(batch_job.name, file_path) # 결과와 비교할 제출 id 기록
             
             return batch_job
             
@@ -200,112 +520,313 @@ class Embedder:
             raise e
     
     
-    def Monitor_job_status(self, batch_job, check_interval=30, max_wait_time=3600):
+    def _record_submission(self, job_name, file_path):
+        """Batch 작업에 제출한 기사 id를 기록합니다."""
+        with open(file_path, 'rb') as f:
+            article_ids = [(job_name, int(parse_request_key(orjson.loads(line)['key'])[0])) for line in f if line.strip()]
+        self.embedding_db_cur.executemany('INSERT OR IGNORE INTO batch_submissions (job_name, article_id) VALUES (?, ?)', article_ids)
+        self.embedding_db_conn.commit()
+
+    def _enqueue_retry(self, failures):
+        """
+        임베딩하지 못한 기사를 재시도 대기열에 넣고 시도 횟수를 1 늘립니다.
+
+        Args:
+            failures (dict): {기사 id: 오류 메시지}
+        """
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        self.embedding_db_cur.executemany('''
+            INSERT INTO embedding_retry (article_id, attempts, last_error, updated_at) VALUES (?, 1, ?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET
+                attempts = attempts + 1, last_error = excluded.last_error, updated_at = excluded.updated_at
+        ''', [(int(id), str(error)[:RETRY_ERROR_MAX_LENGTH], updated_at) for id, error in failures.items()])
+        self.embedding_db_conn.commit()
+
+    def _reconcile_submission(self, job_name, stored_ids, errors, default_error):
+        """
+        작업에 제출한 기사 id와 저장한 기사 id를 비교해, 빠지거나 오류가 난 기사를 재시도 대기열에 넣습니다.
+
+        Args:
+            job_name (str): Batch 작업 이름
+            stored_ids (set): 결과에서 저장한 기사 id
+            errors (dict): {기사 id: 결과 파일의 오류 메시지}
+            default_error (str): 결과에 아예 없는 기사에 기록할 메시지
+        """
+        submitted = {row[0] for row in self.embedding_db_cur.execute(
+            'SELECT article_id FROM batch_submissions WHERE job_name = ?', (job_name,))}
+        if not submitted:
+            return # 제출 기록이 없는 작업 (기록을 시작하기 전에 제출된 작업)
+        missing = submitted - stored_ids
+        if missing:
+            self._enqueue_retry({id: errors.get(id, default_error) for id in missing})
+        self.embedding_db_cur.execute('DELETE FROM batch_submissions WHERE job_name = ?', (job_name,))
+        self.embedding_db_conn.commit()
+        print(f" 제출 {len(submitted):,}개 중 {len(submitted) - len(missing):,}개 저장 ({1 - len(missing) / len(submitted):.1%}), "
+              f"빠지거나 오류가 난 {len(missing):,}개는 재시도 대기열에 넣었습니다.")
+
+    def Monitor_job_status(self, batch_job, check_interval=POLL_INITIAL_INTERVAL, max_wait_time=JOB_DEADLINE):
         """
         Batch 작업 완료 대기
         
         Args:
             batch_job: Batch 작업 객체
-            check_interval (int): 상태 확인 간격 (초)
-            max_wait_time (int): 최대 대기 시간 (초)
+            check_interval (int): 첫 상태 확인 간격 (초, 상태가 그대로이면 점점 늘어남)
+            max_wait_time (int): 최대 대기 시간 (초, 지나면 작업을 취소)
             
         Returns:
-            object: 완료된 Batch 작업 상태 또는 None
+            object: 완료(또는 취소)된 Batch 작업
         """
         print(" Batch 작업 완료 대기 중...")
 
         print(f"Polling status for job: {batch_job.name}")
+        monitor = BatchJobMonitor(self.gemini_client, registry_path=None, initial_interval=check_interval)
+        return monitor.wait(batch_job.name, deadline_at=time.time() + max_wait_time)
 
-        # Poll the job status until it's completed.
-        while True:
-            batch_job = self.gemini_client.batches.get(name=batch_job.name)
-            if batch_job.state.name in ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED'):
-                break
-            print(f"Job not finished. Current state: {batch_job.state.name}. Waiting 30 seconds...")
-            time.sleep(30)
-
-        print(f"Job finished with state: {batch_job.state.name}")
-        if batch_job.state.name == 'JOB_STATE_FAILED':
-            print(f"Error: {batch_job.error}")
-        
-        return batch_job
-       
+    def _download_result_file(self, result_file_name, path):
+        """
+        Batch 결과 파일을 메모리에 올리지 않고 디스크로 스트리밍 다운로드합니다.
+
+        Args:
+            result_file_name (str): 결과 파일 이름 (files/...)
+            path (str): 저장할 로컬 파일 경로
+        """
+        url = f"{GEMINI_DOWNLOAD_URL}/{result_file_name}:download"
+        with httpx.stream('GET', url, params={'alt': 'media'}, headers={'x-goog-api-key': self.api_key},
+                          timeout=httpx.Timeout(60.0, read=300.0), follow_redirects=True) as response:
+            response.raise_for_status()
+            with open(path, 'wb') as f:
+                for block in response.iter_bytes(DOWNLOAD_BLOCK_SIZE):
+                    f.write(block)
 
-    def _download_and_store_embeddings(self, batch_job):
+    def _iter_result_embeddings(self, path, errors=None):
         """
-        임베딩을 ChromaDB에 저장
+        결과 파일을 한 줄씩 파싱해 (id, date, hash, embedding)을 반환하는 제너레이터
 
         Args:
-            batch_job: Batch 작업 객체
+            path (str): 결과 파일 경로
+            errors (dict): key는 있지만 embedding이 없는 줄의 {기사 id: 오류 메시지}를 기록할 dict
         """
-        if batch_job.state.name == 'JOB_STATE_SUCCEEDED':
-            # The output is in another file.
-            result_file_name = batch_job.dest.file_name
-            print(f"Results are in file: {result_file_name}")
+        pooler = ChunkPooler() # 청크 요청은 모두 도착하면 평균 풀링해 기사 하나로 반환
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                parsed_response = orjson.loads(line)
+                embedding = (parsed_response.get('response') or {}).get('embedding', {}).get('values')
+                key = parsed_response.get('key')
+                if key and embedding: # key와 embedding이 모두 존재할 때만 저장
+                    item = pooler.add(key, embedding)
+                    if item is not None:
+                        yield item
+                elif key and errors is not None:
+                    errors[int(parse_request_key(key)[0])] = parsed_response.get('error') or '결과에 임베딩이 없음'
+        if errors is not None:
+            for id in pooler.incomplete_ids():
+                errors.setdefault(id, '일부 청크 결과가 없음')
 
-            print("\nDownloading and parsing result file content...")
-            file_content_bytes = self.gemini_client.files.download(file=result_file_name)
-            file_content = file_content_bytes.decode('utf-8')
+    def _store_embedding_chunk(self, embeddings_with_keys):
+        """
+        임베딩 한 묶음을 ChromaDB와 embeddings.db에 저장합니다.
 
-        else:
-            print(f"Job did not succeed. Final state: {batch_job.state.name}")
-            return
+        ChromaDB를 먼저 저장하고, 본문 해시가 기록되는 embeddings.db는 그 다음에 저장합니다
+        (ChromaDB 저장이 실패하면 해시가 남지 않아 다음 실행에서 다시 임베딩됨).
+        결과 파일의 list, 청크 풀링/캐시/로컬 백엔드의 np.ndarray가 섞여 들어오므로 모두 float32 배열로 맞춥니다.
+        """
+        embeddings_with_keys = [(id, date, text_hash, np.asarray(embedding, dtype=np.float32))
+                                for id, date, text_hash, embedding in embeddings_with_keys]
+        self.collection.upsert(
+            ids=[str(id) for id, _, _, _ in embeddings_with_keys],
+            embeddings=[emb for _, _, _, emb in embeddings_with_keys],
+            metadatas=[{"article_date": date} for _, date, _, _ in embeddings_with_keys]
+        )
+        # 다시 실행하거나 기간이 겹쳐도 실패하지 않도록 upsert
+        self.embedding_db_cur.executemany('''
+            INSERT INTO embeddings (id, embedding, content_hash, model) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET embedding = excluded.embedding, content_hash = excluded.content_hash, model = excluded.model
+        ''', [(int(id), pack_embedding(embedding), text_hash, self.embedding_model) for id, _, text_hash, embedding in embeddings_with_keys])
+        self.embedding_db_cur.executemany('DELETE FROM embedding_retry WHERE article_id = ?',
+                                          [(int(id),) for id, _, _, _ in embeddings_with_keys])
+        self.embedding_db_conn.commit()
 
-        # 결과 파일 내용 파싱
-        embeddings_with_keys = []
-        for line in file_content.splitlines():
-            if line:
-                parsed_response = json.loads(line)
-                embedding = parsed_response.get('response', {}).get('embedding', {}).get('values')
+    def _store_results_chunk(self, embeddings_with_keys):
+        """Batch 결과 한 묶음을 저장하고 임베딩 캐시에도 넣습니다."""
+        self._store_embedding_chunk(embeddings_with_keys)
+        self.cache.put_many([(text_hash, embedding) for _, _, text_hash, embedding in embeddings_with_keys if text_hash])
 
-                # 'key' 값 추출 (새로 추가)
-                key = parsed_response.get('key')
-                if key:
-                    id, date = key.split('_', 1)
-                    # (key, embedding) 튜플 형태로 리스트에 추가
-                    if embedding:  # key와 embedding이 모두 존재할 때만 추가
-                        embeddings_with_keys.append((id, date, embedding))
-                
+    def _download_and_store_embeddings(self, batch_job, chunk_size=INGEST_CHUNK_SIZE):
+        """
+        결과 파일을 디스크로 받아 한 줄씩 읽으며 chunk_size개씩 ChromaDB와 embeddings.db에 저장합니다.
+        최대 메모리 사용량은 작업 크기가 아니라 chunk_size에 비례합니다.
+        저장을 마치면 제출한 기사 중 결과에서 빠지거나 오류가 난 기사를 재시도 대기열에 넣습니다
+        (작업이 실패/취소/만료되면 제출한 기사 전체, 저장 중 오류가 나면 아직 저장하지 못한 기사 전체).
+        결과 파일 다운로드가 실패하면 작업 기록을 남겨 다음 실행에서 다시 받습니다.
 
-        print(f" {len(embeddings_with_keys):,}개 임베딩 다운로드 완료")
-        
-        print(embeddings_with_keys) 
-            
+        Args:
+            batch_job: Batch 작업 객체
+            chunk_size (int): 한 번에 저장할 임베딩 수
+
+        Returns:
+            bool: 작업 처리를 마쳤는지 여부 (False이면 작업 기록을 남겨 다음 실행에서 다시 연결)
+        """
+        if batch_job.state.name != 'JOB_STATE_SUCCEEDED':
+            print(f"Job did not succeed. Final state: {batch_job.state.name}")
+            if batch_job.state.name in RESUBMIT_STATES:
+                self._reconcile_submission(batch_job.name, set(), {}, f"작업 상태 {batch_job.state.name}")
+            return False
+
+        # The output is in another file.
+        result_file_name = batch_job.dest.file_name
+        print(f"Results are in file: {result_file_name}")
+
+        temp_fd, result_path = tempfile.mkstemp(suffix='.jsonl', prefix="embedding_result")
+        os.close(temp_fd)
+        stored = 0
+        stored_ids = set()
+        errors = {}
         try:
-            self.embedding_db_cur.executemany('''
-                INSERT INTO embeddings (id, embedding) VALUES (?, ?)
-            ''', [(id, str(embedding)) for id, _, embedding in embeddings_with_keys])
-            self.embedding_db_conn.commit()
-            print(f" {len(embeddings_with_keys):,}개 임베딩 저장 완료")
+            try:
+                print("\nDownloading result file...")
+                self._download_result_file(result_file_name, result_path)
+                print(f" 결과 파일 다운로드 완료 ({os.path.getsize(result_path) / (1024 * 1024):,.1f}MB)")
+            except Exception as e:
+                print(f" 결과 파일 다운로드 실패 (다음 실행에서 다시 받음): {e}")
+                return False
+
+            try:
+                chunk = []
+                for item in self._iter_result_embeddings(result_path, errors):
+                    chunk.append(item)
+                    if len(chunk) >= chunk_size:
+                        self._store_results_chunk(chunk)
+                        stored_ids.update(int(id) for id, _, _, _ in chunk)
+                        stored += len(chunk)
+                        chunk = []
+                        print(f"저장 진행: {stored:,}개")
+                if chunk:
+                    self._store_results_chunk(chunk)
+                    stored_ids.update(int(id) for id, _, _, _ in chunk)
+                    stored += len(chunk)
+                print(f" {stored:,}개 임베딩 저장 완료")
+                self._reconcile_submission(batch_job.name, stored_ids, errors, '결과 파일에 없음')
+            except Exception as e:
+                # 같은 결과를 다시 받아도 같은 오류가 날 수 있으므로, 저장하지 못한 기사는 재시도 대기열로 옮기고 작업은 끝냄
+                print(f" 임베딩 저장 실패 ({stored:,}개까지 저장됨, 나머지는 재시도 대기열에 넣음): {e}")
+                self._reconcile_submission(batch_job.name, stored_ids, errors, f"결과 저장 실패: {e}")
+            return True
         except Exception as e:
-            print(f" 임베딩 데이터베이스 저장 실패: {e}")
+            print(f" 재시도 대기열 기록 실패 (다음 실행에서 작업에 다시 연결): {e}")
+            return False
+        finally:
+            if os.path.exists(result_path):
+                os.remove(result_path)
     
-        try:
-            ids = [id for id, _, _ in embeddings_with_keys]
-            embs = [emb for _, _, emb in embeddings_with_keys]
-            metadatas = [{"article_date": date} for _, date, _ in embeddings_with_keys]
+    def _use_online(self, shards):
+        """요청 수가 online_threshold 이하이면 온라인 모드를 사용합니다 (로컬 백엔드는 항상 온라인 모드)."""
+        request_count = sum(count for _, count in shards)
+        if self.backend is not None:
+            print(f"요청 {request_count:,}개를 로컬 백엔드 '{self.backend.model_name}'로 임베딩합니다.")
+            return True
+        use_online = request_count <= self.online_threshold
+        if use_online:
+            print(f"요청 {request_count:,}개가 {self.online_threshold:,}개 이하라 온라인 embed API로 임베딩합니다.")
+        return use_online
 
-            # ChromaDB에 데이터 추가 (청크 단위로 나누어 저장)
-            storage_chunk_size = 1000
-            
-            for i in range(0, len(ids), storage_chunk_size):
-                chunk_ids = ids[i:i+storage_chunk_size]
-                chunk_embeddings = embs[i:i+storage_chunk_size]
-                chunk_metadatas = metadatas[i:i+storage_chunk_size]
-                
-                self.collection.upsert(
-                    ids=chunk_ids,
-                    embeddings=chunk_embeddings,
-                    metadatas=chunk_metadatas
-                )
-                
-                print(f"저장 진행: {i+len(chunk_ids):,}/{len(ids):,}")
+    async def _embed_online_request(self, requests, limiter, semaphore):
+        """
+        텍스트 여러 개를 embed API 요청 하나로 보내고, 실패하면 지수 백오프(지터 포함)로 재시도합니다.
 
-            print(f"{len(embeddings_with_keys):,}개 임베딩 저장 완료")
+        Returns:
+            tuple: ([(key, embedding)], 재시도 후에도 실패하거나 응답에서 빠진 {기사 id: 오류})
+        """
+        texts = [request['request']['content']['parts'][0]['text'] for request in requests]
+        config = types.EmbedContentConfig(task_type=EMBEDDING_TASK_TYPE, output_dimensionality=EMBEDDING_DIMENSIONALITY)
+        async with semaphore:
+            for attempt in range(ONLINE_MAX_RETRIES + 1):
+                await limiter.acquire_async()
+                try:
+                    response = await self.gemini_client.aio.models.embed_content(
+                        model=self.embedding_model, contents=texts, config=config
+                    )
+                    break
+                except Exception as e:
+                    status = getattr(e, 'code', None)
+                    if attempt == ONLINE_MAX_RETRIES or (isinstance(status, int) and status not in RETRYABLE_STATUS):
+                        print(f" embed 요청 실패 ({len(requests)}개 텍스트, 재시도 대기열에 넣음): {e}")
+                        return [], {int(parse_request_key(request['key'])[0]): e for request in requests}
+                    backoff = min(ONLINE_BACKOFF_MAX, ONLINE_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+                    print(f" embed 요청 오류 ({e}), {backoff:.1f}초 후 재시도 ({attempt + 1}/{ONLINE_MAX_RETRIES})")
+                    await asyncio.sleep(backoff)
+        missing = {int(parse_request_key(request['key'])[0]): '응답에 임베딩이 없음' for request in requests[len(response.embeddings):]}
+        return [(request['key'], embedding.values) for request, embedding in zip(requests, response.embeddings)], missing
+
+    def _store_pooled(self, pooler, results):
+        """(key, embedding) 결과를 기사 단위로 모아 청크가 모두 도착한 기사만 저장하고, 저장한 기사 수를 반환합니다."""
+        embeddings_with_keys = [item for item in (pooler.add(key, embedding) for key, embedding in results) if item is not None]
+        if embeddings_with_keys:
+            self._store_results_chunk(embeddings_with_keys)
+        return len(embeddings_with_keys)
+
+    async def _embed_online_all(self, requests):
+        limiter = TokenBucket(ONLINE_RATE_LIMIT, capacity=ONLINE_CONCURRENCY)
+        semaphore = asyncio.Semaphore(ONLINE_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(self._embed_online_request(requests[i:i + ONLINE_TEXTS_PER_REQUEST], limiter, semaphore))
+            for i in range(0, len(requests), ONLINE_TEXTS_PER_REQUEST)
+        ]
+        pooler = ChunkPooler() # 한 기사의 청크가 서로 다른 요청으로 나뉘어도 모아서 풀링
+        failures = {}
+        stored = failed = 0
+        for task in asyncio.as_completed(tasks): # 끝난 요청부터 바로 저장
+            results, request_failures = await task
+            failures.update(request_failures)
+            if not results:
+                failed += 1
+            stored += self._store_pooled(pooler, results)
+        return stored, failed, failures, pooler
+
+    def _embed_with_backend(self, requests):
+        """로컬 백엔드로 INGEST_CHUNK_SIZE개씩 임베딩해 저장합니다."""
+        pooler = ChunkPooler()
+        failures = {}
+        stored = failed = 0
+        for i in range(0, len(requests), INGEST_CHUNK_SIZE):
+            chunk = requests[i:i + INGEST_CHUNK_SIZE]
+            try:
+                embeddings = self.backend.embed([request['request']['content']['parts'][0]['text'] for request in chunk])
+            except Exception as e:
+                print(f" 로컬 임베딩 실패 ({len(chunk)}개 텍스트, 재시도 대기열에 넣음): {e}")
+                failures.update({int(parse_request_key(request['key'])[0]): e for request in chunk})
+                failed += 1
+                continue
+            stored += self._store_pooled(pooler, [(request['key'], embedding) for request, embedding in zip(chunk, embeddings)])
+        return stored, failed, failures, pooler
+
+    def embed_online(self, shards):
+        """
+        Batch 입력 파일의 요청을 동기 embed API로 바로 임베딩해 Batch 결과와 같은 저장소에 저장합니다.
+        요청을 ONLINE_TEXTS_PER_REQUEST개씩 묶어 최대 ONLINE_CONCURRENCY개를 동시에 보내고,
+        초당 ONLINE_RATE_LIMIT개로 속도를 제한합니다. 로컬 백엔드가 있으면 그 백엔드로 임베딩합니다.
+        실패하거나 응답에서 빠진 요청(청크 일부만 빠진 기사 포함)의 기사는 재시도 대기열에 넣습니다.
+
+        Args:
+            shards (list): load_data_and_store가 만든 [(입력 파일 경로, 요청 수)]
+        """
+        requests = []
+        for path, _ in shards:
+            with open(path, 'rb') as f:
+                requests.extend(orjson.loads(line) for line in f if line.strip())
+        started = time.perf_counter()
+        if self.backend is not None:
+            stored, failed, failures, pooler = self._embed_with_backend(requests)
+        else:
+            stored, failed, failures, pooler = asyncio.run(self._embed_online_all(requests))
+        for id in pooler.incomplete_ids():
+            failures.setdefault(id, '일부 청크 결과가 없음')
+        if failures:
+            self._enqueue_retry(failures)
+        print(f" 온라인 모드로 요청 {len(requests):,}개, 기사 {stored:,}개 임베딩 저장 완료 "
+              f"({time.perf_counter() - started:.1f}초, 실패한 요청 {failed}개, 재시도 대기 기사 {len(failures):,}개)")
 
-        except Exception as e:
-            print(f" ChromaDB 저장 실패: {e}")
-    
     def embed_and_store_batch(self, start_date, end_date, chunk_size=10000):
         """
         Batch API를 사용한 대량 임베딩 및 저장
@@ -319,26 +840,170 @@ class Embedder:
         print(f"\nBatch API를 사용하여 임베딩을 시작합니다...")
         print(f"설정: DB 청크={chunk_size:,}")
         
+        temp_file = None
         try:
-            # 먼저 모든 데이터를 수집
-            temp_file = self.load_data_and_store(start_date, end_date, chunk_size) # start_date, end_date 기간의 모든 데이터를 jsonl 파일로 생성
-            created_batch_job = self.create_batch_job(temp_file) # Batch 작업 생성
-            final_batch_job = self.Monitor_job_status(created_batch_job) # 작업 완료 대기
-
-            if final_batch_job.state.name == 'JOB_STATE_SUCCEEDED':
-                print("배치 작업이 성공적으로 완료되었습니다.")
+            monitor = BatchJobMonitor(self.gemini_client)
+            self._resume_registered_jobs(monitor) # 이전 실행의 작업부터 마무리
+            # 먼저 임베딩이 필요한 데이터를 수집
+            shards = self.load_data_and_store(start_date, end_date, chunk_size) # start_date, end_date 기간 중 새로 임베딩할 데이터를 jsonl 파일로 생성
+            if not shards:
+                print("새로 임베딩할 기사가 없어 Batch 작업을 만들지 않습니다.")
+            elif self._use_online(shards):
+                temp_file = shards[0][0]
+                self.embed_online(shards)
             else:
-                print(f"배치 작업이 실패하였습니다. 최종 상태: {final_batch_job.state.name}")
-                
-            self._download_and_store_embeddings(final_batch_job) # 임베딩 다운로드 및 ChromaDB에 저장
+                temp_file = shards[0][0]
+                created_batch_job = self.create_batch_job(temp_file) # Batch 작업 생성
+                tag = f"{EMBEDDING_JOB_TAG}{start_date}_{end_date}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                monitor.register(tag, created_batch_job.name) # 중간에 종료되어도 다음 실행에서 다시 연결
+                final_batch_job = self.Monitor_job_status(created_batch_job) # 작업 완료 대기
+
+                if final_batch_job.state.name == 'JOB_STATE_SUCCEEDED':
+                    print("배치 작업이 성공적으로 완료되었습니다.")
+                else:
+                    print(f"배치 작업이 실패하였습니다. 최종 상태: {final_batch_job.state.name}")
+                    
+                if self._download_and_store_embeddings(final_batch_job) or final_batch_job.state.name in RESUBMIT_STATES: # 임베딩 다운로드 및 ChromaDB에 저장
+                    monitor.forget(tag)
+
+            self.retry_failed_embeddings(monitor, chunk_size) # 결과에서 빠지거나 오류가 난 기사 다시 임베딩
+            self.report_coverage(start_date, end_date)
             
         except Exception as e:
             print(f"임베딩 및 저장 중 오류 발생: {e}")
         finally:
             # 임시 파일 삭제
-            if os.path.exists(temp_file):
+            if temp_file and os.path.exists(temp_file):
                 os.remove(temp_file)
                 print(f"임시 파일 '{temp_file}'이(가) 삭제되었습니다.")
+
+    def _watch_embedding_job(self, monitor, tag, job_name, deadline_at=None):
+        """작업이 끝나면 바로 결과를 저장하고, 저장에 성공하면 작업 기록을 지우도록 등록합니다."""
+        def on_done(batch_job):
+            if self._download_and_store_embeddings(batch_job) or batch_job.state.name in RESUBMIT_STATES:
+                monitor.forget(tag) # 실패/취소/만료된 작업의 기사는 재시도 대기열로 옮겨짐
+        monitor.watch(job_name, on_done, deadline_at)
+
+    def _submit_shards(self, monitor, shards, tag_prefix, max_wait_time=JOB_DEADLINE):
+        """입력 파일(샤드)마다 Batch 작업을 제출하고 기록한 뒤 모니터에 등록합니다 (monitor.run()은 호출하는 쪽에서)."""
+        for i, (path, count) in enumerate(shards, 1):
+            print(f"입력 파일 {i}/{len(shards)} 제출 ({count:,}개 요청)")
+            batch_job = self.create_batch_job(path)
+            tag = f"{tag_prefix}_{i}"
+            monitor.register(tag, batch_job.name, max_wait_time)
+            self._watch_embedding_job(monitor, tag, batch_job.name, time.time() + max_wait_time)
+
+    def _resume_registered_jobs(self, monitor):
+        """
+        이전 실행에서 제출하고 결과를 저장하지 못한 임베딩 작업에 다시 연결해 끝날 때까지 처리합니다.
+        (다시 제출하면 같은 기사를 두 번 임베딩하게 되므로 새 입력 파일을 만들기 전에 호출)
+        """
+        if self.gemini_client is None: # 로컬 백엔드는 Batch 작업을 만들지 않음
+            return
+        registered = monitor.registered(EMBEDDING_JOB_TAG)
+        if not registered:
+            return
+        print(f"이전에 제출한 임베딩 작업 {len(registered)}개에 다시 연결합니다.")
+        for tag, job_name, deadline_at in registered:
+            self._watch_embedding_job(monitor, tag, job_name, deadline_at)
+        monitor.run()
+
+    def retry_failed_embeddings(self, monitor, chunk_size=10000, max_wait_time=JOB_DEADLINE):
+        """
+        재시도 대기열의 기사를 다시 임베딩합니다. 기사가 적으면 온라인 모드로, 많으면 후속 Batch 작업으로 보냅니다.
+        실패할 때마다 시도 횟수가 늘어나므로 max_attempts번을 넘기면 대기열에 남기고 더 이상 제출하지 않습니다.
+
+        Args:
+            monitor (BatchJobMonitor): 후속 Batch 작업을 확인할 모니터
+            chunk_size (int): 데이터베이스 청크 크기
+            max_wait_time (int): 후속 작업별 최대 대기 시간 (초)
+        """
+        for round_number in range(1, self.max_attempts + 1):
+            shards = self.load_retry_requests(chunk_size, SHARD_MAX_REQUESTS, SHARD_MAX_BYTES)
+            if not shards:
+                return
+            print(f"\n재시도 {round_number}회차: 빠지거나 오류가 난 기사를 다시 임베딩합니다 (요청 {sum(count for _, count in shards):,}개).")
+            try:
+                if self._use_online(shards):
+                    self.embed_online(shards)
+                else:
+                    self._submit_shards(monitor, shards, f"{EMBEDDING_JOB_TAG}retry_{datetime.now().strftime('%Y%m%d%H%M%S')}", max_wait_time)
+                    monitor.run()
+            finally:
+                for path, _ in shards:
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def report_coverage(self, start_date, end_date):
+        """
+        기간 내 임베딩 대상 기사 중 임베딩이 저장된 비율을 출력합니다.
+
+        Returns:
+            tuple: (임베딩된 기사 수, 임베딩 대상 기사 수)
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("ATTACH DATABASE ? AS emb", (self.embedding_db_path,))
+        query = """
+            SELECT COUNT(*),
+                   COALESCE(SUM(e.id IS NOT NULL), 0),
+                   COALESCE(SUM(e.id IS NULL AND r.attempts < ?), 0),
+                   COALESCE(SUM(e.id IS NULL AND r.attempts >= ?), 0)
+            FROM articles a
+            LEFT JOIN emb.embeddings e ON e.id = a.id
+            LEFT JOIN emb.embedding_retry r ON r.article_id = a.id
+            WHERE a.content IS NOT NULL AND a.content != '' AND a.article_date >= ? AND a.article_date < ?"""
+        if 'canonical_id' in [info[1] for info in conn.execute("PRAGMA table_info(articles)")]:
+            query += " AND a.canonical_id IS NULL"
+        try:
+            total, embedded, pending, given_up = conn.execute(query, (self.max_attempts, self.max_attempts, start_date, end_date)).fetchone()
+        finally:
+            conn.close()
+        print(f"\n임베딩 커버리지 ({start_date} ~ {end_date}): {embedded:,}/{total:,}개 ({embedded / total if total else 1:.1%}), "
+              f"재시도 대기 {pending:,}개, 재시도 횟수 초과 {given_up:,}개")
+        return embedded, total
+
+    def embed_and_store_backfill(self, start_date, end_date, chunk_size=10000,
+                                 max_requests=SHARD_MAX_REQUESTS, max_bytes=SHARD_MAX_BYTES,
+                                 check_interval=POLL_INITIAL_INTERVAL, max_wait_time=JOB_DEADLINE):
+        """
+        여러 날짜를 크기 제한이 있는 입력 파일(샤드)로 묶어 Batch 작업을 한꺼번에 제출하고,
+        끝나는 작업부터 결과를 저장합니다. 기간 전체에서 이 Embedder 하나만 사용합니다.
+        제출한 작업 id는 기록해두므로, 중간에 종료한 뒤 다시 실행하면 기존 작업에 다시 연결합니다.
+        결과에서 빠지거나 오류가 난 기사는 후속 작업으로 다시 임베딩하고, 마지막에 커버리지를 출력합니다.
+
+        Args:
+            start_date (str): 시작 날짜
+            end_date (str): 종료 날짜 (포함하지 않음)
+            chunk_size (int): 데이터베이스 청크 크기
+            max_requests (int): 샤드당 최대 요청 수
+            max_bytes (int): 샤드당 최대 파일 크기 (바이트)
+            check_interval (int): 첫 상태 확인 간격 (초)
+            max_wait_time (int): 작업별 최대 대기 시간 (초)
+        """
+        print(f"\nBatch API로 {start_date} ~ {end_date} 기간을 한꺼번에 임베딩합니다...")
+        monitor = BatchJobMonitor(self.gemini_client, initial_interval=check_interval)
+        shards = []
+        try:
+            self._resume_registered_jobs(monitor)
+            shards = self.load_data_and_store(start_date, end_date, chunk_size, max_requests, max_bytes)
+            if not shards:
+                print("새로 임베딩할 기사가 없어 Batch 작업을 만들지 않습니다.")
+            elif self._use_online(shards):
+                self.embed_online(shards)
+            else:
+                # 모든 샤드를 먼저 제출해 서버에서 동시에 처리되도록 함
+                submitted_at = datetime.now().strftime('%Y%m%d%H%M%S')
+                self._submit_shards(monitor, shards, f"{EMBEDDING_JOB_TAG}{start_date}_{end_date}_{submitted_at}", max_wait_time)
+                monitor.run() # 끝난 작업부터 바로 결과 저장
+
+            self.retry_failed_embeddings(monitor, chunk_size, max_wait_time)
+            self.report_coverage(start_date, end_date)
+        except Exception as e:
+            print(f"임베딩 및 저장 중 오류 발생: {e}")
+        finally:
+            for path, _ in shards:
+                if os.path.exists(path):
+                    os.remove(path)
         
 def batch_embedding_main(start, end):
     """메인 실행 함수 (Batch API 전용)"""
@@ -356,7 +1021,24 @@ def batch_embedding_main(start, end):
     except Exception as e:
         print(f"메인 실행 중 오류 발생: {e}")
 
+def batch_embedding_backfill_main(start, end):
+    """
+    여러 날짜를 한 번에 임베딩하는 실행 함수 (Batch API 전용)
+
+    Args:
+        start (str): 시작 날짜 (YYYY-MM-DD 형식)
+        end (str): 마지막 날짜 (YYYY-MM-DD 형식, 포함)
+    """
+    try:
+        embedder = Embedder() # 기간 전체에서 클라이언트와 DB 연결을 재사용
+        embedder.embed_and_store_backfill(
+            start_date=start,
+            end_date=(pd.Timestamp(end) + timedelta(days=1)).strftime('%Y-%m-%d'),
+            chunk_size=10000,
+        )
+    except Exception as e:
+        print(f"메인 실행 중 오류 발생: {e}")
+
    
 if __name__ == "__main__":
-   for day in pd.date_range(start='2025-08-27', end='2025-11-18', freq='1D'):
-     batch_embedding_main(start=day.strftime('%Y-%m-%d'), end=(day + timedelta(days=1)).strftime('%Y-%m-%d'))
+   batch_embedding_backfill_main(start='2025-08-27', end='2025-11-18')
@@ -0,0 +1,91 @@
+import sqlite3
+from datetime import datetime
+from embedding_store import pack_embedding, unpack_embedding #임베딩 BLOB 형식
+
+EMBEDDING_CACHE_PATH = 'data/embedding_cache.db' # 실행/컬렉션 간에 공유하는 임베딩 캐시 경로
+CACHE_LOOKUP_BATCH = 500 # 한 번에 조회할 해시 수 (SQLite 변수 개수 제한 이내)
+
+class EmbeddingCache:
+    """
+    임베딩 텍스트의 sha256으로 임베딩을 찾는 영구 캐시
+
+    키는 (모델, task_type, 차원, sha256(텍스트))이고 값은 embedding_store 형식의 float32 BLOB입니다.
+    같은 텍스트가 다시 크롤링되거나 DB/컬렉션을 새로 만들어도 API를 다시 호출하지 않습니다.
+    """
+    def __init__(self, model, task_type, dimensionality, path=EMBEDDING_CACHE_PATH):
+        """
+        Args:
+            model (str): 임베딩 모델 이름
+            task_type (str): 임베딩 task_type
+            dimensionality (int): 출력 차원
+            path (str): 캐시 DB 경로
+        """
+        self.key = (model, task_type, dimensionality)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT,
+                task_type TEXT,
+                dimensionality INTEGER,
+                text_hash TEXT,
+                embedding BLOB,
+                created_at TEXT,
+                PRIMARY KEY (model, task_type, dimensionality, text_hash)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, text_hashes):
+        """
+        캐시에 있는 임베딩을 찾습니다. 찾은 개수와 못 찾은 개수는 적중률 집계에 더해집니다.
+
+        Args:
+            text_hashes (list): 임베딩 텍스트 sha256 목록
+
+        Returns:
+            dict: {sha256: np.ndarray(float32)}
+        """
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        found = {}
+        for i in range(0, len(unique_hashes), CACHE_LOOKUP_BATCH):
+            batch = unique_hashes[i:i + CACHE_LOOKUP_BATCH]
+            placeholders = ','.join('?' for _ in batch)
+            rows = self.conn.execute(f'''
+                SELECT text_hash, embedding FROM embedding_cache
+                WHERE model = ? AND task_type = ? AND dimensionality = ? AND text_hash IN ({placeholders})
+            ''', (*self.key, *batch))
+            found.update((text_hash, unpack_embedding(blob)) for text_hash, blob in rows)
+        hits = sum(1 for text_hash in text_hashes if text_hash in found)
+        self.hits += hits
+        self.misses += len(text_hashes) - hits
+        return found
+
+    def put_many(self, items):
+        """
+        임베딩을 캐시에 저장합니다.
+
+        Args:
+            items (list): [(sha256, 임베딩 벡터)]
+        """
+        created_at = datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO embedding_cache (model, task_type, dimensionality, text_hash, embedding, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(*self.key, text_hash, pack_embedding(embedding), created_at) for text_hash, embedding in items])
+        self.conn.commit()
+
+    @property
+    def hit_rate(self):
+        """이번 실행의 캐시 적중률 (조회가 없으면 0)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        """실행 요약용 한 줄 문자열"""
+        return f"임베딩 캐시 적중 {self.hits:,}/{self.hits + self.misses:,}개 ({self.hit_rate:.1%})"
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,113 @@
+import sqlite3, struct, json
+import numpy as np
+
+EMBEDDING_RDB_PATH = 'data/embeddings.db' # 임베딩 저장 DB 경로 (embedding_batch와 동일)
+
+# BLOB 앞 4바이트 헤더: 형식 버전(uint8), dtype 코드(uint8), 차원(uint16), little-endian
+HEADER = struct.Struct('<BBH')
+FORMAT_VERSION = 1
+DTYPE_CODES = {1: np.dtype('<f4')} # dtype 코드 -> NumPy dtype
+FLOAT32 = 1
+MIGRATE_BATCH_SIZE = 1000 # 마이그레이션 시 한 번에 변환할 행 수
+
+def pack_embedding(values):
+    """
+    임베딩 벡터를 헤더가 붙은 little-endian float32 BLOB으로 변환합니다.
+
+    Args:
+        values (list | np.ndarray): 임베딩 벡터
+
+    Returns:
+        bytes: 헤더(4바이트) + float32 값
+    """
+    vector = np.asarray(values, dtype='<f4')
+    return HEADER.pack(FORMAT_VERSION, FLOAT32, vector.shape[0]) + vector.tobytes()
+
+def unpack_embedding(value):
+    """
+    저장된 임베딩 하나를 NumPy 배열로 읽습니다. 마이그레이션 전의 TEXT("[0.1, ...]")도 읽을 수 있습니다.
+
+    Returns:
+        np.ndarray: float32 벡터
+    """
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32)
+    version, dtype_code, dim = HEADER.unpack_from(value)
+    if version != FORMAT_VERSION or dtype_code not in DTYPE_CODES:
+        raise ValueError(f"지원하지 않는 임베딩 형식입니다 (version={version}, dtype={dtype_code})")
+    return np.frombuffer(value, dtype=DTYPE_CODES[dtype_code], count=dim, offset=HEADER.size)
+
+def load_embeddings(conn, ids=None):
+    """
+    embeddings 테이블의 벡터를 (n, dim) float32 배열로 한 번에 읽습니다.
+    BLOB 본문을 b''.join으로 하나의 버퍼에 한 번 복사해 이어 붙이고, np.frombuffer로 그 버퍼를 추가 복사 없이 배열로 씁니다.
+    (행마다 배열을 만들어 np.vstack하는 것보다 복사와 임시 객체가 적음, 반환 배열은 읽기 전용)
+
+    Args:
+        conn (sqlite3.Connection): embeddings.db 연결
+        ids (list): 읽을 기사 id (없으면 전체, id 순서)
+
+    Returns:
+        tuple: (ids np.ndarray(int64), embeddings np.ndarray(n, dim) float32)
+    """
+    if ids is None:
+        rows = conn.execute('SELECT id, embedding FROM embeddings ORDER BY id').fetchall()
+    else:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS wanted_ids (id INTEGER PRIMARY KEY)')
+        conn.execute('DELETE FROM wanted_ids')
+        conn.executemany('INSERT OR IGNORE INTO wanted_ids (id) VALUES (?)', ((int(i),) for i in ids))
+        rows = conn.execute('''
+            SELECT e.id, e.embedding FROM embeddings e JOIN wanted_ids w ON w.id = e.id ORDER BY e.id
+        ''').fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+
+    if any(isinstance(value, str) for _, value in rows): # 마이그레이션 전 TEXT 행이 섞여 있으면 행 단위로 변환
+        return np.array([row[0] for row in rows], dtype=np.int64), np.vstack([unpack_embedding(value) for _, value in rows])
+
+    headers = {bytes(value[:HEADER.size]) for _, value in rows}
+    if len(headers) != 1:
+        raise ValueError(f"차원이나 형식이 다른 임베딩이 섞여 있습니다: {[HEADER.unpack(h) for h in headers]}")
+    version, dtype_code, dim = HEADER.unpack(headers.pop())
+    if version != FORMAT_VERSION or dtype_code not in DTYPE_CODES:
+        raise ValueError(f"지원하지 않는 임베딩 형식입니다 (version={version}, dtype={dtype_code})")
+    buffer = b''.join(memoryview(value)[HEADER.size:] for _, value in rows)
+    matrix = np.frombuffer(buffer, dtype=DTYPE_CODES[dtype_code]).reshape(len(rows), dim)
+    return np.array([row[0] for row in rows], dtype=np.int64), matrix
+
+def migrate_text_embeddings(db_path=EMBEDDING_RDB_PATH, batch_size=MIGRATE_BATCH_SIZE, vacuum=True):
+    """
+    str(list) TEXT로 저장된 기존 임베딩을 float32 BLOB으로 변환합니다 (여러 번 실행해도 안전).
+
+    Args:
+        db_path (str): embeddings.db 경로
+        batch_size (int): 한 번에 변환/커밋할 행 수
+        vacuum (bool): 변환 후 VACUUM으로 디스크 공간을 회수할지 여부
+    """
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM embeddings WHERE typeof(embedding) = 'text'").fetchone()[0]
+    print(f"TEXT 임베딩 {total:,}개를 float32 BLOB으로 변환합니다.")
+    converted = 0
+    last_id = -1
+    while True:
+        rows = conn.execute('''
+            SELECT id, embedding FROM embeddings
+            WHERE typeof(embedding) = 'text' AND id > ? ORDER BY id LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            'UPDATE embeddings SET embedding = ? WHERE id = ?',
+            [(pack_embedding(json.loads(value)), article_id) for article_id, value in rows]
+        )
+        conn.commit()
+        last_id = rows[-1][0]
+        converted += len(rows)
+        print(f"변환 진행: {converted:,}/{total:,}")
+    if vacuum and converted:
+        conn.execute('VACUUM')
+    conn.close()
+    print(f"총 {converted:,}개 임베딩을 변환했습니다.")
+
+if __name__ == '__main__':
+    migrate_text_embeddings()
@@ -0,0 +1,97 @@
+import os, hashlib, zlib #압축 저장 라이브러리
+import sqlite3, threading
+from datetime import datetime
+
+ARCHIVE_DIR = 'data/html_archive' # 원본 HTML 보관 디렉토리
+COMPRESS_LEVEL = 6 # zlib 압축 수준
+
+class HtmlArchive:
+    """
+    크롤링한 목록/기사 페이지 원본 HTML을 압축해 보관하는 저장소
+
+    본문은 내용의 sha256으로 이름 붙인 zlib 압축 파일(objects/ab/cdef...)로 저장하고
+    (같은 내용은 한 번만 저장), URL과 수집 시각은 index.db에 기록합니다.
+    추출 로직이 바뀌면 다시 크롤링하지 않고 보관된 HTML에서 기사를 재추출할 수 있습니다.
+    """
+    def __init__(self, root=ARCHIVE_DIR):
+        """
+        Args:
+            root (str): 보관 디렉토리 경로
+        """
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.lock = threading.Lock()
+        # 여러 크롤링 스레드/백필 워커가 함께 쓰므로 잠금 대기 시간을 넉넉히 설정하고,
+        # 쓰기 잠금을 오래 잡지 않도록 색인 행마다 바로 커밋 (autocommit)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL') # WAL에서는 커밋마다 fsync하지 않아도 손상되지 않음
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT,
+                kind TEXT,
+                fetched_at TEXT,
+                sha256 TEXT,
+                size INTEGER,
+                PRIMARY KEY (url, fetched_at)
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_kind ON pages(kind, url)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:] + '.zz')
+
+    def store(self, url, kind, body):
+        """
+        페이지 원본을 보관합니다.
+        색인 기록에 실패해도 크롤링은 계속되도록 예외를 내보내지 않습니다 (원본 파일은 이미 저장됨).
+
+        Args:
+            url (str): 페이지 주소
+            kind (str): 'list' 또는 'article'
+            body (bytes): 응답 본문 원본
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(body, COMPRESS_LEVEL))
+            os.replace(tmp_path, path) # 완전히 쓴 파일만 보이도록 교체
+        try:
+            with self.lock:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO pages (url, kind, fetched_at, sha256, size) VALUES (?, ?, ?, ?, ?)',
+                    (url, kind, datetime.now().isoformat(timespec='microseconds'), digest, len(body))
+                )
+        except sqlite3.Error as e:
+            print(f"!!! 원본 HTML 색인 기록 실패 ({url}): {e}")
+
+    def load(self, digest):
+        """sha256으로 보관된 원본을 읽어 압축을 풀어 반환합니다."""
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def iter_latest(self, kind='article'):
+        """
+        URL별 가장 최근에 수집한 페이지를 순서대로 반환합니다.
+
+        Yields:
+            tuple: (url, fetched_at, body)
+        """
+        rows = self.conn.execute('''
+            SELECT url, MAX(fetched_at), sha256 FROM pages WHERE kind = ? GROUP BY url ORDER BY url
+        ''', (kind,)).fetchall()
+        for url, fetched_at, digest in rows:
+            yield url, fetched_at, self.load(digest)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
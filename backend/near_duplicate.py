@@ -0,0 +1,139 @@
+import re
+import numpy as np
+import mmh3 #MinHash용 해시 라이브러리
+
+NUM_PERM = 128 # MinHash 시그니처 길이
+LSH_BANDS = 16 # LSH 밴드 수 (밴드당 NUM_PERM // LSH_BANDS개 행, 유사도 약 0.7부터 후보가 됨)
+SHINGLE_SIZE = 5 # 글자 단위 shingle 길이
+DUPLICATE_THRESHOLD = 0.8 # 추정 자카드 유사도가 이 값 이상이면 근접 중복으로 판단
+MIN_CONTENT_LENGTH = 100 # 이보다 짧은 본문은 중복 판단에서 제외 ('No Content Found' 등)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1) # 모든 실행에서 같은 순열을 쓰도록 시드 고정
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+def setup_tables(local_cur):
+    """articles.canonical_id 컬럼과 MinHash/LSH 색인 테이블을 준비합니다."""
+    local_cur.execute("PRAGMA table_info(articles)")
+    if 'canonical_id' not in [info[1] for info in local_cur.fetchall()]:
+        # 근접 중복 기사는 대표 기사 id를, 대표(원본) 기사는 NULL을 가짐
+        local_cur.execute('ALTER TABLE articles ADD COLUMN canonical_id INTEGER')
+    local_cur.execute('''
+        CREATE TABLE IF NOT EXISTS article_minhash (
+            article_id INTEGER PRIMARY KEY,
+            signature BLOB
+        )
+    ''')
+    local_cur.execute('''
+        CREATE TABLE IF NOT EXISTS minhash_bands (
+            band INTEGER,
+            bucket INTEGER,
+            article_id INTEGER
+        )
+    ''')
+    local_cur.execute('CREATE INDEX IF NOT EXISTS idx_minhash_bands ON minhash_bands(band, bucket)')
+
+def minhash_signature(text):
+    """
+    본문의 MinHash 시그니처를 계산합니다.
+
+    Args:
+        text (str): 기사 본문
+
+    Returns:
+        np.ndarray: uint32 NUM_PERM개 (본문이 너무 짧으면 None)
+    """
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) < MIN_CONTENT_LENGTH:
+        return None
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((mmh3.hash(s, signed=False) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (shingle 수, NUM_PERM) 행렬에서 순열별 최솟값 (곱셈의 uint64 overflow는 의도된 동작)
+    with np.errstate(over='ignore'):
+        permuted = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def _band_buckets(signature):
+    rows = NUM_PERM // LSH_BANDS
+    return [(band, mmh3.hash(signature[band * rows:(band + 1) * rows].tobytes(), band)) for band in range(LSH_BANDS)]
+
+class NearDuplicateIndex:
+    """
+    news.db에 저장된 LSH 색인으로 새 기사의 근접 중복 여부를 판단하는 클래스
+
+    대표 기사만 색인에 넣고, 새 기사는 같은 밴드 버킷에 있는 후보와 시그니처를 비교해
+    유사도가 DUPLICATE_THRESHOLD 이상인 대표 기사가 있으면 그 id를 canonical_id로 기록합니다.
+    """
+    def __init__(self, local_conn):
+        """
+        Args:
+            local_conn (sqlite3.Connection): news.db 연결 (호출자가 커밋)
+        """
+        self.conn = local_conn
+
+    def assign(self, article_id, content):
+        """
+        기사의 대표 기사를 정해 기록합니다.
+
+        Returns:
+            int | None: 근접 중복이면 대표 기사 id, 아니면 None
+        """
+        signature = minhash_signature(content or '')
+        if signature is None:
+            return None
+        buckets = _band_buckets(signature)
+        candidates = set()
+        for band, bucket in buckets:
+            candidates.update(row[0] for row in self.conn.execute(
+                'SELECT article_id FROM minhash_bands WHERE band = ? AND bucket = ?', (band, bucket)
+            ))
+        candidates.discard(article_id)
+
+        best_id, best_score = None, DUPLICATE_THRESHOLD
+        for candidate_id in candidates:
+            row = self.conn.execute('SELECT signature FROM article_minhash WHERE article_id = ?', (candidate_id,)).fetchone()
+            score = float(np.mean(np.frombuffer(row[0], dtype=np.uint32) == signature))
+            if score >= best_score:
+                best_id, best_score = candidate_id, score
+
+        if best_id is not None:
+            self.conn.execute('UPDATE articles SET canonical_id = ? WHERE id = ?', (best_id, article_id))
+            return best_id
+        # 대표 기사만 색인에 추가
+        self.conn.execute(
+            'INSERT OR REPLACE INTO article_minhash (article_id, signature) VALUES (?, ?)',
+            (article_id, signature.tobytes())
+        )
+        self.conn.executemany(
+            'INSERT INTO minhash_bands (band, bucket, article_id) VALUES (?, ?, ?)',
+            [(band, bucket, article_id) for band, bucket in buckets]
+        )
+        return None
+
+def mark_existing_duplicates(db_path='data/news.db', commit_every=1000):
+    """이미 저장된 기사 중 아직 색인되지 않은 기사의 근접 중복 여부를 id 순서대로 판단합니다."""
+    import sqlite3
+    local_conn = sqlite3.connect(db_path)
+    setup_tables(local_conn.cursor())
+    index = NearDuplicateIndex(local_conn)
+    article_ids = [row[0] for row in local_conn.execute('''
+        SELECT id FROM articles
+        WHERE canonical_id IS NULL AND id NOT IN (SELECT article_id FROM article_minhash)
+        ORDER BY id
+    ''')]
+    duplicates = 0
+    for i, article_id in enumerate(article_ids, 1):
+        content = local_conn.execute('SELECT content FROM articles WHERE id = ?', (article_id,)).fetchone()[0]
+        if index.assign(article_id, content) is not None:
+            duplicates += 1
+        if i % commit_every == 0:
+            local_conn.commit()
+            print(f"{i:,}/{len(article_ids):,}개 검사 (근접 중복 {duplicates:,}개)")
+    local_conn.commit()
+    local_conn.close()
+    print(f"총 {len(article_ids):,}개 기사 중 근접 중복 {duplicates:,}개를 표시했습니다.")
+
+if __name__ == '__main__':
+    mark_existing_duplicates()
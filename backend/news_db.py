@@ -0,0 +1,270 @@
+import sqlite3 #DB처리 라이브러리
+import threading, queue, time #백그라운드 저장 처리 라이브러리
+from datetime import datetime #날짜처리 라이브러리
+from typing import NamedTuple
+import crawl_metrics #크롤러 지표 모듈
+import near_duplicate #근접 중복 기사 판단 모듈
+
+DB_PATH = 'data/news.db' # 데이터베이스 파일 경로
+
+WRITER_BATCH_SIZE = 200 # 한 번에 커밋할 최대 기사 수
+WRITER_FLUSH_INTERVAL = 5.0 # 기사가 적어도 이 시간(초)이 지나면 커밋
+WRITER_MAX_QUEUE = 1000 # 저장 대기 큐 최대 길이 (가득 차면 크롤러가 대기)
+CRAWL_MAX_ATTEMPTS = 3 # 가져오지 못한 기사를 다시 시도할 최대 횟수 (넘으면 그 날짜를 완료로 봄)
+
+def connect_news_db(db_path=DB_PATH):
+    """
+    WAL 모드로 뉴스 DB에 연결합니다.
+    WAL 모드에서는 크롤러가 쓰는 동안에도 다른 프로세스(임베딩 등)가 DB를 읽을 수 있습니다.
+    """
+    local_conn = sqlite3.connect(db_path)
+    local_conn.execute('PRAGMA journal_mode=WAL')
+    local_conn.execute('PRAGMA synchronous=NORMAL')
+    return local_conn
+
+def setup_database(db_path=DB_PATH):
+    """데이터베이스와 테이블이 없으면 생성합니다."""
+    local_conn = connect_news_db(db_path)
+    local_cur = local_conn.cursor()
+    local_cur.execute('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            content TEXT,
+            article_date TEXT,
+            URL TEXT
+        )
+    ''')
+    # 날짜/목록 페이지별 크롤링 진행 상황 (재시작 시 이어서 크롤링)
+    local_cur.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            date TEXT,
+            page INTEGER,
+            status TEXT,
+            article_count INTEGER,
+            finished_at TEXT,
+            failed_count INTEGER DEFAULT 0,
+            PRIMARY KEY (date, page)
+        )
+    ''')
+    # 목록에는 있었지만 가져오지 못한 기사 (다음 실행에서 다시 시도, 저장되면 삭제)
+    local_cur.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_failures (
+            url TEXT PRIMARY KEY,
+            date TEXT,
+            page INTEGER,
+            attempts INTEGER,
+            failed_at TEXT
+        )
+    ''')
+    migrate_unique_urls(local_cur)
+    near_duplicate.setup_tables(local_cur)
+    local_conn.commit()
+    print(f"데이터베이스 '{db_path}' 준비 완료.")
+    return local_conn
+
+def migrate_unique_urls(local_cur):
+    """
+    URL이 중복된 기사를 정리하고 URL에 UNIQUE 인덱스를 생성합니다.
+    중복된 기사 중 가장 먼저 저장된(id가 가장 작은) 행만 남깁니다.
+    """
+    local_cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_articles_url'")
+    if local_cur.fetchone():
+        return
+    local_cur.execute('''
+        DELETE FROM articles
+        WHERE URL IS NOT NULL
+          AND id NOT IN (SELECT MIN(id) FROM articles WHERE URL IS NOT NULL GROUP BY URL)
+    ''')
+    print(f"중복 URL 기사 {local_cur.rowcount}개를 삭제했습니다.")
+    local_cur.execute('CREATE UNIQUE INDEX idx_articles_url ON articles(URL)')
+
+def load_known_urls(local_conn):
+    """DB에 저장된 모든 기사 URL을 집합으로 불러옵니다."""
+    urls = {row[0] for row in local_conn.execute('SELECT URL FROM articles WHERE URL IS NOT NULL')}
+    print(f"이미 저장된 기사 URL {len(urls):,}개를 불러왔습니다.")
+    return urls
+
+def load_crawl_state(local_conn):
+    """
+    날짜별 크롤링 진행 상황을 불러옵니다.
+
+    Returns:
+        dict: {날짜: (마지막으로 완료한 페이지 번호, 하루치 완료 여부)}
+    """
+    rows = local_conn.execute('''
+        SELECT date, MAX(page), MAX(status = 'last') FROM crawl_state GROUP BY date
+    ''')
+    return {date: (last_page, bool(completed)) for date, last_page, completed in rows}
+
+def load_failed_urls(local_conn, max_attempts=CRAWL_MAX_ATTEMPTS):
+    """
+    다시 시도할 기사 URL을 날짜별로 불러옵니다 (max_attempts번 넘게 실패한 기사는 제외).
+
+    Returns:
+        dict: {날짜: [(URL, 목록 페이지 번호)]}
+    """
+    local_conn.execute('DELETE FROM crawl_failures WHERE url IN (SELECT URL FROM articles)') # 다른 페이지에서 이미 저장된 기사
+    local_conn.commit()
+    failed = {}
+    rows = local_conn.execute('SELECT date, url, page FROM crawl_failures WHERE attempts < ? ORDER BY date, page', (max_attempts,))
+    for date, url, page in rows:
+        failed.setdefault(date, []).append((url, page))
+    return failed
+
+class PageCheckpoint(NamedTuple):
+    """목록 페이지 하나의 크롤링 완료 기록 (기사 행과 같은 트랜잭션으로 커밋)"""
+    date: str
+    page: int
+    status: str # 'done': 완료, 'last': 완료된 마지막 페이지 (하루치 완료)
+    article_count: int
+    finished_at: str
+    failed_urls: tuple = () # 가져오지 못한 기사 URL
+
+class FailedArticles(NamedTuple):
+    """다시 시도했지만 또 가져오지 못한 기사 기록"""
+    date: str
+    page: int
+    urls: tuple
+    failed_at: str
+
+_STOP = object() # writer 종료 신호
+
+class ArticleWriter:
+    """
+    기사 행을 큐로 받아 백그라운드 스레드에서 묶음 단위로 저장하는 클래스
+
+    batch_size개가 모이거나 flush_interval초가 지나면 커밋하므로, 하루치 기사를
+    메모리에 모아둘 필요가 없고 중간에 종료되어도 커밋된 기사는 남습니다.
+    DB 연결은 writer 스레드만 소유합니다.
+    """
+    def __init__(self, db_path=DB_PATH, batch_size=WRITER_BATCH_SIZE,
+                 flush_interval=WRITER_FLUSH_INTERVAL, max_queue=WRITER_MAX_QUEUE, dedup=True, on_saved=None):
+        """
+        Args:
+            db_path (str): SQLite 데이터베이스 파일 경로
+            batch_size (int): 한 번에 커밋할 최대 기사 수
+            flush_interval (float): 커밋 간 최대 간격 (초)
+            max_queue (int): 저장 대기 큐 최대 길이
+            dedup (bool): 저장하면서 근접 중복 기사에 canonical_id를 표시할지 여부
+            on_saved (callable): 커밋 직후 새로 저장된 기사 목록을 받을 콜백
+                ([(id, title, content, article_date, URL, canonical_id), ...], writer 스레드에서 호출)
+        """
+        self.db_path = db_path
+        self.dedup = dedup
+        self.on_saved = on_saved
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self._run, name='ArticleWriter', daemon=True)
+        self.saved_count = 0 # 실제로 저장된(중복 제외) 기사 수
+        self.near_duplicate_count = 0 # 근접 중복으로 표시된 기사 수
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def put(self, row):
+        """(title, content, article_date, URL) 행 하나를 저장 대기열에 넣습니다."""
+        self.queue.put(row)
+
+    def put_many(self, rows):
+        """여러 행을 저장 대기열에 넣습니다."""
+        for row in rows:
+            self.queue.put(row)
+
+    def mark_page(self, date_str, page, article_count, is_last, failed_urls=()):
+        """
+        목록 페이지 완료를 기록합니다. 앞서 넣은 기사 행과 함께 커밋되므로
+        기록된 페이지의 기사는 항상 DB에 저장되어 있습니다.
+        가져오지 못한 기사 URL은 crawl_failures에 남겨 다음 실행에서 다시 시도합니다.
+        """
+        self.queue.put(PageCheckpoint(
+            date_str, page, 'last' if is_last else 'done', article_count,
+            datetime.now().isoformat(timespec='seconds'), tuple(failed_urls)
+        ))
+
+    def mark_failed(self, date_str, page, urls):
+        """다시 시도했지만 또 가져오지 못한 기사를 기록합니다 (시도 횟수 증가)."""
+        if urls:
+            self.queue.put(FailedArticles(date_str, page, tuple(urls), datetime.now().isoformat(timespec='seconds')))
+
+    def close(self):
+        """남은 행을 모두 저장하고 writer 스레드를 종료합니다."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        print(f"--- 총 {self.saved_count}개 기사를 DB에 저장했습니다. (근접 중복 {self.near_duplicate_count}개) ---")
+
+    def _run(self):
+        local_conn = connect_news_db(self.db_path)
+        self.index = near_duplicate.NearDuplicateIndex(local_conn) if self.dedup else None
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(local_conn, batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self._flush(local_conn, batch)
+        local_conn.close()
+
+    def _flush(self, local_conn, batch):
+        if not batch:
+            return
+        crawl_metrics.set_queue_depth('writer', self.queue.qsize())
+        rows = [item for item in batch if not isinstance(item, (PageCheckpoint, FailedArticles))]
+        checkpoints = [item for item in batch if isinstance(item, PageCheckpoint)]
+        failures = [(url, item.date, item.page, item.finished_at) for item in checkpoints for url in item.failed_urls]
+        failures += [(url, item.date, item.page, item.failed_at) for item in batch if isinstance(item, FailedArticles) for url in item.urls]
+        started = time.perf_counter()
+        try:
+            saved_rows = []
+            for row in rows:
+                cursor = local_conn.execute('''
+                    INSERT OR IGNORE INTO articles (title, content, article_date, URL)
+                    VALUES (?, ?, ?, ?)
+                ''', row)
+                if cursor.rowcount != 1: # URL 중복으로 무시된 행
+                    continue
+                article_id = cursor.lastrowid
+                canonical_id = self.index.assign(article_id, row[1]) if self.index is not None else None
+                if canonical_id is not None:
+                    self.near_duplicate_count += 1
+                saved_rows.append((article_id, *row, canonical_id))
+            local_conn.executemany('''
+                INSERT OR REPLACE INTO crawl_state (date, page, status, article_count, finished_at, failed_count)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(*checkpoint[:5], len(checkpoint.failed_urls)) for checkpoint in checkpoints])
+            local_conn.executemany('DELETE FROM crawl_failures WHERE url = ?', [(row[3],) for row in rows]) # 다시 시도해 저장된 기사
+            local_conn.executemany('''
+                INSERT INTO crawl_failures (url, date, page, attempts, failed_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(url) DO UPDATE SET attempts = attempts + 1, failed_at = excluded.failed_at
+            ''', failures)
+            local_conn.commit()
+            crawl_metrics.observe('write', time.perf_counter() - started)
+            self.saved_count += len(saved_rows)
+            print(f"--- {len(saved_rows)}개 기사를 DB에 저장했습니다. (누적 {self.saved_count}개) ---")
+        except Exception as e:
+            local_conn.rollback()
+            print(f"!!! DB 저장 중 오류 발생: {e}")
+            return
+        if self.on_saved is not None and saved_rows:
+            try:
+                self.on_saved(saved_rows)
+            except Exception as e: # 후속 처리 오류로 저장 스레드가 멈추지 않도록 함
+                print(f"!!! 저장 후 콜백 실행 중 오류 발생: {e}")
@@ -0,0 +1,107 @@
+from typing import NamedTuple, Optional
+from lxml import etree, html as lxml_html #HTML 파싱 라이브러리 (C 구현)
+
+NAV_TABLE_SUMMARY = '페이지 네비게이션 리스트' # 목록 페이지의 페이지 네비게이션 테이블
+
+class ListPage(NamedTuple):
+    """기사 목록 페이지 파싱 결과"""
+    urls: list          # 기사 링크 (목록 순서)
+    is_last_page: bool  # 마지막 페이지 여부
+
+class ArticlePage(NamedTuple):
+    """기사 본문 페이지 파싱 결과 (찾지 못한 항목은 None)"""
+    title: Optional[str]
+    content: Optional[str]
+    date: Optional[str] # 'YYYY-MM-DD HH:MM:SS' 형식의 작성일시
+
+def _has_classes(element, *classes):
+    return set(classes) <= set(element.get('class', '').split())
+
+def _text_content(element, skip=None):
+    """
+    요소의 텍스트를 조각마다 앞뒤 공백을 제거해 이어 붙입니다.
+    (BeautifulSoup의 get_text(strip=True)와 같은 결과, script/style/주석 제외)
+
+    Args:
+        element: lxml 요소
+        skip (callable): True를 반환하는 하위 요소는 텍스트에서 제외 (뒤따르는 텍스트는 유지)
+    """
+    parts = []
+
+    def walk(el):
+        if el.text and el.tag not in ('script', 'style'):
+            parts.append(el.text)
+        for child in el:
+            if isinstance(child.tag, str) and not (skip and skip(child)):
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(element)
+    return ''.join(part.strip() for part in parts)
+
+def parse_list_page(document):
+    """
+    기사 목록 페이지를 한 번만 파싱해 기사 링크와 마지막 페이지 여부를 함께 추출합니다.
+
+    Args:
+        document (str | bytes): 목록 페이지 HTML (bytes이면 meta charset으로 디코딩)
+
+    Returns:
+        ListPage: 기사 링크 리스트와 마지막 페이지 여부
+    """
+    root = lxml_html.fromstring(document)
+    urls = [href for href in root.xpath(
+        '//dd[contains(concat(" ", normalize-space(@class), " "), " articleSubject ")]//a/@href'
+    ) if href]
+    # 정적 HTML에는 tbody가 없을 수 있으므로 tr 기준으로 선택
+    td_tags = root.xpath('//table[@summary=$summary]//tr/td', summary=NAV_TABLE_SUMMARY)
+    if not td_tags:
+        return ListPage(urls, True) # 페이지 버튼이 없으면 마지막 페이지로 간주
+    # 마지막 td의 class가 'on'이면 마지막 페이지
+    return ListPage(urls, _has_classes(td_tags[-1], 'on'))
+
+def parse_article_page(document, chunk_size=65536):
+    """
+    기사 본문 페이지에서 제목, 본문, 작성일시만 추출합니다.
+
+    문서를 조각 단위로 파서에 넣고 필요한 요소(h2#title_area, article#dic_area,
+    작성일 span)를 모두 찾으면 나머지(댓글, 푸터, 스크립트 등)는 파싱하지 않습니다.
+
+    Args:
+        document (str): 기사 페이지 HTML
+        chunk_size (int): 한 번에 파서에 넣을 문자 수
+
+    Returns:
+        ArticlePage: 제목, 본문, 작성일시
+    """
+    title = content = date = None
+    if not document:
+        return ArticlePage(title, content, date)
+    parser = etree.HTMLPullParser(events=('end',), tag=('h2', 'article', 'span'))
+
+    def consume_events():
+        nonlocal title, content, date
+        for _, element in parser.read_events():
+            if element.tag == 'h2':
+                if title is None and element.get('id') == 'title_area':
+                    title = _text_content(element)
+            elif element.tag == 'article':
+                if content is None and element.get('id') == 'dic_area':
+                    # 사진 설명(span.end_photo_org)은 본문에서 제외
+                    content = _text_content(
+                        element, skip=lambda el: el.tag == 'span' and _has_classes(el, 'end_photo_org')
+                    )
+            elif date is None and _has_classes(element, 'media_end_head_info_datestamp_time', '_ARTICLE_DATE_TIME'):
+                date = element.get('data-date-time')
+        return title is not None and content is not None and date is not None
+
+    for start in range(0, len(document), chunk_size):
+        parser.feed(document[start:start + chunk_size])
+        if consume_events():
+            break
+    else:
+        parser.close()
+        consume_events()
+
+    return ArticlePage(title, content, date)
@@ -0,0 +1,4 @@
+import os, sys
+
+# backend 모듈은 backend 디렉토리를 기준으로 import하므로 (예: from embedding_batch import Embedder) 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,171 @@
+"""
+BatchJobMonitor 테스트 (가짜 Batch 클라이언트와 가짜 시계/대기 함수 사용)
+
+실제 Gemini API 대신 시각에 따라 상태가 바뀌는 가짜 작업을 넘겨 네트워크와 실제 대기 없이 확인합니다.
+"""
+import random
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from batch_monitor import BatchJobMonitor, JOB_DEADLINE
+
+INITIAL = 10
+MAX = 100
+FACTOR = 1.5
+MAX_CALLS = 1000 # 시간이 흐르지 않고 계속 호출하는 버그가 있어도 테스트가 멈추지 않도록 제한
+
+class FakeClock:
+    """sleep을 호출해야만 시간이 흐르는 시계"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class FakeBatches:
+    """
+    client.batches 대신 쓰는 가짜 객체
+
+    작업마다 [(시각, 상태)] 일정을 받아, get()을 호출한 시각에 해당하는 상태를 돌려줍니다.
+    """
+    def __init__(self, clock):
+        self.clock = clock
+        self.schedules = {}
+        self.polls = {} # {작업 이름: [확인 시각]}
+        self.cancelled = []
+        self.calls = 0
+
+    def _count_call(self):
+        self.calls += 1
+        if self.calls > MAX_CALLS: # pytest.fail은 모니터의 except Exception에 잡히지 않음
+            pytest.fail(f"Batch API를 {MAX_CALLS}번 넘게 호출했습니다")
+
+    def add(self, name, schedule):
+        self.schedules[name] = schedule
+        self.polls[name] = []
+
+    def get(self, name):
+        self._count_call()
+        self.polls[name].append(self.clock())
+        state = [state for at, state in self.schedules[name] if at <= self.clock()][-1]
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=state), error=None)
+
+    def cancel(self, name):
+        self._count_call()
+        self.cancelled.append(name)
+        self.schedules[name].append((self.clock(), 'JOB_STATE_CANCELLED'))
+
+@pytest.fixture(autouse=True)
+def fixed_jitter():
+    random.seed(0)
+
+@pytest.fixture
+def fake():
+    clock = FakeClock()
+    batches = FakeBatches(clock)
+    return SimpleNamespace(clock=clock, batches=batches, client=SimpleNamespace(batches=batches))
+
+def make_monitor(fake, registry_path=None):
+    return BatchJobMonitor(fake.client, registry_path=registry_path, initial_interval=INITIAL, max_interval=MAX,
+                           backoff_factor=FACTOR, sleep=fake.clock.sleep, clock=fake.clock)
+
+def test_backoff_grows_caps_and_resets_on_state_change(fake):
+    fake.batches.add('jobs/a', [(0, 'JOB_STATE_PENDING'), (200, 'JOB_STATE_RUNNING'), (1000, 'JOB_STATE_SUCCEEDED')])
+    make_monitor(fake).wait('jobs/a')
+    polls = fake.batches.polls['jobs/a']
+    gaps = [later - earlier for earlier, later in zip(polls, polls[1:])]
+
+    # PENDING 구간: 간격 = INITIAL * FACTOR^k (지터 ±20%)
+    interval = INITIAL
+    changed_at = next(i for i, at in enumerate(polls) if at >= 200) # RUNNING을 처음 본 확인
+    for gap in gaps[:changed_at - 1]:
+        assert 0.8 * interval <= gap <= 1.2 * interval
+        interval = min(MAX, interval * FACTOR)
+    assert gaps[changed_at] <= 1.2 * INITIAL # 상태가 바뀐 직후에는 처음 간격으로 돌아감
+    assert max(gaps) <= 1.2 * MAX
+    assert any(gap >= 0.8 * MAX for gap in gaps) # 최대 간격까지 늘어남
+
+def test_deadline_cancels_job_and_calls_on_done(fake):
+    fake.batches.add('jobs/stuck', [(0, 'JOB_STATE_RUNNING')])
+    monitor = make_monitor(fake)
+    done = []
+    monitor.watch('jobs/stuck', on_done=done.append, deadline_at=250)
+    monitor.run()
+    assert fake.batches.cancelled == ['jobs/stuck']
+    assert monitor.timed_out == {'jobs/stuck'}
+    assert [job.state.name for job in done] == ['JOB_STATE_CANCELLED']
+    assert 250 <= fake.clock() <= 250 + 1.2 * MAX
+
+def test_on_done_runs_in_finish_order_despite_callback_errors(fake):
+    finish_at = {'jobs/a': 500, 'jobs/b': 30, 'jobs/c': 2000, 'jobs/d': 120}
+    for name, at in finish_at.items():
+        fake.batches.add(name, [(0, 'JOB_STATE_RUNNING'), (at, 'JOB_STATE_FAILED' if name == 'jobs/d' else 'JOB_STATE_SUCCEEDED')])
+    monitor = make_monitor(fake)
+    order = []
+
+    def on_done(batch_job):
+        order.append(batch_job.name)
+        if batch_job.name == 'jobs/b':
+            raise RuntimeError('결과 저장 실패') # 다른 작업 처리가 계속되어야 함
+
+    for name in finish_at:
+        monitor.watch(name, on_done=on_done)
+    results = monitor.run()
+    assert order == sorted(finish_at, key=finish_at.get)
+    assert set(results) == set(finish_at)
+    assert results['jobs/d'].state.name == 'JOB_STATE_FAILED'
+
+def test_submit_or_attach_reattaches_and_resubmits_failed_jobs(fake, tmp_path):
+    registry_path = str(tmp_path / 'batch_jobs.json')
+    monitor = make_monitor(fake, registry_path)
+    submitted = []
+
+    def submit():
+        name = f"jobs/{len(submitted)}"
+        submitted.append(name)
+        fake.batches.add(name, [(fake.clock(), 'JOB_STATE_RUNNING')])
+        return SimpleNamespace(name=name)
+
+    job_name, deadline_at = monitor.submit_or_attach('embedding_20250901', submit, deadline=3600)
+    assert (job_name, submitted) == ('jobs/0', ['jobs/0'])
+    assert deadline_at == fake.clock() + 3600
+
+    # 재시작한 프로세스: 같은 기록 파일을 쓰는 새 모니터가 실행 중인 작업에 다시 연결
+    restarted = make_monitor(fake, registry_path)
+    fake.clock.sleep(600)
+    assert restarted.submit_or_attach('embedding_20250901', submit, deadline=3600) == ('jobs/0', deadline_at)
+    # 접두사만 같은 다른 태그에는 연결하지 않음
+    assert restarted.submit_or_attach('embedding_2025090', submit) == ('jobs/1', fake.clock() + JOB_DEADLINE)
+
+    # 실패한 작업은 다시 제출하고 기록을 바꿈
+    fake.batches.schedules['jobs/0'].append((fake.clock(), 'JOB_STATE_FAILED'))
+    assert restarted.submit_or_attach('embedding_20250901', submit)[0] == 'jobs/2'
+    assert [(tag, name) for tag, name, _ in restarted.registered('embedding_20250901')] == [('embedding_20250901', 'jobs/2')]
+
+    restarted.forget('embedding_20250901')
+    restarted.forget('embedding_2025090')
+    assert restarted.registered() == []
+
+def test_registry_keeps_every_tag_across_monitors(fake, tmp_path):
+    """여러 스크립트(각자 다른 모니터와 threading.Lock)가 같은 기록 파일에 동시에 써도 기록이 사라지지 않아야 합니다."""
+    registry_path = str(tmp_path / 'batch_jobs.json')
+    callers = ['embedding', 'keywording', 'topicization']
+    monitors = [make_monitor(fake, registry_path) for _ in callers]
+
+    def register_many(monitor, caller):
+        for i in range(30):
+            monitor.register(f"{caller}_{i}", f"jobs/{caller}_{i}")
+        for i in range(0, 30, 2):
+            monitor.forget(f"{caller}_{i}")
+
+    threads = [threading.Thread(target=register_many, args=pair) for pair in zip(monitors, callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(tag for tag, _, _ in monitors[0].registered()) == sorted(f"{caller}_{i}" for caller in callers for i in range(1, 30, 2))
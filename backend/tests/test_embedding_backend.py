@@ -0,0 +1,115 @@
+"""
+로컬 임베딩 백엔드를 Embedder에 연결했을 때의 저장 경로 테스트
+
+작은 ONNX 모델(benchmarks.bench_onnx_backend.make_tiny_model)로 OnnxEmbeddingBackend를 만들고
+Embedder(backend=...)의 embed_online -> _store_embedding_chunk를 거쳐 저장된 행을 다시 읽어 확인합니다.
+"""
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+pytest.importorskip('chromadb')
+pytest.importorskip('google.genai')
+pytest.importorskip('onnx')
+pytest.importorskip('onnxruntime')
+pytest.importorskip('tokenizers')
+
+from benchmarks.bench_onnx_backend import make_tiny_model, WORDS
+from embedding_backend import EmbeddingBackend, OnnxEmbeddingBackend
+from embedding_batch import Embedder, backend_storage_names, prepare_embedding_texts, texts_hash, COLLECTION_NAME, EMBEDDING_MODEL
+from embedding_store import EMBEDDING_RDB_PATH, load_embeddings
+
+DATE = '2025-09-01'
+ARTICLES = [(id, ' '.join(WORDS[id:id + 3]), ' '.join(WORDS[id:] + WORDS[:id])) for id in range(1, 6)]
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """임시 디렉토리에 news.db를 만들고 그 디렉토리에서 실행합니다 (임베딩 캐시 등 data/ 경로 격리)."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    conn = sqlite3.connect('data/news.db')
+    conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, article_date TEXT, URL TEXT)')
+    conn.executemany('INSERT INTO articles (id, title, content, article_date, URL) VALUES (?, ?, ?, ?, ?)',
+                     [(id, title, content, DATE, f'https://example.com/{id}') for id, title, content in ARTICLES])
+    conn.commit()
+    conn.close()
+    return tmp_path
+
+@pytest.fixture
+def backend(workdir):
+    model_path, tokenizer_path = make_tiny_model(str(workdir))
+    return OnnxEmbeddingBackend(model_path, tokenizer_path, model_name='onnx:tiny-test', batch_size=2)
+
+def chroma_path():
+    """ChromaDB는 경로 문자열별로 클라이언트를 캐시하므로 테스트마다 절대 경로를 씁니다."""
+    return os.path.abspath('data/embedding_db')
+
+def embed_once(embedder):
+    shards = embedder.load_data_and_store(DATE, '2025-09-02')
+    try:
+        if shards:
+            embedder.embed_online(shards)
+    finally:
+        for path, _ in shards:
+            os.remove(path)
+    return shards
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        EmbeddingBackend()
+
+    class NoEmbed(EmbeddingBackend):
+        model_name = 'none'
+
+    with pytest.raises(TypeError):
+        NoEmbed()
+
+def test_backend_uses_its_own_collection_and_db(backend):
+    embedder = Embedder(db_path='data/news.db', chroma_path=chroma_path(), backend=backend)
+    collection_name, embedding_db_path = backend_storage_names(backend.model_name)
+    assert (embedder.collection_name, embedder.embedding_db_path) == (collection_name, embedding_db_path)
+    assert collection_name != COLLECTION_NAME and embedding_db_path != EMBEDDING_RDB_PATH
+
+    with pytest.raises(ValueError):
+        Embedder(db_path='data/news.db', chroma_path=chroma_path(), backend=backend, collection_name=COLLECTION_NAME)
+    with pytest.raises(ValueError):
+        Embedder(db_path='data/news.db', chroma_path=chroma_path(), backend=backend, embedding_db_path=EMBEDDING_RDB_PATH)
+
+def test_embed_online_stores_backend_vectors(backend):
+    embedder = Embedder(db_path='data/news.db', chroma_path=chroma_path(), backend=backend)
+    assert embed_once(embedder)
+
+    ids, vectors = load_embeddings(embedder.embedding_db_conn)
+    assert sorted(ids.tolist()) == [id for id, _, _ in ARTICLES]
+    assert vectors.dtype == np.float32 and vectors.shape[1] == backend.dimensionality
+    stored = dict(zip(ids.tolist(), vectors))
+    for id, title, content in ARTICLES:
+        texts = prepare_embedding_texts(title, content, embedder.max_tokens, embedder.max_chunks)
+        assert np.allclose(stored[id], backend.embed(texts).mean(axis=0), atol=1e-5)
+
+    rows = embedder.embedding_db_conn.execute('SELECT id, content_hash, model FROM embeddings').fetchall()
+    assert {model for _, _, model in rows} == {backend.model_name}
+    assert all(content_hash for _, content_hash, _ in rows)
+
+    chroma = embedder.collection.get(ids=['1'], include=['embeddings', 'metadatas'])
+    assert np.allclose(np.asarray(chroma['embeddings'][0]), stored[1], atol=1e-5)
+    assert chroma['metadatas'][0] == {'article_date': DATE}
+
+    assert embed_once(embedder) == [] # 같은 모델, 같은 본문은 다시 임베딩하지 않음
+
+def test_skip_key_includes_model(backend):
+    embedder = Embedder(db_path='data/news.db', chroma_path=chroma_path(), backend=backend, collection_name='shared_test', embedding_db_path='data/shared.db')
+    hashes = {id: texts_hash(prepare_embedding_texts(title, content, embedder.max_tokens, embedder.max_chunks))
+              for id, title, content in ARTICLES}
+    # 1: 다른 모델(Gemini), 2: 모델 기록 전(Gemini로 간주), 3: 같은 모델 -> 3만 건너뜀
+    embedder.embedding_db_cur.executemany('INSERT INTO embeddings (id, embedding, content_hash, model) VALUES (?, NULL, ?, ?)',
+                                          [(1, hashes[1], EMBEDDING_MODEL), (2, hashes[2], None), (3, hashes[3], backend.model_name)])
+    embedder.embedding_db_conn.commit()
+
+    embed_once(embedder)
+    models = dict(embedder.embedding_db_conn.execute('SELECT id, model FROM embeddings'))
+    assert models == {id: backend.model_name for id, _, _ in ARTICLES}
+    vectors = dict(embedder.embedding_db_conn.execute('SELECT id, embedding FROM embeddings'))
+    assert vectors[3] is None and all(vectors[id] is not None for id in (1, 2, 4, 5))
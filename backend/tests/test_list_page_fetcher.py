@@ -0,0 +1,56 @@
+"""
+ListPageFetcher의 정적 HTML/브라우저 선택 테스트 (네트워크와 브라우저 없이 두 경로를 가짜로 바꿔 확인)
+"""
+import pytest
+
+pytest.importorskip('playwright')
+
+import crawler
+
+EMPTY = b'<html><body><div class="mainNewsList"></div></body></html>'
+WITH_ITEMS = b'<html><body><dd class="articleSubject"><a href="/a">a</a></dd></body></html>'
+
+class FakeFetcher(crawler.ListPageFetcher):
+    def __init__(self, static_pages, rendered='<dd class="articleSubject"><a href="/r">r</a></dd>', **kwargs):
+        super().__init__(**kwargs)
+        self.static_pages = list(static_pages)
+        self.rendered = rendered
+        self.render_count = 0
+
+    def _fetch_static(self, url):
+        return self.static_pages.pop(0)
+
+    def _fetch_rendered(self, url):
+        self.render_count += 1
+        if self.rendered is None:
+            raise TimeoutError('선택자 대기 시간 초과')
+        return self.rendered
+
+def test_empty_static_page_falls_back_to_browser_by_default():
+    fetcher = FakeFetcher([EMPTY])
+    assert fetcher.fetch('2025-09-01', 1) == fetcher.rendered
+    assert fetcher.render_count == 1
+
+def test_live_mode_checks_browser_after_consecutive_empty_pages():
+    fetcher = FakeFetcher([EMPTY] * 3 + [WITH_ITEMS, EMPTY], rendered=None, empty_render_after=2)
+    assert fetcher.fetch('2025-09-01', 1) == EMPTY
+    assert fetcher.fetch('2025-09-01', 1) == EMPTY
+    with pytest.raises(TimeoutError): # 세 번째는 브라우저로 확인 (실제로 기사가 없으면 대기 시간 초과)
+        fetcher.fetch('2025-09-01', 1)
+    assert fetcher.render_count == 1 and fetcher.empty_render_after == 2
+    assert fetcher.fetch('2025-09-01', 1) == WITH_ITEMS
+    assert fetcher.fetch('2025-09-01', 1) == EMPTY # 기사가 있는 정적 페이지를 보면 연속 횟수를 다시 셈
+    assert fetcher.render_count == 1
+
+def test_live_mode_renders_always_once_static_html_misses_the_list():
+    fetcher = FakeFetcher([EMPTY] * 4, empty_render_after=1)
+    assert fetcher.fetch('2025-09-01', 1) == EMPTY
+    assert fetcher.fetch('2025-09-01', 1) == fetcher.rendered # 브라우저에는 목록이 있음
+    assert fetcher.empty_render_after is None
+    assert fetcher.fetch('2025-09-01', 1) == fetcher.rendered
+    assert fetcher.render_count == 2
+
+def test_poll_stops_on_empty_list(monkeypatch):
+    monkeypatch.setattr(crawler, 'crawl_onePage', lambda *args, **kwargs: pytest.fail('빈 목록에서 기사를 요청했습니다'))
+    fetcher = FakeFetcher([EMPTY], empty_render_after=1)
+    assert crawler.poll_latest_pages('2025-09-01', fetcher, writer=None, max_pages=3) == 0
@@ -0,0 +1,208 @@
+"""
+온라인 임베딩 모드 테스트 (가짜 aio.models.embed_content)
+
+Embedder의 Gemini 클라이언트를 embed_content만 가진 가짜 객체로 바꾸고,
+임시 news.db / embeddings.db / ChromaDB로 load_data_and_store + embed_online을 실행합니다.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('chromadb')
+pytest.importorskip('google.genai')
+
+import embedding_batch
+from embedding_batch import Embedder, prepare_embedding_texts, EMBEDDING_DIMENSIONALITY
+from embedding_store import load_embeddings
+
+MAX_TOKENS = 200
+MAX_CHUNKS = 2
+DATE = '2025-09-01'
+
+SHORT_BODY = '코스피 반도체 금리 환율 ' * 5
+LONG_BODY = '외국인 순매수 실적 전망 ' * 45
+# (기사 id, 본문) - 표시([429] 등)가 든 텍스트를 포함한 embed 요청에 해당 오류를 냄 (요청당 텍스트 3개)
+ARTICLES = [
+    (1, SHORT_BODY), (2, SHORT_BODY), (3, LONG_BODY),                   # 요청 1: 1, 2, 3의 첫 청크
+    (4, SHORT_BODY + '[429]'), (5, SHORT_BODY),                         # 요청 2: 3의 둘째 청크, 4, 5 (429 두 번 후 성공)
+    (6, SHORT_BODY + '[503]'), (7, SHORT_BODY), (8, SHORT_BODY),        # 요청 3: 503 한 번 후 성공
+    (9, SHORT_BODY + '[400]'), (10, SHORT_BODY), (11, SHORT_BODY),      # 요청 4: 400 (재시도하지 않음)
+    (12, LONG_BODY), (13, SHORT_BODY + '[short]'),                      # 요청 5: 12의 두 청크, 13 (응답에서 빠짐)
+    (14, SHORT_BODY), (15, SHORT_BODY), (16, LONG_BODY + '[400]'),      # 요청 6: 14, 15, 16의 첫 청크
+    (17, SHORT_BODY),                                                   # 요청 7: 16의 둘째 청크, 17 (400)
+]
+EXPECTED_CALLS = [1, 3, 2, 1, 1, 1, 1] # 요청별 embed_content 호출 수
+EXPECTED_STORED = {1, 2, 3, 4, 5, 6, 7, 8, 12, 14, 15}
+EXPECTED_RETRY = {9, 10, 11, 13, 16, 17}
+
+def fake_vector(text):
+    """텍스트마다 항상 같은 임베딩"""
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+    return np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONALITY).astype(np.float32)
+
+def article_texts(id, content):
+    return prepare_embedding_texts(f'기사 {id}', content, MAX_TOKENS, MAX_CHUNKS)
+
+class FakeAPIError(Exception):
+    """google.genai.errors.APIError처럼 HTTP 상태 코드를 code로 가진 오류"""
+    def __init__(self, code):
+        super().__init__(f"{code} fake error")
+        self.code = code
+
+class FakeModels:
+    """client.aio.models 대신 쓰는 가짜 객체 (요청 텍스트 묶음별 호출 수와 동시 요청 수를 기록)"""
+    def __init__(self, delay=0.0):
+        self.faults = True
+        self.always = None # 이 상태 코드로 항상 실패
+        self.delay = delay
+        self.calls = {} # {요청 텍스트 튜플: 호출 수}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def embed_content(self, model, contents, config):
+        texts = tuple(contents)
+        self.calls[texts] = self.calls.get(texts, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.always is not None:
+            raise FakeAPIError(self.always)
+        if self.faults:
+            if any('[429]' in text for text in texts) and self.calls[texts] <= 2:
+                raise FakeAPIError(429)
+            if any('[503]' in text for text in texts) and self.calls[texts] <= 1:
+                raise FakeAPIError(503)
+            if any('[400]' in text for text in texts):
+                raise FakeAPIError(400)
+            if any('[short]' in text for text in texts):
+                texts = texts[:-1] # 마지막 텍스트의 임베딩이 빠진 응답
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=fake_vector(text).tolist()) for text in texts])
+
+class StrictCollection:
+    """벡터 형식이 섞인 upsert를 거부하는 ChromaDB 컬렉션 래퍼 (list와 np.ndarray가 섞이면 ChromaDB 검증에서 실패함)"""
+    def __init__(self, collection):
+        self.collection = collection
+
+    def upsert(self, ids, embeddings, metadatas):
+        kinds = {type(embedding).__name__ for embedding in embeddings}
+        assert len(kinds) == 1, f"한 번의 upsert에 벡터 형식이 섞였습니다: {sorted(kinds)}"
+        return self.collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+    def get(self, **kwargs):
+        return self.collection.get(**kwargs)
+
+@pytest.fixture
+def make_embedder(tmp_path, monkeypatch):
+    """기사 목록으로 임시 news.db를 만들고 가짜 클라이언트를 연결한 Embedder를 반환하는 함수"""
+    monkeypatch.chdir(tmp_path) # 임베딩 캐시(data/embedding_cache.db)도 임시 디렉토리에 만듦
+    monkeypatch.setattr(embedding_batch, 'ONLINE_TEXTS_PER_REQUEST', 3) # 청크 묶음이 요청 경계에 걸치도록 작게 설정
+    monkeypatch.setattr(embedding_batch, 'ONLINE_BACKOFF_BASE', 0.001)
+    monkeypatch.setattr(embedding_batch, 'ONLINE_RATE_LIMIT', 10000.0)
+    os.makedirs('data')
+
+    def make(articles, models):
+        conn = sqlite3.connect('data/news.db')
+        conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, article_date TEXT, URL TEXT)')
+        conn.executemany('INSERT INTO articles (id, title, content, article_date, URL) VALUES (?, ?, ?, ?, ?)',
+                         [(id, f'기사 {id}', content, DATE, f'https://example.com/{id}') for id, content in articles])
+        conn.commit()
+        conn.close()
+        embedder = Embedder(api_key='test', db_path='data/news.db', chroma_path=str(tmp_path / 'embedding_db'),
+                            collection_name='test_online', max_tokens=MAX_TOKENS, max_chunks=MAX_CHUNKS)
+        embedder.gemini_client = SimpleNamespace(aio=SimpleNamespace(models=models))
+        embedder.collection = StrictCollection(embedder.collection)
+        return embedder
+    return make
+
+def embed_once(embedder):
+    shards = embedder.load_data_and_store(DATE, '2025-09-02')
+    try:
+        if shards:
+            embedder.embed_online(shards)
+    finally:
+        for path, _ in shards:
+            os.remove(path)
+
+def stored_and_retry(embedder):
+    ids, vectors = load_embeddings(embedder.embedding_db_conn)
+    retry = {id: (attempts, error) for id, attempts, error in
+             embedder.embedding_db_conn.execute('SELECT article_id, attempts, last_error FROM embedding_retry')}
+    return dict(zip(ids.tolist(), vectors)), retry
+
+def test_request_layout():
+    """청크 수와 표시 위치가 위 표의 요청 구성과 같은지 확인합니다 (토큰 추정 규칙이 바뀌면 여기서 알림)."""
+    texts = [article_texts(id, content) for id, content in ARTICLES]
+    assert [len(article) for article in texts] == [2 if content.startswith(LONG_BODY) else 1 for _, content in ARTICLES]
+    assert '[400]' not in texts[15][0] and '[400]' in texts[15][1] # 기사 16은 둘째 청크만 실패
+    assert -(-sum(len(article) for article in texts) // 3) == len(EXPECTED_CALLS)
+
+def test_retries_and_retry_queue(make_embedder):
+    models = FakeModels()
+    embedder = make_embedder(ARTICLES, models)
+    embed_once(embedder)
+
+    texts = [text for id, content in ARTICLES for text in article_texts(id, content)]
+    requests = [tuple(texts[i:i + 3]) for i in range(0, len(texts), 3)]
+    assert [models.calls.get(request, 0) for request in requests] == EXPECTED_CALLS # 429 두 번, 503 한 번 재시도, 400은 재시도 없음
+
+    stored, retry = stored_and_retry(embedder)
+    assert set(stored) == EXPECTED_STORED
+    assert set(retry) == EXPECTED_RETRY
+    assert all(attempts == 1 for attempts, _ in retry.values())
+    assert '응답에 임베딩이 없음' in retry[13][1]
+    assert '400' in retry[9][1]
+    assert '일부 청크 결과가 없음' in retry[16][1] or '400' in retry[16][1]
+
+    for id in (3, 12): # 청크 평균 풀링 (3은 두 요청에 걸침)
+        expected = np.mean([fake_vector(text) for text in article_texts(id, dict(ARTICLES)[id])], axis=0)
+        assert np.allclose(stored[id], expected, atol=1e-6)
+    chroma = embedder.collection.get(ids=['3', '4'], include=['embeddings'])
+    assert np.allclose(np.asarray(chroma['embeddings'][0]), stored[3], atol=1e-6)
+
+def test_retry_queue_drains_after_faults_clear(make_embedder):
+    models = FakeModels()
+    embedder = make_embedder(ARTICLES, models)
+    embed_once(embedder)
+
+    models.faults = False
+    models.calls.clear()
+    embed_once(embedder)
+    requested = {text for request in models.calls for text in request}
+    assert requested == {text for id in EXPECTED_RETRY for text in article_texts(id, dict(ARTICLES)[id])} # 재시도 대기 기사만 다시 요청
+    stored, retry = stored_and_retry(embedder)
+    assert set(stored) == EXPECTED_STORED | EXPECTED_RETRY
+    assert retry == {}
+
+def test_persistent_5xx_gives_up_after_max_retries(make_embedder):
+    models = FakeModels()
+    models.always = 503
+    articles = [(id, SHORT_BODY) for id in range(1, 4)]
+    embedder = make_embedder(articles, models)
+    embed_once(embedder)
+
+    assert list(models.calls.values()) == [embedding_batch.ONLINE_MAX_RETRIES + 1]
+    stored, retry = stored_and_retry(embedder)
+    assert stored == {}
+    assert set(retry) == {1, 2, 3}
+    assert all('503' in error for _, error in retry.values())
+
+def test_concurrent_requests_bounded_by_semaphore(make_embedder, monkeypatch):
+    monkeypatch.setattr(embedding_batch, 'ONLINE_CONCURRENCY', 3)
+    monkeypatch.setattr(embedding_batch, 'ONLINE_TEXTS_PER_REQUEST', 1)
+    models = FakeModels(delay=0.01)
+    articles = [(id, f'{SHORT_BODY} {id}') for id in range(1, 21)]
+    embedder = make_embedder(articles, models)
+    embed_once(embedder)
+
+    assert len(models.calls) == 20
+    assert models.max_in_flight == 3 # 동시에 보낸 요청이 ONLINE_CONCURRENCY개를 넘지 않고, 그만큼은 병렬로 보냄
+    stored, retry = stored_and_retry(embedder)
+    assert set(stored) == set(range(1, 21)) and retry == {}
@@ -0,0 +1,108 @@
+import threading, time, random, asyncio #요청 속도 제어 라이브러리
+
+class TokenBucket:
+    """호스트 단위로 요청 속도를 제한하는 토큰 버킷"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기합니다."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """asyncio 코루틴에서 토큰 하나를 얻을 때까지 대기합니다 (이벤트 루프를 막지 않음)."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    응답 상태와 지연 시간에 따라 요청 속도를 조절하는 AIMD 토큰 버킷
+
+    - 정상 응답이고 지연 시간이 목표 이하이면 속도를 조금씩 올립니다 (additive increase).
+    - 지연 시간이 목표를 넘으면 속도를 약간 낮춥니다.
+    - 429/5xx/네트워크 오류이면 속도를 크게 낮추고 (multiplicative decrease),
+      Retry-After 또는 연속 실패 횟수에 따른 지수 백오프만큼 호스트를 쉬게 합니다.
+    """
+    def __init__(self, rate, capacity=1, min_rate=0.2, max_rate=8.0, increase=0.1,
+                 decrease_factor=0.5, slow_factor=0.9, target_latency=1.5,
+                 backoff_base=3.0, backoff_max=60.0):
+        """
+        Args:
+            rate (float): 시작 속도 (초당 요청 수)
+            capacity (int): 연속으로 허용되는 요청 수
+            min_rate (float): 최저 속도
+            max_rate (float): 최고 속도
+            increase (float): 정상 응답마다 더할 속도
+            decrease_factor (float): 429/5xx/오류 시 곱할 비율
+            slow_factor (float): 지연 시간이 목표를 넘을 때 곱할 비율
+            target_latency (float): 목표 응답 시간 (초)
+            backoff_base (float): 첫 실패 시 쉬는 시간 (초)
+            backoff_max (float): 최대로 쉬는 시간 (초)
+        """
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.slow_factor = slow_factor
+        self.target_latency = target_latency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.consecutive_failures = 0
+
+    @property
+    def current_rate(self):
+        """현재 허용 속도 (초당 요청 수)"""
+        return self.rate
+
+    def _set_rate(self, rate):
+        self._refill() # 바뀌기 전 속도로 쌓인 토큰을 먼저 반영
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def record(self, status, latency, retry_after=None):
+        """
+        요청 결과를 반영해 속도를 조절합니다.
+
+        Args:
+            status (int | None): HTTP 상태 코드 (네트워크 오류/타임아웃이면 None)
+            latency (float): 응답 시간 (초)
+            retry_after (str | None): 응답의 Retry-After 헤더 값
+        """
+        with self.lock:
+            if status is None or status == 429 or status >= 500:
+                self.consecutive_failures += 1
+                self._set_rate(self.rate * self.decrease_factor)
+                backoff = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+                if retry_after and retry_after.strip().isdigit():
+                    backoff = max(backoff, min(self.backoff_max, float(retry_after)))
+                backoff *= random.uniform(1.0, 1.5) # 여러 스레드가 동시에 재시도하지 않도록 지터 추가
+                self.tokens = min(self.tokens, 0) - backoff * self.rate
+            elif status < 400:
+                self.consecutive_failures = 0
+                if latency > self.target_latency:
+                    self._set_rate(self.rate * self.slow_factor)
+                else:
+                    self._set_rate(self.rate + self.increase)
+            # 404 등 나머지 4xx는 서버 부하와 무관하므로 속도를 바꾸지 않음
@@ -1,9 +1,10 @@
 import sqlite3
 import json
-import time
 import os
 from google import genai
 from google.genai import types
+from batch_request_writer import BatchRequestWriter, iter_cursor, generate_content_request #Batch 입력 파일 작성 모듈
+from batch_monitor import BatchJobMonitor, RESUBMIT_STATES #Batch 작업 모니터
 
 # ==========================================
 # 1. 설정 및 데이터베이스 연결
@@ -17,6 +18,7 @@ DB_CLUSTER_PATH = "data/cluster.db"
 DB_NEWS_PATH = "data/news.db"
 BATCH_INPUT_FILE = "tempfile/cluster_topic_input.jsonl"
 BATCH_OUTPUT_FILE = "tempfile/cluster_topic_output.jsonl"
+JOB_TAG = "topicization" # 작업 기록 파일에서 이 작업을 구분하는 태그
 
 # 프롬프트 설정
 refined_system_prompt = """Analyze the given news article titles to extract frequently appearing core keywords and formulate a core topic as a cohesive noun phrase based on them.
@@ -28,106 +30,80 @@ Exclude all particles (josa) and predicates; construct the topic strictly as a n
 
 
 # ==========================================
-# 2. 데이터 추출 및 전처리 (DB -> Memory)
+# 2. 데이터 추출 및 JSONL 파일 생성 (DB -> 파일)
 # ==========================================
-print("1. 데이터베이스에서 데이터 추출 중...")
+def build_batch_input():
+    """clusters의 샘플 기사 제목으로 Batch 입력 JSONL 파일을 만듭니다. (새로 제출할 때만 호출)"""
+    print("1. 데이터베이스에서 데이터 추출 중...")
 
-conn_cluster = sqlite3.connect(DB_CLUSTER_PATH)
-cursor_cluster = conn_cluster.cursor()
-cursor_cluster.execute("SELECT id, samples FROM clusters")
-cluster_rows = cursor_cluster.fetchall()
-
-conn_news = sqlite3.connect(DB_NEWS_PATH)
-cursor_news = conn_news.cursor()
+    conn_cluster = sqlite3.connect(DB_CLUSTER_PATH)
+    cursor_cluster = conn_cluster.cursor()
+    cursor_cluster.execute("SELECT id, samples FROM clusters")
 
-batch_request_data = []
+    conn_news = sqlite3.connect(DB_NEWS_PATH)
+    cursor_news = conn_news.cursor()
 
-for row in cluster_rows:
-    cluster_id = row[0]
-    samples_str = row[1]
-    
-    try:
-        article_ids = json.loads(samples_str)
-        if not article_ids: continue
+    # 클러스터를 커서에서 하나씩 읽어 바로 요청으로 씀 (전체 데이터를 메모리에 모으지 않음)
+    with BatchRequestWriter(BATCH_INPUT_FILE) as writer:
+        for cluster_id, samples_str in iter_cursor(cursor_cluster):
+            try:
+                article_ids = json.loads(samples_str)
+                if not article_ids: continue
+                
+                placeholders = ','.join('?' for _ in article_ids)
+                query = f"SELECT title FROM articles WHERE id IN ({placeholders})"
             
-        placeholders = ','.join('?' for _ in article_ids)
-        query = f"SELECT title FROM articles WHERE id IN ({placeholders})"
-        
-        cursor_news.execute(query, article_ids)
-        titles_rows = cursor_news.fetchall()
-        titles = [t[0] for t in titles_rows]
-        
-        if titles:
-            batch_request_data.append({
-                "cluster_id": cluster_id,
-                "titles": titles
-            })
-    except Exception:
-        continue
-
-conn_news.close()
-conn_cluster.close()
-print(f"   -> 총 {len(batch_request_data)}개의 클러스터 데이터를 준비했습니다.")
-
-# ==========================================
-# 3. JSONL 파일 생성
-# ==========================================
-print(f"2. 배치 입력 파일 생성 중... ({BATCH_INPUT_FILE})")
+                cursor_news.execute(query, article_ids)
+                titles = [t[0] for t in cursor_news.fetchall()]
+            
+                if titles:
+                    writer.write(generate_content_request(str(cluster_id), refined_system_prompt, "\n".join(titles)))
+            except Exception:
+                continue
 
-with open(BATCH_INPUT_FILE, "w", encoding="utf-8") as f:
-    for data in batch_request_data:
-        content_text = "\n".join(data["titles"])
-        
-        request_object = {
-            "custom_id": str(data["cluster_id"]),
-            "request": {
-                "system_instruction": {
-                    "parts": [{"text": refined_system_prompt}]
-                },
-                "contents": [
-                    {"parts": [{"text": content_text}]}
-                ]
-            }
-        }
-        f.write(json.dumps(request_object, ensure_ascii=False) + "\n")
+    conn_news.close()
+    conn_cluster.close()
+    print(f"   -> 총 {writer.total}개의 클러스터 데이터를 준비했습니다.")
+    if writer.total == 0:
+        print("[에러] 요청할 클러스터가 없습니다.")
+        exit() # 작업을 제출하지 않았으므로 기록도 남지 않음
+    print(f"2. 배치 입력 파일 생성 완료 ({BATCH_INPUT_FILE})")
 
 # ==========================================
 # 4. Batch API 작업 실행
 # ==========================================
-print("3. 파일 업로드 및 배치 작업 시작...")
-
-# 파일 업로드
-upload_file = client.files.upload(
-    file=BATCH_INPUT_FILE, 
-    config={"mime_type": "application/json"}
-)
-print(f"   -> 파일 업로드 완료: {upload_file.name}")
-
-# 배치 작업 생성
-batch_job = client.batches.create(
-    model="gemini-2.5-flash-lite",
-    src=upload_file.name,
-    config=types.CreateBatchJobConfig(
-        display_name="cluster_topic_labeling"
+def submit_batch_job():
+    build_batch_input()
+    print("3. 파일 업로드 및 배치 작업 시작...")
+
+    # 파일 업로드
+    upload_file = client.files.upload(
+        file=BATCH_INPUT_FILE, 
+        config={"mime_type": "application/json"}
     )
-)
+    print(f"   -> 파일 업로드 완료: {upload_file.name}")
+
+    # 배치 작업 생성
+    return client.batches.create(
+        model="gemini-2.5-flash-lite",
+        src=upload_file.name,
+        config=types.CreateBatchJobConfig(
+            display_name="cluster_topic_labeling"
+        )
+    )
+
+# 이전 실행에서 제출한 작업이 남아 있으면 입력 파일을 다시 만들거나 제출하지 않고 그 작업에 연결
+monitor = BatchJobMonitor(client)
+batch_job_name, deadline_at = monitor.submit_or_attach(JOB_TAG, submit_batch_job)
 
-print(f"   -> 작업 ID: {batch_job.name}")
+print(f"   -> 작업 ID: {batch_job_name}")
 
 # ==========================================
-# 5. 대기 (요청하신 1번 로직 유지)
+# 5. 대기 (상태가 그대로이면 확인 간격을 점점 늘림)
 # ==========================================
 print("4. 작업 완료 대기 중...")
 
-while True:
-    # 상태 업데이트
-    batch_job = client.batches.get(name=batch_job.name)
-    
-    if batch_job.state.name in ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED'):
-        break
-    
-    print(f"Job not finished. Current state: {batch_job.state.name}. Waiting 30 seconds...")
-    time.sleep(30)
+batch_job = monitor.wait(batch_job_name, deadline_at)
 
 # ==========================================
 # 6. 결과 다운로드 (수정된 2번 로직)
@@ -180,6 +156,8 @@ if batch_job.state.name == "JOB_STATE_SUCCEEDED":
 
 else:
     print(f"작업이 성공하지 못했습니다. 상태: {batch_job.state.name}")
+    if batch_job.state.name in RESUBMIT_STATES:
+        monitor.forget(JOB_TAG) # 다음 실행에서 새로 제출
     exit()
 
 # ==========================================
@@ -217,6 +195,7 @@ if os.path.exists(BATCH_OUTPUT_FILE):
 
     conn_cluster.commit()
     conn_cluster.close()
+    monitor.forget(JOB_TAG) # 결과 저장이 끝난 작업은 기록에서 삭제
     print(f"\n[완료] 총 {update_count}개의 클러스터 토픽이 업데이트되었습니다.")
 else:
     print(f"[에러] 결과 파일이 없어 업데이트를 진행하지 못했습니다.")